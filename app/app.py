@@ -1,126 +1,163 @@
+import glob
+import os
+import re
+from contextlib import contextmanager
+
 from flask import Flask
 from flask_socketio import SocketIO
-from .models import db, Category, SkillName
+from sqlalchemy import inspect, text
+from .models import db
 from .routes import register_routes
-from .sockets import socketio
-
-# 🎓 University Life Categories (expanded)
-category_data = [
-    "Academic Tutoring",
-    "Tech & Programming",
-    "Campus Gigs & Freelance",
-    "Creative Skills",
-    "Career Prep & Productivity",
-    "Languages & Culture",
-    "Health & Wellness",
-    "Music & Performing Arts",
-    "Student Leadership & Advocacy",
-    "Life Skills",
-    "Financial Literacy",
-    "Mental Health & Self-Care",
-    "Outdoor & Adventure",
-    "Entrepreneurship & Startups",
-]
-
-# 🧠 Realistic Student Skills (expanded)
-skill_name_data = [
-    # Academic Tutoring
-    "Calculus Help", "Intro to Python", "Organic Chemistry Tutoring", "Essay Editing", "Research Help",
-    "Statistics Fundamentals", "Physics Problem Solving", "Linear Algebra Assistance", "Essay Writing Tips",
-
-    # Tech & Programming
-    "Web Design", "Java Debugging", "SQL Queries", "App Prototyping", "GitHub Basics",
-    "Data Visualization with Python", "Intro to Machine Learning", "Linux Command Line", "APIs with Flask",
-
-    # Campus Gigs & Freelance
-    "Photography for Events", "Resume Headshots", "Dorm Moving Help", "Flyer Design", "Social Media Posts",
-    "Tutoring Scheduling Assistant", "Event Setup Crew", "Campus Tour Guide", "Freelance Writing",
-
-    # Creative Skills
-    "Canva Design", "Spoken Word Coaching", "Podcast Editing", "Poster Art", "T-shirt Design",
-    "Creative Writing Workshops", "Digital Illustration Basics", "Video Editing Basics", "Photography Editing",
-
-    # Career Prep & Productivity
-    "Resume Reviews", "LinkedIn Optimization", "Time Blocking", "Notion Templates", "Study Scheduling",
-    "Interview Practice", "Networking Strategies", "Public Speaking Confidence", "Project Management Basics",
-
-    # Languages & Culture
-    "Beginner Spanish", "French Conversation Practice", "ASL Basics", "Cultural Exchange Partner",
-    "Japanese for Beginners", "Meditation & Mindfulness in Different Cultures", "German Basics", "Chinese Mandarin Intro",
-
-    # Health & Wellness
-    "Gym Partnering", "Meal Prepping on a Budget", "Mindfulness Techniques", "Yoga for Beginners",
-    "Stress Management", "Sleep Hygiene Tips", "Healthy Cooking", "Running Form Coaching",
-
-    # Music & Performing Arts
-    "Guitar Chords", "Music Production with FL Studio", "Dance Choreography", "Open Mic Performance Tips",
-    "Beatboxing Basics", "Stage Presence Coaching", "Piano Basics", "Songwriting Techniques",
-
-    # Student Leadership & Advocacy
-    "Event Planning Tips", "Student Org Management", "Campus Fundraising", "Public Speaking Coaching",
-    "Conflict Resolution in Groups", "Volunteer Coordination", "Leadership Skills", "Advocacy Strategies",
-
-    # Life Skills
-    "Laundry Tips", "Cooking Nigerian Jollof", "Budgeting with Excel", "Roommate Conflict Resolution",
-    "Basic Car Maintenance", "Travel Planning on a Budget", "Time Management", "Personal Safety",
-
-    # Financial Literacy
-    "Credit Score Basics", "Student Loan Management", "Investment 101", "Tax Filing for Beginners", "Building an Emergency Fund",
-
-    # Mental Health & Self-Care
-    "Dealing with Anxiety", "Building Healthy Habits", "Meditation for Beginners", "Journaling for Mental Clarity",
-
-    # Outdoor & Adventure
-    "Backpacking Essentials", "Rock Climbing Basics", "Camping Cooking Tips", "Hiking Trail Recommendations",
-
-    # Entrepreneurship & Startups
-    "Pitch Deck Creation", "Lean Startup Methodology", "Building an MVP", "Finding Co-Founders", "Marketing on a Budget",
-]
+from .sockets import socketio, register_socket_events
+from .services.dashboard_cache import dashboard_cache
+from .services.reference_data import ReferenceCache
+from .services.matching import init_matching
+from .services.autocomplete import init_autocomplete
+from .services.search import init_search, install_search
+from .services.swap_status import init_swap_status
+from .services.conversation_activity import init_conversation_activity
+from .services.seeding import ensure_seeded, init_seeding
+from .services.replicas import init_replicas
+from .services.db_pool import configure_pool, init_pool_metrics
+from .services.archive import init_archive
+from .services.message_partitions import ensure_message_partitions, init_message_partitions
+from .services.chat_write_behind import init_chat_write_behind
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+BASELINE_REVISION = '0001_baseline'
+# pg_advisory_lock key held by a worker while it changes the schema on boot
+SCHEMA_LOCK_KEY = 0x534B494C
+
+
+
+class LazyMigrate:
+    """
+    Stands in for Flask-Migrate's app.extensions['migrate'] until first use.
+
+    Importing flask_migrate pulls in alembic, mako and pygments, a large
+    share of worker boot, yet only `flask db` and pending migrations need
+    it. The first attribute lookup registers the real extension.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        app.extensions['migrate'] = self
+
+    def __getattr__(self, name):
+        from flask_migrate import Migrate
+        Migrate(self.app, db, directory=MIGRATIONS_DIR)
+        return getattr(self.app.extensions['migrate'], name)
+
+
+def head_revision():
+    """The newest migration's revision id, read from the scripts without importing alembic."""
+    revisions, parents = set(), set()
+    for path in glob.glob(os.path.join(MIGRATIONS_DIR, 'versions', '*.py')):
+        with open(path) as f:
+            source = f.read()
+        revisions.update(re.findall(r"^revision = '([^']+)'", source, re.M))
+        parents.update(re.findall(r"^down_revision = '([^']+)'", source, re.M))
+    heads = revisions - parents
+    return heads.pop() if len(heads) == 1 else None
+
+
+@contextmanager
+def schema_lock():
+    """
+    Hold a PostgreSQL advisory lock while changing the schema, so workers
+    booting together take turns instead of racing on the same DDL.
+    """
+    if db.engine.dialect.name != 'postgresql':
+        yield
+        return
+    with db.engine.connect() as connection:
+        connection.execute(text("SELECT pg_advisory_lock(:key)"), {'key': SCHEMA_LOCK_KEY})
+        connection.commit()  # the lock belongs to the session; don't sit idle in a transaction
+        try:
+            yield
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {'key': SCHEMA_LOCK_KEY})
+            connection.commit()
+
+
+def _at_head(tables):
+    if 'alembic_version' not in tables:
+        return False
+    with db.engine.connect() as connection:
+        current = connection.execute(text("SELECT version_num FROM alembic_version")).scalars().all()
+    return current == [head_revision()]
+
+
+def sync_schema():
+    """Bring the database to the latest migration.
+
+    A database already at head costs one query and never loads alembic.
+    A blank database is built straight from the models and stamped at head.
+    A database created by db.create_all() before migrations existed is
+    stamped at the baseline first, so only the later revisions run.
+    Anything else runs under schema_lock(), rechecking once it is held.
+    """
+    if _at_head(set(inspect(db.engine).get_table_names())):
+        return
+
+    with schema_lock():
+        tables = set(inspect(db.engine).get_table_names())
+        if _at_head(tables):
+            return  # another worker migrated while this one waited
+        from flask_migrate import stamp, upgrade
+        if 'alembic_version' in tables:
+            upgrade()
+        elif tables & set(db.metadata.tables):
+            stamp(revision=BASELINE_REVISION)
+            upgrade()
+        else:
+            db.create_all()
+            with db.engine.begin() as connection:
+                install_search(connection)
+            stamp()
+
+
+def migrate_on_startup(app):
+    """Migrate and create the coming message partitions when a worker boots, unless MIGRATE_ON_STARTUP is off."""
+    if not app.config.get('MIGRATE_ON_STARTUP', True):
+        return
+    sync_schema()
+    with schema_lock():
+        ensure_message_partitions(app)
 
 
 def create_app():
-    print("Starting create_app() - seeding will run if needed...")
     app = Flask(__name__)
     app.config.from_object('config.Config')
 
     # Initialize extensions
+    configure_pool(app)
     db.init_app(app)
+    LazyMigrate(app)
+    init_replicas(app)
+    init_pool_metrics(app)
+    dashboard_cache.init_app(app)
+    ReferenceCache(app)
+    init_matching(app)
+    init_autocomplete(app)
 
     with app.app_context():
-        db.create_all()
-
-        print("Seeding Categories...")
-        for cat in category_data:
-            stmt = db.select(Category).where(Category.name == cat)
-            exists = db.session.execute(stmt).scalar_one_or_none()
-            if not exists:
-                new_category = Category(name=cat)
-                db.session.add(new_category)
-                print(f" Added category: {cat}")
-
-        print("Seeding Skill Names...")
-        for skill in skill_name_data:
-            stmt = db.select(SkillName).where(SkillName.name == skill)
-            exists = db.session.execute(stmt).scalar_one_or_none()
-            if not exists:
-                new_skill = SkillName(name=skill)
-                db.session.add(new_skill)
-                print(f"  Added skill: {skill}")
+        migrate_on_startup(app)
+        ensure_seeded(app)
 
-        try:
-            db.session.commit()
-            print("All set! Your campus swap board just got way more relevant")
-        except Exception as e:
-            db.session.rollback()
-            print(f"Error during seeding: {e}")
-            import traceback
-            traceback.print_exc()
+    init_search(app)
+    init_swap_status(app)
+    init_conversation_activity(app)
+    init_seeding(app)
+    init_archive(app)
+    init_message_partitions(app)
+    init_chat_write_behind(app)
 
     # Register blueprints
     register_routes(app)
 
-    # Initialize SocketIO with the app
-    socketio.init_app(app, cors_allowed_origins="*")  # add CORS if needed
+    # Initialize SocketIO with the app and its /chat namespace
+    register_socket_events(app)
 
     return app
 
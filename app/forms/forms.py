@@ -1,4 +1,3 @@
-from bson import Regex
 from flask_wtf import FlaskForm
 from wtforms import RadioField, SelectField, StringField, PasswordField, SubmitField, TextAreaField
 from wtforms.validators import DataRequired, Email, EqualTo, Length, Regexp
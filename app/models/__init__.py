@@ -14,6 +14,13 @@ from .swap_conversation import SwapConversation
 from .swap_message import SwapMessage
 from .swap_request import SwapRequest
 from .discuss_request import DiscussRequest
+from .app_meta import AppMeta
+from .archive import (
+    ArchivedSwap, ArchivedSwapRequest, ArchivedDiscussRequest, ArchivedSwapConversation, ArchivedSwapMessage,
+)
+from .transitions import InvalidTransition
+from . import request_counters  # keeps Swap request counters in step at flush
+from . import conversation_activity  # keeps SwapConversation inbox columns in step at flush
 
 # Export all models
 __all__ = [
@@ -27,6 +34,13 @@ __all__ = [
     'SwapMessage',
     'SwapRequest',
     'DiscussRequest',
+    'AppMeta',
+    'ArchivedSwap',
+    'ArchivedSwapRequest',
+    'ArchivedDiscussRequest',
+    'ArchivedSwapConversation',
+    'ArchivedSwapMessage',
+    'InvalidTransition',
     'RequestStatus',
     'SwapStatus',
     'MessageType'
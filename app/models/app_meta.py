@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from .base import Base
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String
+
+class AppMeta(Base):
+    """Small key/value table for application-wide stamps (e.g. reference data version)."""
+    __tablename__ = 'app_meta'
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    value: Mapped[str] = mapped_column(String(128), nullable=False)
+
+    def __repr__(self):
+        return f"<AppMeta {self.key}={self.value}>"
@@ -0,0 +1,111 @@
+# app/models/archive.py
+"""
+Archive tier for finished swaps.
+
+services/archive.py moves old completed and cancelled swaps, together with
+their requests, conversations and messages, out of the live tables and into
+these archived_* copies. Each copy has its live table's columns plus
+archived_at, and no foreign keys, so archived rows never hold up changes to
+the live tables. The classes have the same relationships as their live
+counterparts (read-only), so views and templates render either kind.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy import Column, DateTime, Index, Table
+from sqlalchemy.orm import Mapped, relationship
+
+from .base import Base
+from .swap import Swap
+from .swap_request import SwapRequest
+from .discuss_request import DiscussRequest
+from .swap_conversation import SwapConversation
+from .swap_message import SwapMessage
+
+
+def _archive_table(live, *indexes):
+    # Keyed by id alone, even where the live key also carries a partition column
+    columns = [Column(c.name, c.type, primary_key=c.name == 'id', nullable=c.nullable) for c in live.columns]
+    return Table(f'archived_{live.name}', Base.metadata, *columns,
+                 Column('archived_at', DateTime, nullable=False), *indexes)
+
+
+def _to_one(target, foreign_key):
+    return relationship(target, primaryjoin=f"foreign({foreign_key}) == {target}.id", viewonly=True)
+
+
+class ArchivedSwap(Base):
+    __table__ = _archive_table(Swap.__table__, Index('ix_archived_swaps_user', 'user_id'))
+
+    user: Mapped['User'] = _to_one('User', 'ArchivedSwap.user_id')
+    offered_skill: Mapped['Skill'] = _to_one('Skill', 'ArchivedSwap.offered_skill_id')
+    desired_skill_name: Mapped['SkillName'] = _to_one('SkillName', 'ArchivedSwap.desired_skill_name_id')
+    swap_conversations: Mapped[list['ArchivedSwapConversation']] = relationship(
+        'ArchivedSwapConversation', primaryjoin='foreign(ArchivedSwapConversation.swap_id) == ArchivedSwap.id',
+        viewonly=True)
+    swap_requests: Mapped[list['ArchivedSwapRequest']] = relationship(
+        'ArchivedSwapRequest', primaryjoin='foreign(ArchivedSwapRequest.swap_id) == ArchivedSwap.id',
+        viewonly=True)
+    discuss_requests: Mapped[list['ArchivedDiscussRequest']] = relationship(
+        'ArchivedDiscussRequest', primaryjoin='foreign(ArchivedDiscussRequest.swap_id) == ArchivedSwap.id',
+        viewonly=True)
+
+
+class ArchivedSwapRequest(Base):
+    __table__ = _archive_table(SwapRequest.__table__, Index('ix_archived_swap_requests_swap', 'swap_id'))
+
+    sender: Mapped['User'] = _to_one('User', 'ArchivedSwapRequest.sender_id')
+    recipient: Mapped['User'] = _to_one('User', 'ArchivedSwapRequest.recipient_id')
+    swap: Mapped[ArchivedSwap] = _to_one('ArchivedSwap', 'ArchivedSwapRequest.swap_id')
+    sender_skill: Mapped['Skill'] = _to_one('Skill', 'ArchivedSwapRequest.sender_skill_id')
+    recipient_skill: Mapped['Skill'] = _to_one('Skill', 'ArchivedSwapRequest.recipient_skill_id')
+
+
+class ArchivedDiscussRequest(Base):
+    __table__ = _archive_table(DiscussRequest.__table__, Index('ix_archived_discuss_requests_swap', 'swap_id'))
+
+    sender: Mapped['User'] = _to_one('User', 'ArchivedDiscussRequest.sender_id')
+    recipient: Mapped['User'] = _to_one('User', 'ArchivedDiscussRequest.recipient_id')
+    swap: Mapped[ArchivedSwap] = _to_one('ArchivedSwap', 'ArchivedDiscussRequest.swap_id')
+    sender_skill: Mapped['Skill'] = _to_one('Skill', 'ArchivedDiscussRequest.sender_skill_id')
+    recipient_skill: Mapped['Skill'] = _to_one('Skill', 'ArchivedDiscussRequest.recipient_skill_id')
+    swap_conversation: Mapped['ArchivedSwapConversation'] = relationship(
+        'ArchivedSwapConversation',
+        primaryjoin='foreign(ArchivedSwapConversation.discuss_request_id) == ArchivedDiscussRequest.id',
+        uselist=False, viewonly=True)
+
+
+class ArchivedSwapConversation(Base):
+    __table__ = _archive_table(
+        SwapConversation.__table__,
+        Index('ix_archived_swap_conversations_discuss_request', 'discuss_request_id'),
+    )
+
+    swap: Mapped[ArchivedSwap] = _to_one('ArchivedSwap', 'ArchivedSwapConversation.swap_id')
+    discuss_request: Mapped[ArchivedDiscussRequest] = _to_one(
+        'ArchivedDiscussRequest', 'ArchivedSwapConversation.discuss_request_id')
+    sender: Mapped['User'] = _to_one('User', 'ArchivedSwapConversation.sender_id')
+    recipient: Mapped['User'] = _to_one('User', 'ArchivedSwapConversation.recipient_id')
+    messages: Mapped[list['ArchivedSwapMessage']] = relationship(
+        'ArchivedSwapMessage',
+        primaryjoin='foreign(ArchivedSwapMessage.conversation_id) == ArchivedSwapConversation.id',
+        order_by='ArchivedSwapMessage.seq', viewonly=True)
+
+    participants = SwapConversation.participants
+    both_accepted = SwapConversation.both_accepted
+    get_user_acceptance_status = SwapConversation.get_user_acceptance_status
+
+
+class ArchivedSwapMessage(Base):
+    __table__ = _archive_table(
+        SwapMessage.__table__,
+        Index('ix_archived_swap_messages_conversation_timestamp', 'conversation_id', 'timestamp'),
+        Index('ux_archived_swap_messages_conversation_seq', 'conversation_id', 'seq', unique=True),
+    )
+
+    conversation: Mapped[ArchivedSwapConversation] = _to_one(
+        'ArchivedSwapConversation', 'ArchivedSwapMessage.conversation_id')
+    sender: Mapped['User'] = _to_one('User', 'ArchivedSwapMessage.sender_id')
+    recipient: Mapped['User'] = _to_one('User', 'ArchivedSwapMessage.recipient_id')
+
+    preview = SwapMessage.preview
@@ -1,11 +1,97 @@
+import os
+import threading
+import time
+import uuid
+from datetime import timezone
+
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import LargeBinary
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.types import TypeDecorator
+
+from .routing import RoutingSession
 
 class Base(DeclarativeBase):
     pass
 
-db = SQLAlchemy(model_class=Base)
+db = SQLAlchemy(model_class=Base, session_options={'class_': RoutingSession})
+
+# Bound in place of malformed ids (e.g. from a URL): never generated, so it matches nothing
+NIL_UUID = uuid.UUID(int=0)
+
+_uuid7_lock = threading.Lock()
+_uuid7_last_ms = 0
+_uuid7_counter = 0
+
+def uuid7():
+    """
+    Time-ordered UUID (RFC 9562 version 7).
+
+    48-bit Unix millisecond timestamp, then 74 random bits. Within one
+    millisecond the 12-bit rand_a field is a counter, so keys generated by
+    a process are strictly increasing and land at the right edge of the
+    B-tree instead of a random page.
+    """
+    global _uuid7_last_ms, _uuid7_counter
+    with _uuid7_lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _uuid7_last_ms:
+            # Start low in the counter space so a busy millisecond can't overflow it
+            _uuid7_last_ms, _uuid7_counter = ms, int.from_bytes(os.urandom(2), 'big') & 0x7FF
+        else:
+            _uuid7_counter += 1
+            if _uuid7_counter > 0xFFF:
+                _uuid7_last_ms, _uuid7_counter = _uuid7_last_ms + 1, 0
+        ms, counter = _uuid7_last_ms, _uuid7_counter
+    rand_b = int.from_bytes(os.urandom(8), 'big') & ((1 << 62) - 1)
+    return uuid.UUID(int=(ms << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | rand_b)
 
 def generate_uuid():
-    import uuid
-    return str(uuid.uuid4())
+    return str(uuid7())
+
+def naive_utc(value):
+    """Comparable form of a timestamp: SQLite hands back naive UTC for values written aware"""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def _as_uuid(value):
+    if isinstance(value, uuid.UUID):
+        return value
+    if isinstance(value, bytes) and len(value) == 16:
+        return uuid.UUID(bytes=value)
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return NIL_UUID
+
+class UUIDKey(TypeDecorator):
+    """
+    Primary and foreign key type.
+
+    Stored as native UUID on PostgreSQL and as a 16-byte BLOB elsewhere
+    (SQLite), instead of 36 characters of text. Python code keeps seeing
+    the canonical string form, so ids still round-trip through sessions,
+    URLs and JSON unchanged.
+    """
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            from sqlalchemy.dialects import postgresql  # already loaded by the engine on PostgreSQL
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        key = _as_uuid(value)
+        return key if dialect.name == 'postgresql' else key.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, bytes):
+            return str(uuid.UUID(bytes=value))
+        return str(value)
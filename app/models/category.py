@@ -1,10 +1,10 @@
-from .base import Base, generate_uuid
+from .base import Base, UUIDKey, generate_uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy import String
 
 class Category(Base):
     __tablename__ = "categories"
-    id: Mapped[str] = mapped_column(String, primary_key=True, default=generate_uuid)
+    id: Mapped[str] = mapped_column(UUIDKey, primary_key=True, default=generate_uuid)
     name: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
 
     skills: Mapped[list['Skill']] = relationship('Skill', back_populates='category')
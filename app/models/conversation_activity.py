@@ -0,0 +1,120 @@
+# app/models/conversation_activity.py
+"""
+Keeps each conversation's inbox columns in step with its messages.
+
+A before_flush hook folds every message added or deleted in the flush into
+SwapConversation.message_count, first_message_at, last_message_at and
+last_message_preview, so they are written in the same transaction as the
+messages. The count is
+incremented in SQL (message_count = message_count + n) rather than from the
+loaded value, so concurrent senders cannot lose an update.
+
+The same hook numbers new messages: each conversation hands out seq
+values from last_message_seq. For a stored conversation, one UPDATE ...
+RETURNING moves message_count and last_message_seq together. That UPDATE
+locks the conversation row until commit, so concurrent senders in one chat
+take consecutive numbers, and a rolled back send gives its numbers back,
+leaving no gaps.
+
+Deleting a message only moves the count (the first/last times stay a valid
+window around the messages); `flask recompute-conversation-activity`
+rebuilds every column from the messages.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from .base import naive_utc
+from .swap_conversation import SwapConversation
+from .swap_message import SwapMessage
+
+
+def _message_deltas(session):
+    """conversation id -> (message count delta, newest and oldest message added, messages needing a seq)."""
+    deltas = defaultdict(lambda: [0, None, None, []])
+    for obj in session.new:
+        if isinstance(obj, SwapMessage) and obj.conversation_id:
+            if obj.timestamp is None:
+                obj.timestamp = datetime.now(timezone.utc)
+            delta = deltas[obj.conversation_id]
+            delta[0] += 1
+            if obj.seq is None:
+                delta[3].append(obj)
+            if delta[1] is None or naive_utc(obj.timestamp) >= naive_utc(delta[1].timestamp):
+                delta[1] = obj
+            if delta[2] is None or naive_utc(obj.timestamp) < naive_utc(delta[2].timestamp):
+                delta[2] = obj
+    for obj in session.deleted:
+        if isinstance(obj, SwapMessage) and obj.conversation_id:
+            deltas[obj.conversation_id][0] -= 1
+    return deltas
+
+
+def _window_changes(conversation, newest, oldest):
+    """Column values moving the conversation's first/last message to take in this flush's messages."""
+    changes = {}
+    if newest is not None and (
+        conversation.last_message_at is None
+        or naive_utc(newest.timestamp) >= naive_utc(conversation.last_message_at)
+    ):
+        changes['last_message_at'] = newest.timestamp
+        changes['last_message_preview'] = newest.preview
+    if oldest is not None and (
+        conversation.first_message_at is None
+        or naive_utc(oldest.timestamp) < naive_utc(conversation.first_message_at)
+    ):
+        changes['first_message_at'] = oldest.timestamp
+    return changes
+
+
+def _allocate(session, conversation, count, numbers, changes):
+    """
+    Reserve `numbers` seq values for the stored conversation, moving its message count by
+    `count` and applying `changes`, in one UPDATE that locks the row until commit.
+    """
+    message_count, last_seq = session.execute(
+        update(SwapConversation)
+        .where(SwapConversation.id == conversation.id)
+        .values(message_count=SwapConversation.message_count + count,
+                last_message_seq=SwapConversation.last_message_seq + numbers,
+                **changes)
+        .returning(SwapConversation.message_count, SwapConversation.last_message_seq),
+        execution_options={'synchronize_session': False},
+    ).one()
+    changes.update(message_count=message_count, last_message_seq=last_seq)
+    for key, value in changes.items():
+        set_committed_value(conversation, key, value)
+
+
+def _before_flush(session, flush_context, instances):
+    with session.no_autoflush:
+        for conversation_id, (count, newest, oldest, unnumbered) in _message_deltas(session).items():
+            conversation = session.get(SwapConversation, conversation_id)
+            if conversation is None or conversation in session.deleted:
+                continue
+            changes = _window_changes(conversation, newest, oldest)
+            if conversation in session.new:
+                conversation.message_count = (conversation.message_count or 0) + count
+                conversation.last_message_seq = (conversation.last_message_seq or 0) + len(unnumbered)
+            elif unnumbered:
+                _allocate(session, conversation, count, len(unnumbered), changes)
+                changes = {}
+            elif count:
+                conversation.message_count = SwapConversation.message_count + count
+            for key, value in changes.items():
+                setattr(conversation, key, value)
+
+            if unnumbered:
+                # Oldest first, ending at the conversation's new last_message_seq
+                unnumbered.sort(key=lambda message: naive_utc(message.timestamp))
+                first_seq = conversation.last_message_seq - len(unnumbered) + 1
+                for seq, message in enumerate(unnumbered, first_seq):
+                    message.seq = seq
+
+
+if not event.contains(Session, 'before_flush', _before_flush):
+    event.listen(Session, 'before_flush', _before_flush)
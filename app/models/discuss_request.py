@@ -1,20 +1,26 @@
-from .base import Base, generate_uuid
+from .base import Base, UUIDKey, generate_uuid
 from .enums import RequestStatus
+from .transitions import REQUEST_TRANSITIONS, check_transition
 from datetime import datetime, timezone
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, DateTime, ForeignKey, Enum
+from sqlalchemy import DateTime, ForeignKey, Enum, Index
 
 
 class DiscussRequest(Base):
     __tablename__ = 'discuss_requests'
+    __table_args__ = (
+        Index('ix_discuss_requests_sender_recipient_swap', 'sender_id', 'recipient_id', 'swap_id'),
+        Index('ix_discuss_requests_recipient', 'recipient_id'),
+        Index('ix_discuss_requests_swap_status', 'swap_id', 'status'),
+    )
 
-    id: Mapped[str] = mapped_column(String, primary_key=True, default=generate_uuid)
-    sender_id: Mapped[str] = mapped_column(String, ForeignKey('users.id'), nullable=False)
-    recipient_id: Mapped[str] = mapped_column(String, ForeignKey('users.id'), nullable=False)
-    swap_id: Mapped[str] = mapped_column(String, ForeignKey('swaps.id'), nullable=False)
+    id: Mapped[str] = mapped_column(UUIDKey, primary_key=True, default=generate_uuid)
+    sender_id: Mapped[str] = mapped_column(UUIDKey, ForeignKey('users.id'), nullable=False)
+    recipient_id: Mapped[str] = mapped_column(UUIDKey, ForeignKey('users.id'), nullable=False)
+    swap_id: Mapped[str] = mapped_column(UUIDKey, ForeignKey('swaps.id'), nullable=False)
 
-    sender_skill_id: Mapped[str] = mapped_column(String, ForeignKey('skills.id'), nullable=False)
-    recipient_skill_id: Mapped[str] = mapped_column(String, ForeignKey('skills.id'), nullable=False)
+    sender_skill_id: Mapped[str] = mapped_column(UUIDKey, ForeignKey('skills.id'), nullable=False)
+    recipient_skill_id: Mapped[str] = mapped_column(UUIDKey, ForeignKey('skills.id'), nullable=False)
 
     status: Mapped[RequestStatus] = mapped_column(Enum(RequestStatus), default=RequestStatus.pending)
     timestamp: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
@@ -33,26 +39,21 @@ class DiscussRequest(Base):
     sender_skill: Mapped['Skill'] = relationship('Skill', foreign_keys=[sender_skill_id])
     recipient_skill: Mapped['Skill'] = relationship('Skill', foreign_keys=[recipient_skill_id])
 
+    def _move_to(self, status):
+        check_transition(REQUEST_TRANSITIONS, self.status or RequestStatus.pending, status, type(self).__name__)
+        self.status = status
+
     def accept(self):
-        """Accept the discuss request and update related statuses"""
-        self.status = RequestStatus.accepted
-        # Update the swap status
-        if self.swap:
-            self.swap.update_status()
+        """Accept the discuss request; the swap's counters and status follow at flush"""
+        self._move_to(RequestStatus.accepted)
 
     def reject(self):
-        """Reject the discuss request and update related statuses"""
-        self.status = RequestStatus.rejected
-        # Update the swap status
-        if self.swap:
-            self.swap.update_status()
+        """Reject the discuss request; the swap's counters and status follow at flush"""
+        self._move_to(RequestStatus.rejected)
 
     def cancel(self):
-        """Cancel the discuss request and update related statuses"""
-        self.status = RequestStatus.cancelled
-        # Update the swap status
-        if self.swap:
-            self.swap.update_status()
+        """Cancel the discuss request; the swap's counters and status follow at flush"""
+        self._move_to(RequestStatus.cancelled)
 
     def __repr__(self):
         return f"<DiscussRequest from {self.sender_id} to {self.recipient_id} for swap {self.swap_id} status={self.status}>"
\ No newline at end of file
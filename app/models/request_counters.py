@@ -0,0 +1,114 @@
+# app/models/request_counters.py
+"""
+Keeps each swap's request counters in step with request status changes.
+
+A before_flush hook moves the counters by the delta of every request
+status change in the flush, including inserts and deletes, whether it came
+from accept()/reject()/cancel() or a direct assignment. New swap requests
+also bump Swap.last_request_at. Illegal changes
+raise InvalidTransition from inside the flush, so nothing is written.
+
+The counters of a stored swap are moved in SQL (pending_requests =
+pending_requests + n) by one UPDATE ... RETURNING per swap, and the status
+is derived from the returned values. That UPDATE locks the swap row until
+commit, so concurrent transitions on one swap queue up instead of losing
+each other's counts. `flask recompute-swap-statuses` rebuilds the counters
+from the requests.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from sqlalchemy import event, inspect, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from .enums import RequestStatus
+from .swap import Swap
+from .swap_request import SwapRequest
+from .discuss_request import DiscussRequest
+from .transitions import (
+    REQUEST_TRANSITIONS, SWAP_TRANSITIONS, SWAP_REQUEST_COUNTERS, DISCUSS_REQUEST_COUNTERS, check_transition,
+)
+
+
+def _committed_status(obj):
+    history = inspect(obj).attrs.status.history
+    if history.deleted:
+        return history.deleted[0]
+    return obj.status
+
+
+def _status_changes(session):
+    """(request, old status, new status) for every request touched by this flush."""
+    for obj in session.new:
+        if isinstance(obj, (SwapRequest, DiscussRequest)):
+            yield obj, None, obj.status or RequestStatus.pending
+    for obj in session.dirty:
+        if isinstance(obj, (SwapRequest, DiscussRequest)):
+            history = inspect(obj).attrs.status.history
+            if history.deleted and history.added:
+                yield obj, history.deleted[0], history.added[0]
+    for obj in session.deleted:
+        if isinstance(obj, (SwapRequest, DiscussRequest)):
+            yield obj, _committed_status(obj), None
+
+
+COUNTERS = ('pending_requests', 'accepted_requests', 'closed_requests', 'accepted_discussions')
+
+
+def move_counters(session, swap, deltas, **values):
+    """
+    Move the stored swap's counters by `deltas` (counter -> change) and apply `values`
+    in one UPDATE that locks the row until commit; returns the swap's new counters.
+    """
+    counters = session.execute(
+        update(Swap)
+        .where(Swap.id == swap.id)
+        .values(**{name: getattr(Swap, name) + delta for name, delta in deltas.items()}, **values)
+        .returning(*(getattr(Swap, name) for name in COUNTERS)),
+        execution_options={'synchronize_session': False},
+    ).one()
+    for name, value in zip(COUNTERS, counters):
+        set_committed_value(swap, name, value)
+    for name, value in values.items():
+        set_committed_value(swap, name, value)
+    return counters
+
+
+def _before_flush(session, flush_context, instances):
+    # Direct assignments to Swap.status (e.g. completing a swap) are checked too
+    for obj in session.dirty:
+        if isinstance(obj, Swap):
+            history = inspect(obj).attrs.status.history
+            if history.deleted and history.added:
+                check_transition(SWAP_TRANSITIONS, history.deleted[0], history.added[0], 'Swap')
+
+    with session.no_autoflush:
+        deltas = defaultdict(lambda: defaultdict(int))
+        for obj, old, new in _status_changes(session):
+            check_transition(REQUEST_TRANSITIONS, old, new, type(obj).__name__)
+            swap = obj.swap or (session.get(Swap, obj.swap_id) if obj.swap_id else None)
+            if swap is None or old == new:
+                continue
+            counters = SWAP_REQUEST_COUNTERS if isinstance(obj, SwapRequest) else DISCUSS_REQUEST_COUNTERS
+            if counters.get(old):
+                deltas[swap][counters[old]] -= 1
+            if counters.get(new):
+                deltas[swap][counters[new]] += 1
+            if old is None and isinstance(obj, SwapRequest):
+                swap.note_request(obj.timestamp or datetime.now(timezone.utc))
+
+        for swap, moves in deltas.items():
+            moves = {name: delta for name, delta in moves.items() if delta}
+            if not moves or swap in session.deleted:
+                continue
+            if swap in session.new:
+                swap.move_counters(moves)
+            else:
+                move_counters(session, swap, moves)
+                swap.update_status()
+
+
+if not event.contains(Session, 'before_flush', _before_flush):
+    event.listen(Session, 'before_flush', _before_flush)
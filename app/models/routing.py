@@ -0,0 +1,47 @@
+# app/models/routing.py
+"""
+Session that sends read-only requests to read replicas.
+
+Views marked with @read_only (app/services/replicas.py) flag GET/HEAD
+requests in `g`. While a request is flagged, reads that would go to the
+default engine are handed a replica from the app's ReplicaPool instead. The
+replica is chosen once per session (one per request) and kept in
+session.info, so a request's reads see one consistent replica and the pool
+is not consulted per statement.
+Flushes and INSERT/UPDATE/DELETE statements always go to the primary, and
+once a session has written, every later read in it goes to the primary too,
+so a request always sees its own writes.
+"""
+
+from flask import current_app, g, has_request_context
+from flask_sqlalchemy.session import Session
+
+
+def mark_read_only():
+    """Let the current request read from replicas."""
+    g.read_only = True
+
+
+def _replica_pool():
+    if not (has_request_context() and g.get('read_only')):
+        return None
+    return current_app.extensions.get('replicas')
+
+
+class RoutingSession(Session):
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if self._flushing or getattr(clause, 'is_dml', False):
+            self.info['wrote'] = True
+            return engine
+        if bind is not None or self.info.get('wrote') or engine is not self._db.engine:
+            return engine
+
+        if 'replica' not in self.info:
+            pool = _replica_pool()
+            if pool is None:
+                return engine
+            self.info['replica'] = pool.choose()
+        replica = self.info['replica']
+        return replica if replica is not None else engine
@@ -1,17 +1,17 @@
 from __future__ import annotations
 
-from .base import Base, generate_uuid
+from .base import Base, UUIDKey, generate_uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Text, ForeignKey, UniqueConstraint
+from sqlalchemy import Text, ForeignKey, UniqueConstraint
 
 class Skill(Base):
     __tablename__ = "skills"
     __table_args__ = (UniqueConstraint('user_id', 'skill_name_id', name='uq_user_skill'),)
 
-    id: Mapped[str] = mapped_column(String, primary_key=True, default=generate_uuid)
-    user_id: Mapped[str] = mapped_column(String, ForeignKey('users.id'), nullable=False)
-    skill_name_id: Mapped[str] = mapped_column(String, ForeignKey('skill_names.id'), nullable=False)
-    category_id: Mapped[str] = mapped_column(String, ForeignKey('categories.id'), nullable=False)
+    id: Mapped[str] = mapped_column(UUIDKey, primary_key=True, default=generate_uuid)
+    user_id: Mapped[str] = mapped_column(UUIDKey, ForeignKey('users.id'), nullable=False)
+    skill_name_id: Mapped[str] = mapped_column(UUIDKey, ForeignKey('skill_names.id'), nullable=False)
+    category_id: Mapped[str] = mapped_column(UUIDKey, ForeignKey('categories.id'), nullable=False)
     description: Mapped[str] = mapped_column(Text, nullable=False)
 
     # relationships - use string names here to avoid circular imports
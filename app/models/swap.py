@@ -1,22 +1,34 @@
 # app/models/swap.py
 from datetime import datetime, timezone
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Text, DateTime, ForeignKey, Enum
+from sqlalchemy import Text, DateTime, ForeignKey, Enum, Index, Integer
 
-from .base import Base, generate_uuid
-from .enums import SwapStatus, RequestStatus
+from .base import Base, UUIDKey, generate_uuid, naive_utc
+from .enums import SwapStatus
+from .transitions import SWAP_TRANSITIONS, check_transition, derive_swap_status
 
 class Swap(Base):
     __tablename__ = 'swaps'
+    __table_args__ = (
+        Index('ix_swaps_status_desired_skill_name', 'status', 'desired_skill_name_id'),
+        Index('ix_swaps_user', 'user_id'),
+    )
 
-    id: Mapped[str] = mapped_column(String, primary_key=True, default=generate_uuid)
-    user_id: Mapped[str] = mapped_column(String, ForeignKey('users.id'), nullable=False)
-    offered_skill_id: Mapped[str] = mapped_column(String, ForeignKey('skills.id'), nullable=False)
-    desired_skill_name_id: Mapped[str] = mapped_column(String, ForeignKey('skill_names.id'), nullable=False)
+    id: Mapped[str] = mapped_column(UUIDKey, primary_key=True, default=generate_uuid)
+    user_id: Mapped[str] = mapped_column(UUIDKey, ForeignKey('users.id'), nullable=False)
+    offered_skill_id: Mapped[str] = mapped_column(UUIDKey, ForeignKey('skills.id'), nullable=False)
+    desired_skill_name_id: Mapped[str] = mapped_column(UUIDKey, ForeignKey('skill_names.id'), nullable=False)
     description: Mapped[str] = mapped_column(Text, nullable=False)
     timestamp: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
     status: Mapped[SwapStatus] = mapped_column(Enum(SwapStatus), default=SwapStatus.open)
 
+    # Request tallies maintained on every request transition (see request_counters.py)
+    pending_requests: Mapped[int] = mapped_column(Integer, default=0, server_default='0')
+    accepted_requests: Mapped[int] = mapped_column(Integer, default=0, server_default='0')
+    closed_requests: Mapped[int] = mapped_column(Integer, default=0, server_default='0')  # rejected or cancelled
+    accepted_discussions: Mapped[int] = mapped_column(Integer, default=0, server_default='0')
+    last_request_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)  # newest swap request
+
     # Relationships — use string names here
     user: Mapped['User'] = relationship('User', back_populates='swaps')
     offered_skill: Mapped['Skill'] = relationship('Skill', foreign_keys=[offered_skill_id])
@@ -25,43 +37,34 @@ class Swap(Base):
     swap_requests: Mapped[list['SwapRequest']] = relationship('SwapRequest', back_populates='swap')
     discuss_requests: Mapped[list['DiscussRequest']] = relationship('DiscussRequest', back_populates='swap')
 
+    def move_counters(self, deltas):
+        """Move the counters of a swap not stored yet by `deltas` and re-derive the status"""
+        for name, delta in deltas.items():
+            setattr(self, name, (getattr(self, name) or 0) + delta)
+        self.update_status()
+
+    def note_request(self, at):
+        """Record a new swap request made at `at`"""
+        if self.last_request_at is None or naive_utc(at) > naive_utc(self.last_request_at):
+            self.last_request_at = at
+
     def update_status(self):
-        """Automatically update swap status based on its requests"""
-        if not self.swap_requests:
-            self.status = SwapStatus.open
-            return
-        
-        # Check if any swap request is accepted
-        accepted_requests = [req for req in self.swap_requests if req.status == RequestStatus.accepted]
-        if accepted_requests:
-            self.status = SwapStatus.in_discussion
-            return
-        
-        # Check if all requests are rejected or cancelled
-        all_rejected_or_cancelled = all(
-            req.status in [RequestStatus.rejected, RequestStatus.cancelled] 
-            for req in self.swap_requests
+        """Derive the status from the request counters, without loading any requests"""
+        status = derive_swap_status(
+            self.status,
+            self.pending_requests or 0,
+            self.accepted_requests or 0,
+            self.closed_requests or 0,
+            self.accepted_discussions or 0,
         )
-        if all_rejected_or_cancelled and self.swap_requests:
-            self.status = SwapStatus.cancelled
-            return
-        
-        # Check if any discuss request is accepted
-        accepted_discuss = [req for req in self.discuss_requests if req.status == RequestStatus.accepted]
-        if accepted_discuss:
-            self.status = SwapStatus.in_discussion
-            return
-        
-        # Default to open if there are pending requests
-        self.status = SwapStatus.open
+        check_transition(SWAP_TRANSITIONS, self.status, status, 'Swap')
+        self.status = status
 
     @classmethod
     def update_all_statuses(cls, db_session):
-        """Update status for all swaps in the database"""
-        swaps = db_session.execute(db.select(cls)).scalars().all()
-        for swap in swaps:
-            swap.update_status()
-        db_session.commit()
+        """Update status for all swaps in the database (set-based, in id-range chunks)"""
+        from app.services.swap_status import recompute_swap_statuses
+        return recompute_swap_statuses(db_session)
 
     def __repr__(self):
         return f"<Swap offering skill {self.offered_skill.skill_name.name} for {self.desired_skill_name.name}>"
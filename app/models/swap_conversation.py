@@ -1,22 +1,36 @@
 from __future__ import annotations  # defer type hints evaluation
 
-from .base import Base, generate_uuid
+from .base import Base, UUIDKey, generate_uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, ForeignKey, Boolean
+from sqlalchemy import String, ForeignKey, Boolean, Index, Integer, DateTime
+from datetime import datetime
+from .swap_message import PREVIEW_LENGTH
 
 class SwapConversation(Base):
     __tablename__ = 'swap_conversations'
+    __table_args__ = (
+        Index('ix_swap_conversations_sender', 'sender_id'),
+        Index('ix_swap_conversations_recipient', 'recipient_id'),
+        Index('ix_swap_conversations_discuss_request', 'discuss_request_id'),
+    )
 
-    id: Mapped[str] = mapped_column(String, primary_key=True, default=generate_uuid)
-    swap_id: Mapped[str] = mapped_column(String, ForeignKey('swaps.id'), nullable=False)
-    sender_id: Mapped[str] = mapped_column(String, ForeignKey('users.id'), nullable=False)  # person who started the convo
-    recipient_id: Mapped[str] = mapped_column(String, ForeignKey('users.id'), nullable=False)  # person who made the swap
-    discuss_request_id: Mapped[str] = mapped_column(String, ForeignKey('discuss_requests.id'), nullable=True)  # new column
+    id: Mapped[str] = mapped_column(UUIDKey, primary_key=True, default=generate_uuid)
+    swap_id: Mapped[str] = mapped_column(UUIDKey, ForeignKey('swaps.id'), nullable=False)
+    sender_id: Mapped[str] = mapped_column(UUIDKey, ForeignKey('users.id'), nullable=False)  # person who started the convo
+    recipient_id: Mapped[str] = mapped_column(UUIDKey, ForeignKey('users.id'), nullable=False)  # person who made the swap
+    discuss_request_id: Mapped[str] = mapped_column(UUIDKey, ForeignKey('discuss_requests.id'), nullable=True)  # new column
     
     # Acceptance tracking
     sender_accepted: Mapped[bool] = mapped_column(Boolean, default=False)
     recipient_accepted: Mapped[bool] = mapped_column(Boolean, default=False)
 
+    # Inbox summary maintained as messages are written (see conversation_activity.py)
+    message_count: Mapped[int] = mapped_column(Integer, default=0, server_default='0')
+    last_message_seq: Mapped[int] = mapped_column(Integer, default=0, server_default='0', nullable=False)  # seq allocator
+    first_message_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)  # bounds history reads by timestamp
+    last_message_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    last_message_preview: Mapped[str] = mapped_column(String(PREVIEW_LENGTH), nullable=True)
+
     swap: Mapped["Swap"] = relationship("Swap", back_populates="swap_conversations")
 
     discuss_request: Mapped["DiscussRequest"] = relationship(
@@ -31,7 +45,8 @@ class SwapConversation(Base):
     messages: Mapped[list["SwapMessage"]] = relationship(
         "SwapMessage",
         back_populates="conversation",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        order_by="SwapMessage.seq"
     )
 
     @property
@@ -1,22 +1,62 @@
 from __future__ import annotations  # defer type hints evaluation
 
-from .base import Base, generate_uuid
+from .base import Base, UUIDKey, generate_uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Text, DateTime, ForeignKey, Enum
+from sqlalchemy import Text, DateTime, ForeignKey, Enum, Index, Integer
 from datetime import datetime, timezone
 from .enums import MessageType
 
+# Characters of a message kept on its conversation for inbox listings
+PREVIEW_LENGTH = 120
+
+
+def _unpartitioned(ddl, target, bind, **kw):
+    # A unique index on a partitioned table must include the partition column
+    return kw['dialect'].name != 'postgresql'
+
+
 class SwapMessage(Base):
+    """
+    A chat message.
+
+    On PostgreSQL the table is range-partitioned by month on timestamp (see
+    services/message_partitions.py), which is why timestamp is part of the
+    table's primary key; the ORM still identifies messages by id alone.
+    SQLite keeps one plain table with the same columns and key.
+
+    seq numbers a conversation's messages 1, 2, 3... in the order they were
+    stored, with no gaps; it is allocated from
+    SwapConversation.last_message_seq at flush (see conversation_activity.py).
+    (conversation_id, seq) is unique: in one index on SQLite, and in one
+    index per monthly partition on PostgreSQL, where the allocator's row lock
+    on the conversation keeps it unique across partitions.
+    """
     __tablename__ = 'swap_messages'
+    __table_args__ = (
+        Index('ix_swap_messages_conversation_timestamp', 'conversation_id', 'timestamp'),
+        Index('ux_swap_messages_conversation_seq', 'conversation_id', 'seq', unique=True).ddl_if(
+            callable_=_unpartitioned),
+        {'postgresql_partition_by': 'RANGE (timestamp)'},
+    )
 
-    id: Mapped[str] = mapped_column(String, primary_key=True, default=generate_uuid)
-    conversation_id: Mapped[str] = mapped_column(String, ForeignKey('swap_conversations.id'))
-    sender_id: Mapped[str] = mapped_column(String, ForeignKey('users.id'))
-    recipient_id: Mapped[str] = mapped_column(String, ForeignKey('users.id'))  # person who made the swap
+    id: Mapped[str] = mapped_column(UUIDKey, primary_key=True, default=generate_uuid)
+    conversation_id: Mapped[str] = mapped_column(UUIDKey, ForeignKey('swap_conversations.id'))
+    sender_id: Mapped[str] = mapped_column(UUIDKey, ForeignKey('users.id'))
+    recipient_id: Mapped[str] = mapped_column(UUIDKey, ForeignKey('users.id'))  # person who made the swap
+    seq: Mapped[int] = mapped_column(Integer, nullable=False)  # position in the conversation, from 1
     content: Mapped[str] = mapped_column(Text, nullable=False)
-    timestamp: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
+    timestamp: Mapped[datetime] = mapped_column(DateTime, primary_key=True, default=lambda: datetime.now(timezone.utc))
     type: Mapped[MessageType] = mapped_column(Enum(MessageType), default=MessageType.TEXT, nullable=False)
 
+    __mapper_args__ = {'primary_key': [id]}
+
     conversation: Mapped["SwapConversation"] = relationship("SwapConversation", back_populates="messages")
     sender: Mapped["User"] = relationship("User", foreign_keys=[sender_id])
     recipient: Mapped["User"] = relationship("User", foreign_keys=[recipient_id])
+
+    @property
+    def preview(self):
+        """Short inbox text: the start of a text message, or a placeholder for attachments"""
+        if self.type in (None, MessageType.TEXT):
+            return self.content[:PREVIEW_LENGTH]
+        return f"[{self.type.value.lower()}]"
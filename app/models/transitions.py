@@ -0,0 +1,65 @@
+# app/models/transitions.py
+"""
+Declarative status transitions for requests and swaps.
+
+Every swap keeps counters of its swap requests by status bucket plus its
+accepted discuss requests (see request_counters.py), so a swap's status is
+derived from four integers instead of scanning its sibling requests.
+Transitions outside the tables below raise InvalidTransition before
+anything is written.
+"""
+
+from .enums import RequestStatus, SwapStatus
+
+
+class InvalidTransition(ValueError):
+    """A status change that the transition table does not allow."""
+
+
+REQUEST_TRANSITIONS = {
+    RequestStatus.pending: frozenset({RequestStatus.accepted, RequestStatus.rejected, RequestStatus.cancelled}),
+    RequestStatus.accepted: frozenset({RequestStatus.cancelled}),
+    RequestStatus.rejected: frozenset({RequestStatus.cancelled}),
+    RequestStatus.cancelled: frozenset(),
+}
+
+SWAP_TRANSITIONS = {
+    SwapStatus.open: frozenset({SwapStatus.in_discussion, SwapStatus.cancelled, SwapStatus.completed}),
+    SwapStatus.in_discussion: frozenset({SwapStatus.open, SwapStatus.cancelled, SwapStatus.completed}),
+    SwapStatus.cancelled: frozenset({SwapStatus.open, SwapStatus.in_discussion, SwapStatus.completed}),
+    SwapStatus.completed: frozenset(),
+}
+
+# Swap counter each request status is tallied in, per request kind
+SWAP_REQUEST_COUNTERS = {
+    RequestStatus.pending: 'pending_requests',
+    RequestStatus.accepted: 'accepted_requests',
+    RequestStatus.rejected: 'closed_requests',
+    RequestStatus.cancelled: 'closed_requests',
+}
+DISCUSS_REQUEST_COUNTERS = {
+    RequestStatus.accepted: 'accepted_discussions',
+}
+
+
+def check_transition(table, old, new, what):
+    """Raise InvalidTransition unless old -> new is allowed (same-status moves are no-ops)."""
+    if old is None or new is None or old == new:
+        return
+    if new not in table[old]:
+        raise InvalidTransition(f"{what} cannot go from {old.value} to {new.value}")
+
+
+def derive_swap_status(current, pending, accepted, closed, accepted_discussions):
+    """A swap's status from its counters, in O(1); completed is final."""
+    if current == SwapStatus.completed:
+        return current
+    if pending + accepted + closed == 0:
+        return SwapStatus.open
+    if accepted:
+        return SwapStatus.in_discussion
+    if not pending:
+        return SwapStatus.cancelled
+    if accepted_discussions:
+        return SwapStatus.in_discussion
+    return SwapStatus.open
@@ -3,25 +3,16 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy import String, DateTime
 from datetime import datetime, timezone
 
-from .base import Base  # import the Base class
+from .base import Base, UUIDKey, generate_uuid  # import the Base class and shared key type
 from .base import db    # import the SQLAlchemy instance
 from .enums import RequestStatus, SwapStatus, MessageType  # import enums separately
 
-from .skill import Skill
-from .swap import Swap
-from .swap_request import SwapRequest
-from .discuss_request import DiscussRequest
-from .swap_conversation import SwapConversation
-
-import uuid
-
-def generate_uuid() -> str:
-    return str(uuid.uuid4())
+# Related models are referenced by name; app.models imports them all
 
 class User(Base):
     __tablename__ = "users"
 
-    id: Mapped[str] = mapped_column(String, primary_key=True, default=generate_uuid)
+    id: Mapped[str] = mapped_column(UUIDKey, primary_key=True, default=generate_uuid)
     name: Mapped[str] = mapped_column(String(60), nullable=False)
     email: Mapped[str] = mapped_column(String(60), unique=True, nullable=False, index=True)
     password: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -9,9 +9,13 @@ def register_routes(app):
     from .chat_routes import chat_bp
     from .skill_routes import skill_bp
     from .request_routes import request_bp
+    from .api_routes import api_bp
+    from .search_routes import search_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(dashboard_bp)
     app.register_blueprint(chat_bp)
     app.register_blueprint(skill_bp)
     app.register_blueprint(request_bp)
+    app.register_blueprint(api_bp)
+    app.register_blueprint(search_bp)
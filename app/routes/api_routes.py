@@ -0,0 +1,231 @@
+# routes/api_routes.py
+
+from flask import Blueprint, current_app, request, session, jsonify
+from app.models import db, User, Skill, Swap, SwapRequest, DiscussRequest, SwapConversation, SwapStatus, RequestStatus
+from app.services.dashboard_loader import (
+    swap_stream_select, swap_load_options, request_load_options, swap_view, request_view,
+)
+from app.services.pagination import keyset_page, page_size, InvalidCursor
+from app.services.dashboard_cache import dashboard_cache
+from app.services.reference_data import reference_data
+from app.services.trade_cycles import suggested_rings
+from app.services.autocomplete import skill_autocomplete
+from app.services.replicas import read_only
+from app.services.db_pool import pool_stats
+from app.services.archive import find, is_archived
+from app.services.chat_history import latest_page, messages_after_seq, messages_since
+from app.services.chat_messages import is_participant, message_view
+
+api_bp = Blueprint('api', __name__, url_prefix='/api')
+
+def get_current_user():
+    user_id = session.get('user_id')
+    return db.session.get(User, user_id) if user_id else None
+
+def _parse_status(enum_cls):
+    """Return the enum member for ?status=, None when absent; raise ValueError if unknown."""
+    value = request.args.get('status')
+    return enum_cls(value) if value else None
+
+def _page_response(rows, next_cursor, view):
+    items = []
+    for row in rows:
+        item = view(row)
+        item['timestamp'] = item['timestamp'].isoformat() if item['timestamp'] else None
+        items.append(item)
+    return jsonify({'success': True, 'items': items, 'next_cursor': next_cursor})
+
+def _request_inbox(model, user):
+    box = request.args.get('box', 'received')
+    if box not in ('sent', 'received'):
+        return jsonify({'success': False, 'error': "box must be 'sent' or 'received'"}), 400
+    try:
+        status = _parse_status(RequestStatus)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Unknown status'}), 400
+
+    owner_col = model.sender_id if box == 'sent' else model.recipient_id
+    stmt = db.select(model).filter(owner_col == user.id).options(*request_load_options(model))
+    if status:
+        stmt = stmt.filter(model.status == status)
+    desired_skill_name_id = request.args.get('desired_skill_name_id')
+    if desired_skill_name_id:
+        stmt = stmt.join(model.swap).filter(Swap.desired_skill_name_id == desired_skill_name_id)
+
+    try:
+        rows, next_cursor = keyset_page(
+            stmt, model, cursor=request.args.get('cursor'), limit=page_size(request.args.get('limit'))
+        )
+    except InvalidCursor as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return _page_response(rows, next_cursor, request_view)
+
+@api_bp.route('/swaps')
+@read_only
+def swaps():
+    """Swap stream: other users' open swaps the current user has not requested yet."""
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'User not authenticated'}), 401
+    try:
+        status = _parse_status(SwapStatus)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Unknown status'}), 400
+
+    stmt = swap_stream_select(user.id).options(*swap_load_options())
+    if status:
+        stmt = stmt.filter(Swap.status == status)
+    desired_skill_name_id = request.args.get('desired_skill_name_id')
+    if desired_skill_name_id:
+        stmt = stmt.filter(Swap.desired_skill_name_id == desired_skill_name_id)
+    else:
+        # Default to swaps wanting something the user offers, as on the dashboard
+        stmt = stmt.filter(Swap.desired_skill_name_id.in_(
+            db.select(Skill.skill_name_id).filter(Skill.user_id == user.id)
+        ))
+
+    try:
+        rows, next_cursor = keyset_page(
+            stmt, Swap, cursor=request.args.get('cursor'), limit=page_size(request.args.get('limit'))
+        )
+    except InvalidCursor as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return _page_response(rows, next_cursor, swap_view)
+
+@api_bp.route('/swaps/<string:swap_id>')
+@read_only
+def swap_detail(swap_id):
+    """One swap by id, live or archived."""
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'User not authenticated'}), 401
+    swap = find(Swap, swap_id)
+    if not swap:
+        return jsonify({'success': False, 'error': 'Swap not found'}), 404
+    item = swap_view(swap)
+    item['timestamp'] = item['timestamp'].isoformat() if item['timestamp'] else None
+    return jsonify({'success': True, 'swap': item, 'archived': is_archived(swap)})
+
+@api_bp.route('/conversations/<string:conversation_id>/messages')
+@read_only
+def conversation_messages(conversation_id):
+    """
+    One page of a chat's history, oldest first.
+
+    ?before=<cursor> pages back from the newest messages (next_cursor is the
+    page before); ?since=<cursor> returns the messages after it, for catching
+    up after a reconnect (next_cursor continues forward while there are more).
+    ?after_seq=<n> returns the messages numbered after seq n, in seq order;
+    has_more says whether to ask again after the last one.
+    """
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'User not authenticated'}), 401
+    conversation = find(SwapConversation, conversation_id)
+    if not conversation or not is_participant(conversation, user.id):
+        return jsonify({'success': False, 'error': 'Conversation not found'}), 404
+
+    limit = page_size(request.args.get('limit') or current_app.config.get('CHAT_PAGE_SIZE', 50))
+    if 'after_seq' in request.args:
+        after_seq = request.args.get('after_seq', type=int)
+        if after_seq is None or after_seq < 0:
+            return jsonify({'success': False, 'error': 'after_seq must be a non-negative integer'}), 400
+        rows, has_more = messages_after_seq(conversation, after_seq, limit=limit)
+        return jsonify({'success': True, 'items': [message_view(m) for m in rows], 'has_more': has_more})
+
+    since = request.args.get('since')
+    try:
+        if since:
+            rows, next_cursor = messages_since(conversation, since, limit=limit)
+        else:
+            rows, next_cursor = latest_page(conversation, before=request.args.get('before'), limit=limit)
+    except InvalidCursor as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, 'items': [message_view(m) for m in rows], 'next_cursor': next_cursor})
+
+@api_bp.route('/swap-requests')
+@read_only
+def swap_requests():
+    """Sent or received swap requests (?box=sent|received)."""
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'User not authenticated'}), 401
+    return _request_inbox(SwapRequest, user)
+
+@api_bp.route('/discuss-requests')
+@read_only
+def discuss_requests():
+    """Sent or received discuss requests (?box=sent|received)."""
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'User not authenticated'}), 401
+    return _request_inbox(DiscussRequest, user)
+
+@api_bp.route('/trade-rings')
+@read_only
+def trade_rings():
+    """Suggested 3- and 4-way swaps the current user could take part in."""
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'User not authenticated'}), 401
+
+    rings = suggested_rings(user.id)
+    user_ids = {leg.user_id for ring in rings for leg in ring}
+    names = dict(db.session.execute(
+        db.select(User.id, User.name).filter(User.id.in_(user_ids))
+    ).all()) if user_ids else {}
+    skill_names = reference_data().skill_names
+
+    items = []
+    for ring in rings:
+        legs = []
+        for i, leg in enumerate(ring):
+            receiver = ring[(i + 1) % len(ring)]
+            legs.append({
+                'swap_id': leg.swap_id,
+                'user_id': leg.user_id,
+                'user_name': names.get(leg.user_id, "Unknown"),
+                'gives': skill_names.get(leg.offers, "N/A"),
+                'wants': skill_names.get(leg.wants, "N/A"),
+                'gives_to': receiver.user_id,
+            })
+        items.append({'size': len(ring), 'legs': legs})
+    return jsonify({'success': True, 'items': items})
+
+@api_bp.route('/skill-names')
+@read_only
+def skill_names():
+    """Autocomplete suggestions for SkillName, prefix matches first then typo-tolerant ones."""
+    # Hit on every keystroke: the session check is enough, no need to load the User row
+    if not session.get('user_id'):
+        return jsonify({'success': False, 'error': 'User not authenticated'}), 401
+    limit = max(1, min(request.args.get('limit', 10, type=int), 25))
+    query = request.args.get('q', '').strip()
+    suggestions = skill_autocomplete().suggest(query, limit) if query else []
+    return jsonify({'success': True, 'items': [{'id': sn_id, 'name': name} for sn_id, name in suggestions]})
+
+@api_bp.route('/stats/dashboard-cache')
+def dashboard_cache_stats():
+    """Hit/miss counters for the per-user dashboard cache in this worker."""
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'User not authenticated'}), 401
+    return jsonify({'success': True, **dashboard_cache.stats()})
+
+@api_bp.route('/stats/db-pool')
+def db_pool_stats():
+    """Connection pool usage and checkout wait times per database, in this worker."""
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'User not authenticated'}), 401
+    return jsonify({'success': True, 'pools': pool_stats(current_app)})
+
+@api_bp.route('/stats/chat-write-behind')
+def chat_write_behind_stats():
+    """This worker's chat write-behind queue: messages waiting, written and refused."""
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'User not authenticated'}), 401
+    pipeline = current_app.extensions.get('chat_write_behind')
+    return jsonify({'success': True, 'enabled': pipeline is not None,
+                    'stats': pipeline.stats() if pipeline else None})
@@ -1,6 +1,11 @@
-from flask import Blueprint, render_template, request, session, redirect, url_for, jsonify
-from app.models import db, User, DiscussRequest, SwapRequest, SwapConversation, SwapMessage, MessageType, SwapStatus, Swap, RequestStatus
-from datetime import datetime, timezone
+from flask import Blueprint, current_app, render_template, request, session, redirect, url_for, jsonify
+from app.models import db, User, DiscussRequest, SwapRequest, SwapConversation, SwapStatus, Swap, RequestStatus
+from app.models.request_counters import move_counters
+from app.models.transitions import SWAP_TRANSITIONS, check_transition
+from app.services.archive import find, is_archived
+from app.services.chat_history import latest_page
+from app.services.chat_messages import InvalidMessage, broadcast_message, post_message
+from app.services.chat_write_behind import ChatBusy
 
 chat_bp = Blueprint('chat', __name__)
 
@@ -8,14 +13,16 @@ def get_current_user():
     user_id = session.get('user_id')
     return db.session.get(User, user_id) if user_id else None
 
+# Not @read_only: a GET creates the conversation on first visit, and a
+# lagging replica would not show one just created
 @chat_bp.route('/chat/<string:request_id>', methods=['GET', 'POST'])
 def chat(request_id):
     user = get_current_user()
     if not user:
         return redirect(url_for('auth.login'))
 
-    # Get the discuss request
-    discuss_request = db.session.get(DiscussRequest, request_id)
+    # Get the discuss request, from the archive if its swap has been archived
+    discuss_request = find(DiscussRequest, request_id)
     if not discuss_request:
         return "Discuss request not found", 404
 
@@ -23,6 +30,25 @@ def chat(request_id):
     if user.id not in [discuss_request.sender_id, discuss_request.recipient_id]:
         return "You are not authorized to view this chat", 403
 
+    if is_archived(discuss_request):
+        # Archived chats are read-only history
+        conversation = discuss_request.swap_conversation
+        if not conversation:
+            return "Conversation not found", 404
+        if request.method == 'POST':
+            return "This conversation has been archived", 409
+        messages, older_cursor = latest_page(conversation, limit=current_app.config.get('CHAT_PAGE_SIZE', 50))
+        return render_template(
+            'chat-interface.html',
+            conversation=conversation,
+            messages=messages,
+            older_cursor=older_cursor,
+            last_seq=max((m.seq for m in messages), default=0),
+            discuss_request=discuss_request,
+            user=user,
+            archived=True
+        )
+
     # Get or create the conversation
     conversation = None
     if discuss_request.swap_conversation:
@@ -41,36 +67,27 @@ def chat(request_id):
         discuss_request.swap_conversation_id = conversation.id
         db.session.commit()
 
-    # Handle new message post
+    # Form POST fallback for clients without a socket connection
     if request.method == 'POST':
-        content = request.form.get('message')
-        if content:
-            # Determine recipient as "the other participant" in this conversation
-            if user.id == conversation.sender_id:
-                recipient_id = conversation.recipient_id
-            else:
-                recipient_id = conversation.sender_id
-
-            message = SwapMessage(
-                conversation_id=conversation.id,
-                sender_id=user.id,
-                recipient_id=recipient_id,
-                content=content,
-                type=MessageType.TEXT,
-                timestamp=datetime.now(timezone.utc)
-            )
-            db.session.add(message)
-            db.session.commit()
-
-    # Fetch all messages for the conversation
-    messages = db.session.execute(
-        db.select(SwapMessage).filter_by(conversation_id=conversation.id).order_by(SwapMessage.timestamp)
-    ).scalars().all()
+        try:
+            message = post_message(conversation, user.id, request.form.get('message'))
+        except InvalidMessage:
+            pass
+        except ChatBusy as e:
+            return str(e), 503
+        else:
+            broadcast_message(message)
+        return redirect(url_for('chat.chat', request_id=discuss_request.id))
+
+    # Only the latest page; older messages load on demand from the history API
+    messages, older_cursor = latest_page(conversation, limit=current_app.config.get('CHAT_PAGE_SIZE', 50))
 
     return render_template(
         'chat-interface.html',
         conversation=conversation,
         messages=messages,
+        older_cursor=older_cursor,
+        last_seq=max((m.seq for m in messages), default=0),
         discuss_request=discuss_request,
         user=user  # pass user for template logic
     )
@@ -99,15 +116,18 @@ def accept_swap(conversation_id):
             # Update swap status to completed
             swap = db.session.get(Swap, conversation.swap_id)
             if swap:
-                swap.status = SwapStatus.completed
-                
-                # Update related swap requests to completed status
-                related_swap_requests = db.session.execute(
-                    db.select(SwapRequest).filter_by(swap_id=swap.id)
-                ).scalars().all()
-                
-                for swap_request in related_swap_requests:
-                    swap_request.status = RequestStatus.accepted  # Mark as accepted since swap is completed
+                check_transition(SWAP_TRANSITIONS, swap.status, SwapStatus.completed, 'Swap')
+
+                # Accept every pending swap request in one statement, since the swap is completed;
+                # the bulk UPDATE skips the flush hook, so complete the swap and move its counters
+                # by the row count in one more
+                accepted = db.session.execute(
+                    db.update(SwapRequest)
+                    .where(SwapRequest.swap_id == swap.id, SwapRequest.status == RequestStatus.pending)
+                    .values(status=RequestStatus.accepted)
+                ).rowcount
+                move_counters(db.session, swap, {'pending_requests': -accepted, 'accepted_requests': accepted},
+                              status=SwapStatus.completed)
         
         db.session.commit()
 
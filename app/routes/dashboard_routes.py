@@ -1,7 +1,10 @@
 from flask import Blueprint, render_template, session, redirect, url_for, flash, request
-from app.models import db, User, Skill, SwapRequest, DiscussRequest, SkillName, Category, Swap, SwapStatus, RequestStatus, SwapConversation
+from app.models import db, User, Skill, SwapRequest, DiscussRequest, Swap, RequestStatus, InvalidTransition
 from app.forms.add_skill import AddSkillForm
 from app.forms.make_swap import MakeSwapForm
+from app.services.dashboard_loader import load_dashboard
+from app.services.dashboard_cache import dashboard_cache
+from app.services.replicas import read_only
 from sqlalchemy import select
 
 dashboard_bp = Blueprint('dashboard', __name__)
@@ -18,120 +21,37 @@ def home():
     return render_template('index.html')
 
 @dashboard_bp.route('/dashboard')
+@read_only
 def dashboard():
     user = get_current_user()
     if not user:
         return redirect(url_for('auth.login'))
 
-    user_id = user.id
-
     form = AddSkillForm()
     swap_form = MakeSwapForm()
 
-    skill_names = db.session.execute(db.select(SkillName)).scalars().all()
-    categories = db.session.execute(db.select(Category)).scalars().all()
-
-    form.name.choices = [(sn.id, sn.name) for sn in skill_names]
-    form.category.choices = [(cat.id, cat.name) for cat in categories]
-
-    user_skills = db.session.execute(
-        db.select(Skill).filter_by(user_id=user_id)
-    ).scalars().all()
-
-    user_skill_name_ids = [skill.skill_name_id for skill in user_skills if skill.skill_name_id]
-
-    print(f"User skill_name_ids: {user_skill_name_ids}")
-    print(f"User skills count: {len(user_skills)}")
-
-    # Just all open or in_discussion swaps for testing
-    open_swaps = db.session.execute(
-        db.select(Swap).filter(
-            Swap.status.in_([SwapStatus.open, SwapStatus.in_discussion])
-        )
-    ).scalars().all()
-    print(f"Total open/in_discussion swaps: {len(open_swaps)}")
-
-    # Subquery: Check if user already sent a swap request for that swap
-    subquery = (
-        db.select(SwapRequest.id)
-        .filter(
-            SwapRequest.swap_id == Swap.id,
-            SwapRequest.sender_id == user_id
-        )
-        .correlate(Swap)
-    )
-
-    # Main query with all filters (your original query)
-    unrequested_swaps = db.session.execute(
-        db.select(Swap).filter(
-            (Swap.user_id != user_id),
-            (Swap.status.in_([SwapStatus.open, SwapStatus.in_discussion])),
-            (~db.exists(subquery)),
-            (Swap.desired_skill_name_id.in_(user_skill_name_ids))
-        )
-    ).scalars().all()
-
-    print(f"Unrequested swaps count: {len(unrequested_swaps)}")
-    for swap in unrequested_swaps:
-        print(f"Swap id: {swap.id}, Offered skill: {swap.offered_skill.skill_name.name}, Desired skill: {swap.desired_skill_name.name}")
-
-    # Prepare swap_form choices
-    other_skill_names = db.session.execute(db.select(SkillName)).scalars().all()
-    swap_form.desired_skill_name.choices = [(sn.id, sn.name) for sn in other_skill_names]
-    swap_form.offered_skill_id.choices = [(skill.id, skill.skill_name.name) for skill in user_skills]
-
-    sent_swap_requests = db.session.execute(db.select(SwapRequest).filter_by(sender_id=user_id)).scalars().all()
-    received_swap_requests = db.session.execute(db.select(SwapRequest).filter_by(recipient_id=user_id)).scalars().all()
-
-    sent_discuss_requests = db.session.execute(db.select(DiscussRequest).filter_by(sender_id=user_id)).scalars().all()
-    received_discuss_requests = db.session.execute(db.select(DiscussRequest).filter_by(recipient_id=user_id)).scalars().all()
+    data = dashboard_cache.get_or_load(user.id, load_dashboard)
 
-    # Check which swaps already have swap requests sent by the current user (for swap stream)
-    swap_request_exists = {}
-    for swap in unrequested_swaps:
-        existing_swap_request = db.session.execute(
-            select(SwapRequest).where(
-                SwapRequest.sender_id == user_id,
-                SwapRequest.swap_id == swap.id
-            )
-        ).scalar_one_or_none()
-        swap_request_exists[swap.id] = existing_swap_request is not None
-
-    # Check which received swap requests already have discuss requests (for received requests section)
-    discuss_request_exists = {}
-    for swap_request in received_swap_requests:
-        existing_discuss = db.session.execute(
-            select(DiscussRequest).where(
-                DiscussRequest.sender_id == user_id,
-                DiscussRequest.recipient_id == swap_request.sender_id,
-                DiscussRequest.swap_id == swap_request.swap_id
-            )
-        ).scalar_one_or_none()
-        discuss_request_exists[swap_request.id] = existing_discuss is not None
-
-    # Get active conversations for the user (excluding completed swaps and non-accepted discuss requests)
-    active_conversations = db.session.execute(
-        db.select(SwapConversation).join(Swap).join(DiscussRequest).filter(
-            (SwapConversation.sender_id == user_id) | (SwapConversation.recipient_id == user_id),
-            Swap.status != SwapStatus.completed,
-            DiscussRequest.status == RequestStatus.accepted
-        )
-    ).scalars().all()
+    # Skill names are fetched from /api/skill-names as the user types
+    form.name.choices = []
+    form.category.choices = data['category_choices']
+    swap_form.desired_skill_name.choices = []
+    swap_form.offered_skill_id.choices = data['offered_skill_choices']
 
     return render_template(
         'dashboard.html',
         form=form,
         swap_form=swap_form,
         current_user=user,
-        skills=user_skills,
-        swaps=unrequested_swaps,
-        sent_swap_requests=sent_swap_requests or None,
-        received_swap_requests=received_swap_requests or None,
-        sent_discuss_requests=sent_discuss_requests or None,
-        received_discuss_requests=received_discuss_requests or None,
-        swap_request_exists=swap_request_exists,
-        discuss_request_exists=discuss_request_exists,
-        active_conversations=active_conversations
+        skills=data['skills'],
+        swaps=data['swaps'],
+        sent_swap_requests=data['sent_swap_requests'] or None,
+        received_swap_requests=data['received_swap_requests'] or None,
+        sent_discuss_requests=data['sent_discuss_requests'] or None,
+        received_discuss_requests=data['received_discuss_requests'] or None,
+        swap_request_exists=data['swap_request_exists'],
+        discuss_request_exists=data['discuss_request_exists'],
+        active_conversations=data['active_conversations']
     )
 
 @dashboard_bp.route('/send_swap_request/<string:swap_id>', methods=['POST'])
@@ -236,6 +156,10 @@ def accept_discuss_request(request_id):
         
         return redirect(url_for('chat.chat', request_id=discuss_request.id))
         
+    except InvalidTransition as e:
+        db.session.rollback()
+        flash(f"This request can no longer be changed ({e}).", "warning")
+        return redirect(url_for('dashboard.dashboard'))
     except Exception as e:
         db.session.rollback()
         print(f"Error accepting discuss request: {e}")
@@ -262,6 +186,10 @@ def reject_discuss_request(request_id):
         
         flash("Discuss request rejected successfully.", "info")
         
+    except InvalidTransition as e:
+        db.session.rollback()
+        flash(f"This request can no longer be changed ({e}).", "warning")
+        return redirect(url_for('dashboard.dashboard'))
     except Exception as e:
         db.session.rollback()
         print(f"Error rejecting discuss request: {e}")
@@ -294,6 +222,10 @@ def delete_discuss_request(request_id):
         
         flash("Discuss request cancelled successfully.", "success")
         
+    except InvalidTransition as e:
+        db.session.rollback()
+        flash(f"This request can no longer be changed ({e}).", "warning")
+        return redirect(url_for('dashboard.dashboard'))
     except Exception as e:
         db.session.rollback()
         print(f"Error cancelling discuss request: {e}")
@@ -321,6 +253,10 @@ def delete_swap_request(request_id):
         
         flash("Swap request cancelled successfully.", "success")
         
+    except InvalidTransition as e:
+        db.session.rollback()
+        flash(f"This request can no longer be changed ({e}).", "warning")
+        return redirect(url_for('dashboard.dashboard'))
     except Exception as e:
         db.session.rollback()
         print(f"Error cancelling swap request: {e}")
@@ -410,6 +346,10 @@ def accept_swap_request(request_id):
         
         flash("Swap request accepted successfully! The swap is now in discussion.", "success")
         
+    except InvalidTransition as e:
+        db.session.rollback()
+        flash(f"This request can no longer be changed ({e}).", "warning")
+        return redirect(url_for('dashboard.dashboard'))
     except Exception as e:
         db.session.rollback()
         print(f"Error accepting swap request: {e}")
@@ -437,6 +377,10 @@ def reject_swap_request(request_id):
         
         flash("Swap request rejected successfully.", "info")
         
+    except InvalidTransition as e:
+        db.session.rollback()
+        flash(f"This request can no longer be changed ({e}).", "warning")
+        return redirect(url_for('dashboard.dashboard'))
     except Exception as e:
         db.session.rollback()
         print(f"Error rejecting swap request: {e}")
@@ -453,8 +397,8 @@ def update_swap_statuses():
     
     try:
         # Update all swap statuses
-        Swap.update_all_statuses(db.session)
-        flash("All swap statuses have been updated successfully!", "success")
+        changed = Swap.update_all_statuses(db.session)
+        flash(f"All swap statuses have been updated successfully! ({sum(changed.values())} changed)", "success")
     except Exception as e:
         db.session.rollback()
         print(f"Error updating swap statuses: {e}")
@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash
-from app.models import db, User, Skill, SwapRequest, RequestStatus, Swap, SkillName
+from app.models import db, User, Skill, SwapRequest, RequestStatus, Swap
 from app.forms.make_swap import MakeSwapForm
+from app.services.reference_data import reference_data
 
 request_bp = Blueprint('request', __name__)
 
@@ -22,13 +23,11 @@ def make_swap():
         db.select(Skill).filter_by(user_id=user_id)
     ).scalars().all()
 
-    other_skill_names = db.session.execute(
-        db.select(SkillName)
-    ).scalars().all()
+    reference = reference_data()
 
     # Dynamically set SelectField choices for the swap form
-    form.offered_skill_id.choices = [(skill.id, skill.skill_name.name) for skill in user_skills]
-    form.desired_skill_name.choices = [(skill_name.id, skill_name.name) for skill_name in other_skill_names]
+    form.offered_skill_id.choices = [(skill.id, reference.skill_names.get(skill.skill_name_id, "N/A")) for skill in user_skills]
+    form.desired_skill_name.choices = reference.skill_name_choices
 
     if form.validate_on_submit():
         desired_skill_name = form.desired_skill_name.data
@@ -0,0 +1,74 @@
+# routes/search_routes.py
+
+from flask import Blueprint, request, session, jsonify
+from sqlalchemy.orm import joinedload
+from app.models import db, User, Skill, Swap
+from app.services.dashboard_loader import swap_load_options, swap_view, VISIBLE_SWAP_STATUSES
+from app.services.reference_data import reference_data
+from app.services.search import search
+from app.services.replicas import read_only
+
+search_bp = Blueprint('search', __name__)
+
+def get_current_user():
+    user_id = session.get('user_id')
+    return db.session.get(User, user_id) if user_id else None
+
+def _skill_result(skill):
+    reference = reference_data()
+    return {
+        'id': skill.id,
+        'user_id': skill.user_id,
+        'user_name': skill.user.name if skill.user else "Unknown",
+        'name': reference.skill_names.get(skill.skill_name_id, "N/A"),
+        'category_name': reference.categories.get(skill.category_id, "N/A"),
+        'description': skill.description,
+    }
+
+@search_bp.route('/search')
+@read_only
+def search_view():
+    """Ranked swaps and skills matching ?q=, with highlighted snippets."""
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'error': 'User not authenticated'}), 401
+
+    kind = request.args.get('type', 'all')
+    if kind not in ('all', 'swaps', 'skills'):
+        return jsonify({'success': False, 'error': "type must be 'all', 'swaps' or 'skills'"}), 400
+    kinds = ('swap', 'skill') if kind == 'all' else (kind[:-1],)
+    try:
+        limit = max(1, min(int(request.args.get('limit', 20)), 100))
+    except ValueError:
+        limit = 20
+
+    hits = search(request.args.get('q', ''), kinds=kinds, limit=limit, swap_statuses=VISIBLE_SWAP_STATUSES)
+    swap_hits = {h['ref_id']: h for h in hits if h['kind'] == 'swap'}
+    skill_hits = {h['ref_id']: h for h in hits if h['kind'] == 'skill'}
+
+    swaps = []
+    if swap_hits:
+        rows = db.session.execute(
+            db.select(Swap)
+            .filter(Swap.id.in_(list(swap_hits)), Swap.status.in_(VISIBLE_SWAP_STATUSES))
+            .options(*swap_load_options())
+        ).scalars().all()
+        for swap in rows:
+            item = swap_view(swap)
+            item['timestamp'] = item['timestamp'].isoformat() if item['timestamp'] else None
+            item.update(snippet=swap_hits[swap.id]['snippet'], rank=swap_hits[swap.id]['rank'])
+            swaps.append(item)
+
+    skills = []
+    if skill_hits:
+        rows = db.session.execute(
+            db.select(Skill).filter(Skill.id.in_(list(skill_hits))).options(joinedload(Skill.user))
+        ).scalars().all()
+        for skill in rows:
+            item = _skill_result(skill)
+            item.update(snippet=skill_hits[skill.id]['snippet'], rank=skill_hits[skill.id]['rank'])
+            skills.append(item)
+
+    swaps.sort(key=lambda item: item['rank'], reverse=True)
+    skills.sort(key=lambda item: item['rank'], reverse=True)
+    return jsonify({'success': True, 'query': request.args.get('q', ''), 'swaps': swaps, 'skills': skills})
@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, redirect, url_for, session, flash, request
 from app.forms.add_skill import AddSkillForm
-from app.models import db, User, Skill, SkillName, Category
+from app.models import db, User, Skill
+from app.services.reference_data import reference_data
 
 skill_bp = Blueprint('skill', __name__)
 
@@ -16,17 +17,10 @@ def add_skill():
 
     form = AddSkillForm()
 
-    # Dynamically load skill names from DB
-    skill_names = db.session.execute(
-        db.select(SkillName).order_by(SkillName.name)
-        ).scalars().all()
-    form.name.choices = [(sn.id, sn.name) for sn in skill_names]
-
-    # Dynamically load categories from DB
-    categories = db.session.execute(
-        db.select(Category).order_by(Category.name)
-        ).scalars().all()
-    form.category.choices = [(cat.id, cat.name) for cat in categories]
+    # Choices come from the per-worker reference data cache
+    reference = reference_data()
+    form.name.choices = reference.skill_name_choices
+    form.category.choices = reference.category_choices
 
     if form.validate_on_submit():
         skill_name_id = form.name.data
@@ -42,10 +36,7 @@ def add_skill():
         ).scalar_one_or_none()
         
         if existing_skill:
-            skill_name = db.session.execute(
-                db.select(SkillName).filter_by(id=skill_name_id)
-            ).scalar_one_or_none()
-            skill_name_text = skill_name.name if skill_name else "this skill"
+            skill_name_text = reference.skill_names.get(skill_name_id, "this skill")
             flash(f"You already have '{skill_name_text}'! If you want to update the description, please edit the existing skill from your skills list.", "warning")
             return redirect(url_for('dashboard.dashboard'))
         
@@ -0,0 +1,2 @@
+# services/__init__.py
+# Query and domain helpers shared by the route blueprints.
@@ -0,0 +1,133 @@
+# services/archive.py
+"""
+Archival of finished swaps.
+
+Completed and cancelled swaps stay in the live tables forever otherwise,
+and every hot query (dashboard, matching, search) filters through them.
+archive_swaps() moves each swap that finished more than ARCHIVE_AFTER_DAYS
+ago, with its swap requests, discuss requests, conversations and messages,
+into the archived_* tables (models/archive.py): INSERT ... SELECT then
+DELETE, ARCHIVE_BATCH_SIZE swaps per transaction, oldest first.
+
+A swap counts as finished since its last activity: its creation, its newest
+swap request, any discuss request about it and its newest chat message.
+
+find() is the read path for historical views: it looks a row up in the
+live table and falls back to the archive, whose classes render the same.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import click
+from flask import current_app
+from sqlalchemy import DateTime, delete, exists, insert, literal, or_, select
+
+from app.models import (
+    db, Swap, SwapRequest, DiscussRequest, SwapConversation, SwapMessage, SwapStatus,
+    ArchivedSwap, ArchivedSwapRequest, ArchivedDiscussRequest, ArchivedSwapConversation, ArchivedSwapMessage,
+)
+from app.services.dashboard_cache import dashboard_cache
+from app.services.matching import matching_index
+
+ARCHIVED = {
+    Swap: ArchivedSwap,
+    SwapRequest: ArchivedSwapRequest,
+    DiscussRequest: ArchivedDiscussRequest,
+    SwapConversation: ArchivedSwapConversation,
+    SwapMessage: ArchivedSwapMessage,
+}
+ARCHIVABLE_STATUSES = (SwapStatus.completed, SwapStatus.cancelled)
+
+
+def find(model, id):
+    """The `model` row with primary key `id`, from the live table or else the archive (None if neither)."""
+    return db.session.get(model, id) or db.session.get(ARCHIVED[model], id)
+
+
+def is_archived(obj):
+    return isinstance(obj, tuple(ARCHIVED.values()))
+
+
+def archivable_swaps(cutoff):
+    """SELECT of finished swap ids with no activity since `cutoff`, oldest id first."""
+    return (
+        select(Swap.id)
+        .where(
+            Swap.status.in_(ARCHIVABLE_STATUSES),
+            Swap.timestamp < cutoff,
+            or_(Swap.last_request_at.is_(None), Swap.last_request_at < cutoff),
+            ~exists().where(DiscussRequest.swap_id == Swap.id, DiscussRequest.timestamp >= cutoff),
+            ~exists().where(SwapConversation.swap_id == Swap.id, SwapConversation.last_message_at >= cutoff),
+        )
+        .order_by(Swap.id)
+    )
+
+
+def _move(session, model, where, archived_at):
+    """Copy the `model` rows matching `where` into its archive table, then delete them; returns the count."""
+    live = model.__table__
+    session.execute(
+        insert(ARCHIVED[model].__table__).from_select(
+            [column.name for column in live.columns] + ['archived_at'],
+            select(*live.columns, literal(archived_at, DateTime)).where(where),
+        )
+    )
+    return session.execute(delete(live).where(where)).rowcount
+
+
+def _archive_batch(session, swap_ids, archived_at):
+    conversation_ids = select(SwapConversation.id).where(SwapConversation.swap_id.in_(swap_ids))
+    # Children before parents, so no foreign key is left dangling
+    return {
+        'swap_messages': _move(session, SwapMessage, SwapMessage.conversation_id.in_(conversation_ids),
+                               archived_at),
+        'swap_conversations': _move(session, SwapConversation, SwapConversation.swap_id.in_(swap_ids),
+                                    archived_at),
+        'discuss_requests': _move(session, DiscussRequest, DiscussRequest.swap_id.in_(swap_ids), archived_at),
+        'swap_requests': _move(session, SwapRequest, SwapRequest.swap_id.in_(swap_ids), archived_at),
+        'swaps': _move(session, Swap, Swap.id.in_(swap_ids), archived_at),
+    }
+
+
+def archive_swaps(session=None, older_than_days=None, batch_size=None):
+    """
+    Move finished swaps older than `older_than_days` and everything under them to the archive.
+
+    Returns:
+        dict mapping each live table name to the number of rows archived.
+    """
+    session = session or db.session
+    if older_than_days is None:
+        older_than_days = current_app.config.get('ARCHIVE_AFTER_DAYS', 180)
+    batch_size = batch_size or current_app.config.get('ARCHIVE_BATCH_SIZE', 500)
+    now = datetime.now(timezone.utc)
+    stmt = archivable_swaps(now - timedelta(days=older_than_days)).limit(batch_size)
+
+    moved = dict.fromkeys(('swaps', 'swap_requests', 'discuss_requests', 'swap_conversations', 'swap_messages'), 0)
+    while True:
+        swap_ids = session.execute(stmt).scalars().all()
+        if not swap_ids:
+            break
+        for table, count in _archive_batch(session, swap_ids, now).items():
+            moved[table] += count
+        session.commit()
+
+    # Bulk statements bypass the flush hooks that keep the caches current
+    if moved['swaps']:
+        session.expire_all()
+        dashboard_cache.clear()
+        matching_index().invalidate()
+    return moved
+
+
+def init_archive(app):
+    """Register `flask archive-swaps`."""
+
+    @app.cli.command('archive-swaps')
+    @click.option('--older-than-days', type=int, default=None,
+                  help="Archive swaps finished more than this many days ago (default ARCHIVE_AFTER_DAYS).")
+    def archive_command(older_than_days):
+        """Move old completed and cancelled swaps, with their requests and chats, to the archive tables."""
+        moved = archive_swaps(older_than_days=older_than_days)
+        summary = ', '.join(f"{count} {table}" for table, count in moved.items() if count)
+        print(f"Archived: {summary or 'nothing to archive'}.")
@@ -0,0 +1,179 @@
+# services/autocomplete.py
+"""
+In-memory autocomplete over SkillName.name.
+
+The add-skill and make-swap forms used to ship every skill name as an
+<option>. Instead each worker keeps:
+
+  * a prefix trie over every word of every name, so "gui" finds both
+    "Guitar" and "Classical Guitar"; each node caches the ids below it,
+    making a lookup a walk of len(query) dict hops;
+  * a trigram index (pg_trgm-style padding) for typo tolerance, used to
+    fill the remaining slots when the prefix walk comes up short.
+
+The index follows the reference-data snapshot: when its version stamp
+moves, only the added/removed/renamed names are applied.
+"""
+
+import heapq
+import re
+import threading
+from collections import defaultdict
+
+from flask import current_app
+
+from app.services.reference_data import reference_data
+
+_WORD_RE = re.compile(r'\w+')
+
+TRIGRAM_THRESHOLD = 0.2
+
+
+def _normalize(text):
+    return ' '.join(_WORD_RE.findall(text.lower()))
+
+
+def trigrams(text):
+    """Trigram set of text, each word padded like pg_trgm ('  w', ' wo', ..., 'rd ')."""
+    grams = set()
+    for word in _WORD_RE.findall(text.lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class _TrieNode:
+    __slots__ = ('children', 'ids')
+
+    def __init__(self):
+        self.children = {}
+        self.ids = set()
+
+
+class AutocompleteIndex:
+    def __init__(self):
+        self.version = object()
+        self._names = {}
+        self._sort_keys = {}
+        self._root = _TrieNode()
+        self._grams = {}
+        self._postings = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._names)
+
+    def _keys(self, name):
+        """Every word-start suffix of the normalized name: 'a b c' -> 'a b c', 'b c', 'c'."""
+        words = _normalize(name).split(' ')
+        return {' '.join(words[i:]) for i in range(len(words)) if words[i]}
+
+    def add(self, sn_id, name):
+        if sn_id in self._names:
+            self.remove(sn_id)
+        self._names[sn_id] = name
+        self._sort_keys[sn_id] = _normalize(name)
+        for key in self._keys(name):
+            node = self._root
+            node.ids.add(sn_id)
+            for char in key:
+                node = node.children.setdefault(char, _TrieNode())
+                node.ids.add(sn_id)
+        grams = trigrams(name)
+        self._grams[sn_id] = grams
+        for gram in grams:
+            self._postings[gram].add(sn_id)
+
+    def remove(self, sn_id):
+        name = self._names.pop(sn_id, None)
+        if name is None:
+            return
+        del self._sort_keys[sn_id]
+        for key in self._keys(name):
+            self._root.ids.discard(sn_id)
+            steps = []  # (parent, char, child) down the key's path
+            node = self._root
+            for char in key:
+                child = node.children.get(char)
+                if child is None:
+                    # Already pruned while removing a longer key sharing this path
+                    break
+                child.ids.discard(sn_id)
+                steps.append((node, char, child))
+                node = child
+            # Prune the branch that no longer leads anywhere
+            for parent, char, child in reversed(steps):
+                if child.ids:
+                    break
+                parent.children.pop(char, None)
+        for gram in self._grams.pop(sn_id):
+            posting = self._postings[gram]
+            posting.discard(sn_id)
+            if not posting:
+                del self._postings[gram]
+
+    def sync(self, skill_names, version):
+        """Bring the index in line with an {id: name} mapping, touching only what changed."""
+        with self._lock:
+            if version == self.version:
+                return
+            for sn_id in self._names.keys() - skill_names.keys():
+                self.remove(sn_id)
+            for sn_id, name in skill_names.items():
+                if self._names.get(sn_id) != name:
+                    self.add(sn_id, name)
+            self.version = version
+
+    def complete(self, prefix, limit=10):
+        """Ids whose name has a word sequence starting with prefix, alphabetically."""
+        head = _normalize(prefix)
+        if not head:
+            return []
+        node = self._root
+        for char in head:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        # Whole-name prefix matches outrank matches on a later word
+        sort_keys = self._sort_keys
+        return heapq.nsmallest(
+            limit, node.ids,
+            key=lambda sn_id: (not sort_keys[sn_id].startswith(head), sort_keys[sn_id]),
+        )
+
+    def fuzzy(self, query, limit=10, threshold=TRIGRAM_THRESHOLD):
+        """Ids ranked by trigram similarity to query (|A & B| / |A | B|)."""
+        grams = trigrams(query)
+        if not grams:
+            return []
+        shared = defaultdict(int)
+        for gram in grams:
+            for sn_id in self._postings.get(gram, ()):
+                shared[sn_id] += 1
+        scored = []
+        for sn_id, common in shared.items():
+            similarity = common / (len(grams) + len(self._grams[sn_id]) - common)
+            if similarity >= threshold:
+                scored.append((-similarity, self._sort_keys[sn_id], sn_id))
+        return [sn_id for _, _, sn_id in heapq.nsmallest(limit, scored)]
+
+    def suggest(self, query, limit=10):
+        """Prefix matches first, then fuzzy matches to fill up to limit, as (id, name) pairs."""
+        ids = self.complete(query, limit)
+        if len(ids) < limit:
+            seen = set(ids)
+            ids += [sn_id for sn_id in self.fuzzy(query, limit) if sn_id not in seen][:limit - len(ids)]
+        return [(sn_id, self._names[sn_id]) for sn_id in ids]
+
+
+def init_autocomplete(app):
+    app.extensions['skill_autocomplete'] = AutocompleteIndex()
+
+
+def skill_autocomplete():
+    """The SkillName index for the current app, synced with the reference snapshot."""
+    index = current_app.extensions['skill_autocomplete']
+    snapshot = reference_data()
+    if snapshot.version != index.version:
+        index.sync(snapshot.skill_names, snapshot.version)
+    return index
@@ -0,0 +1,88 @@
+# services/chat_history.py
+"""
+Chat history reads.
+
+swap_messages is partitioned by month on PostgreSQL (see
+services/message_partitions.py). A query filtering only on conversation_id
+has to probe the index of every partition; bounding timestamp by the
+conversation's first_message_at/last_message_at (kept by
+models/conversation_activity.py) lets the planner skip all partitions
+outside the conversation's lifetime, so a history read costs the same
+however many months of other chats the table holds.
+
+A chat opens on its latest CHAT_PAGE_SIZE messages. Older ones are fetched
+a page at a time with latest_page(before=...), and a client that was
+disconnected catches up with messages_since(), both keyset-paginated on
+(timestamp, id) as in services/pagination.py. Every message a client sees
+carries its cursor (message_view() in services/chat_messages.py): the
+oldest one shown is the `before` cursor, the newest the `since` cursor.
+Reads may come from a replica that is behind; the client only advances its
+since cursor past messages it was given, so the next catch-up gets the rest.
+
+Timestamps come from the clocks of whichever workers stored the messages,
+so the order they give can disagree with the order messages were stored.
+A message's seq follows the storage order with no gaps (see
+models/swap_message.py). messages_after_seq() is the exact catch-up: a
+client that holds seq N asks for everything after N.
+"""
+
+from sqlalchemy import select
+
+from app.models import db, SwapMessage
+from app.services.archive import ARCHIVED, is_archived
+from app.services.pagination import keyset_page
+
+
+def _message_model(conversation):
+    return ARCHIVED[SwapMessage] if is_archived(conversation) else SwapMessage
+
+
+def _conversation_messages(conversation):
+    model = _message_model(conversation)
+    stmt = select(model).where(model.conversation_id == conversation.id)
+    if conversation.first_message_at is not None and conversation.last_message_at is not None:
+        stmt = stmt.where(model.timestamp.between(conversation.first_message_at,
+                                                  conversation.last_message_at))
+    return stmt
+
+
+def history_select(conversation):
+    """SELECT of `conversation`'s messages in seq order, restricted to its message time window."""
+    return _conversation_messages(conversation).order_by(_message_model(conversation).seq)
+
+
+def latest_page(conversation, before=None, limit=50):
+    """
+    The newest `limit` messages of `conversation`, or the `limit` just before the cursor `before`.
+
+    Returns:
+        (messages oldest first, cursor of the page before it or None when this is the first).
+    """
+    rows, older = keyset_page(_conversation_messages(conversation), _message_model(conversation),
+                              cursor=before, limit=limit, descending=True)
+    return rows[::-1], older
+
+
+def messages_since(conversation, since, limit=50):
+    """
+    Up to `limit` messages of `conversation` after the cursor `since`, oldest first.
+
+    Returns:
+        (messages, cursor to continue from or None when there are no more yet).
+    """
+    return keyset_page(_conversation_messages(conversation), _message_model(conversation),
+                       cursor=since, limit=limit, descending=False)
+
+
+def messages_after_seq(conversation, seq, limit=50):
+    """
+    Up to `limit` messages of `conversation` numbered after `seq`, in seq order.
+
+    Returns:
+        (messages, whether more follow the last one).
+    """
+    model = _message_model(conversation)
+    rows = db.session.execute(
+        _conversation_messages(conversation).where(model.seq > seq).order_by(model.seq).limit(limit + 1)
+    ).scalars().all()
+    return rows[:limit], len(rows) > limit
@@ -0,0 +1,86 @@
+# services/chat_messages.py
+"""
+Writing chat messages.
+
+Both ways of sending a message, the /chat Socket.IO namespace
+(sockets/chat.py) and the form POST fallback in chat_routes.chat(), go
+through post_message(), and both push the stored message to the
+conversation's room as a `message` event carrying message_view(), so every
+open chat window appends it without reloading the history.
+
+With CHAT_WRITE_BEHIND on, post_message() hands the message to this
+worker's write-behind pipeline (services/chat_write_behind.py) instead of
+committing it, and the message is pushed before it is stored.
+"""
+
+from datetime import datetime, timezone
+
+from flask import current_app
+
+from app.models import db, SwapMessage, MessageType
+from app.services.pagination import encode_cursor
+from app.sockets import socketio
+
+MAX_MESSAGE_LENGTH = 4000
+CHAT_NAMESPACE = '/chat'
+
+
+class InvalidMessage(ValueError):
+    """A message that is empty or too long to store."""
+
+
+def other_participant(conversation, user_id):
+    return conversation.recipient_id if user_id == conversation.sender_id else conversation.sender_id
+
+
+def is_participant(conversation, user_id):
+    return user_id in (conversation.sender_id, conversation.recipient_id)
+
+
+def post_message(conversation, sender_id, content):
+    """
+    Store a text message from `sender_id` in `conversation`; returns the SwapMessage.
+
+    Commits it, or with write-behind on journals it and returns it unsaved
+    (raising ChatBusy when the pipeline is full).
+    """
+    content = (content or '').strip()
+    if not content:
+        raise InvalidMessage("Message is empty")
+    if len(content) > MAX_MESSAGE_LENGTH:
+        raise InvalidMessage(f"Message is longer than {MAX_MESSAGE_LENGTH} characters")
+    pipeline = current_app.extensions.get('chat_write_behind')
+    if pipeline is not None:
+        return pipeline.submit(conversation, sender_id, content)
+    message = SwapMessage(
+        conversation_id=conversation.id,
+        sender_id=sender_id,
+        recipient_id=other_participant(conversation, sender_id),
+        content=content,
+        type=MessageType.TEXT,
+        timestamp=datetime.now(timezone.utc),
+    )
+    db.session.add(message)
+    db.session.commit()
+    return message
+
+
+def message_view(message):
+    """JSON-ready form of a message, as pushed to chat clients; `cursor` is its history position."""
+    return {
+        'id': message.id,
+        'conversation_id': message.conversation_id,
+        'seq': message.seq,
+        'sender_id': message.sender_id,
+        'sender_name': message.sender.name if message.sender else "Unknown",
+        'content': message.content,
+        'type': message.type.value,
+        'timestamp': message.timestamp.isoformat() if message.timestamp else None,
+        'cursor': encode_cursor(message.timestamp, message.id),
+    }
+
+
+def broadcast_message(message, skip_sid=None):
+    """Push `message` to every client in its conversation's room, except `skip_sid`."""
+    socketio.emit('message', message_view(message), to=message.conversation_id,
+                  namespace=CHAT_NAMESPACE, skip_sid=skip_sid)
@@ -0,0 +1,387 @@
+# services/chat_write_behind.py
+"""
+Write-behind ingestion of chat messages, with group commit.
+
+With CHAT_WRITE_BEHIND on, post_message() (services/chat_messages.py) does
+not insert and commit each message. It appends the message to this
+worker's journal, a file under CHAT_JOURNAL_DIR that is fsynced before the
+send is acknowledged. The fsync runs outside the queue lock, so other sends
+keep appending meanwhile, and one fsync covers every append made before
+it. The message is pushed to the room straight away, and
+a background thread inserts whatever has queued up every
+CHAT_FLUSH_INTERVAL_MS, or as soon as CHAT_FLUSH_BATCH_SIZE messages are
+waiting. One batch is one transaction:
+- one UPDATE ... RETURNING per conversation reserves its seq numbers and
+  moves the columns models/conversation_activity.py would have moved;
+- one executemany INSERT writes all the messages.
+
+Once CHAT_MAX_PENDING_MESSAGES messages are waiting (the database is slow
+or down), submit() raises ChatBusy rather than queue without bound.
+
+Each worker writes its own journal and holds an flock on it while it runs.
+A committed batch is recorded in the journal, and the journal is emptied
+whenever nothing is pending. On startup, any journal whose lock is free
+belonged to a worker that died; replay_journals() inserts the messages it
+lists that never reached the database, then deletes it.
+
+Until its batch commits, a message has no seq: it is delivered with
+seq None and found by id.
+"""
+
+import atexit
+import fcntl
+import glob
+import json
+import os
+import threading
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from sqlalchemy import case, insert, or_, select, update
+
+from app.models import db, User, SwapConversation, SwapMessage, MessageType
+from app.models.base import generate_uuid, naive_utc
+from app.models.swap_message import PREVIEW_LENGTH
+from app.services.dashboard_cache import dashboard_cache
+
+JOURNAL_PATTERN = 'chat-*.journal'
+
+
+class ChatBusy(RuntimeError):
+    """Raised when too many messages are waiting to be written to accept another."""
+
+
+class MessageJournal:
+    """Append-only file of the messages a worker has accepted but not yet committed."""
+
+    def __init__(self, path, fsync=True):
+        self.path = path
+        self.fsync = fsync
+        # Locked before it takes a name replay_journals() looks at; the lock is held for
+        # the life of the worker, and a free one marks a journal to replay
+        self._file = open(path + '.new', 'ab')
+        fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        os.rename(path + '.new', path)
+
+    @classmethod
+    def create(cls, directory, fsync=True):
+        os.makedirs(directory, exist_ok=True)
+        name = f'chat-{os.getpid()}-{uuid.uuid4().hex[:8]}.journal'
+        return cls(os.path.join(directory, name), fsync=fsync)
+
+    def _write(self, entries, sync):
+        self._file.write(b''.join(json.dumps(entry).encode() + b'\n' for entry in entries))
+        self._file.flush()
+        if sync and self.fsync:
+            os.fsync(self._file.fileno())
+
+    def append(self, records, sync=True):
+        self._write([{'message': record} for record in records], sync=sync)
+
+    def sync(self):
+        """fsync everything appended so far."""
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def committed(self, ids):
+        # Replay skips ids already in the database, so this needs no fsync
+        self._write([{'committed': list(ids)}], sync=False)
+
+    def reset(self):
+        self._file.truncate(0)
+
+    def close(self, remove=False):
+        if remove:
+            os.remove(self.path)
+        self._file.close()
+
+
+def read_journal(path):
+    """The message records in the journal at `path` that it does not mark committed, in order."""
+    records, committed = [], set()
+    with open(path, 'rb') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break  # torn write at the tail: the send was never acknowledged
+            if 'message' in entry:
+                records.append(entry['message'])
+            else:
+                committed.update(entry['committed'])
+    return [record for record in records if record['id'] not in committed]
+
+
+def unstored(session, records):
+    """The records whose message id is not in swap_messages yet."""
+    ids = [record['id'] for record in records]
+    if not ids:
+        return []
+    stored = set(session.execute(select(SwapMessage.id).where(SwapMessage.id.in_(ids))).scalars())
+    return [record for record in records if record['id'] not in stored]
+
+
+def _record_message(record):
+    """Transient SwapMessage for a journal record, for delivery before it is stored."""
+    return SwapMessage(
+        id=record['id'],
+        conversation_id=record['conversation_id'],
+        sender_id=record['sender_id'],
+        recipient_id=record['recipient_id'],
+        content=record['content'],
+        type=MessageType.TEXT,
+        timestamp=datetime.fromisoformat(record['timestamp']),
+    )
+
+
+def _reserve(session, conversation_id, records):
+    """
+    Move the conversation's activity columns for `records` and reserve their seq numbers.
+
+    Returns:
+        (last reserved seq, sender id, recipient id), or None if the conversation is gone.
+    """
+    conversation = SwapConversation
+    newest = max(records, key=lambda record: record['timestamp'])
+    oldest = min(records, key=lambda record: record['timestamp'])
+    newest_at = datetime.fromisoformat(newest['timestamp'])
+    oldest_at = datetime.fromisoformat(oldest['timestamp'])
+    is_newest = or_(conversation.last_message_at.is_(None), conversation.last_message_at <= newest_at)
+    return session.execute(
+        update(conversation)
+        .where(conversation.id == conversation_id)
+        .values(
+            message_count=conversation.message_count + len(records),
+            last_message_seq=conversation.last_message_seq + len(records),
+            last_message_at=case((is_newest, newest_at), else_=conversation.last_message_at),
+            last_message_preview=case((is_newest, newest['content'][:PREVIEW_LENGTH]),
+                                      else_=conversation.last_message_preview),
+            first_message_at=case(
+                (or_(conversation.first_message_at.is_(None), conversation.first_message_at > oldest_at),
+                 oldest_at),
+                else_=conversation.first_message_at),
+        )
+        .returning(conversation.last_message_seq, conversation.sender_id, conversation.recipient_id),
+        execution_options={'synchronize_session': False},
+    ).one_or_none()
+
+
+def write_batch(session, records, logger=None):
+    """
+    Insert `records` in one transaction and commit.
+
+    Returns:
+        the number of messages inserted (records for conversations that no longer exist are dropped).
+    """
+    by_conversation = defaultdict(list)
+    for record in records:
+        by_conversation[record['conversation_id']].append(record)
+
+    rows, users = [], set()
+    for conversation_id, batch in by_conversation.items():
+        reserved = _reserve(session, conversation_id, batch)
+        if reserved is None:
+            if logger:
+                logger.warning("Dropped %d chat messages for missing conversation %s", len(batch), conversation_id)
+            continue
+        last_seq, sender_id, recipient_id = reserved
+        users.update((sender_id, recipient_id))
+        batch.sort(key=lambda record: record['timestamp'])
+        for seq, record in enumerate(batch, last_seq - len(batch) + 1):
+            rows.append(dict(record, seq=seq, type=MessageType.TEXT,
+                             timestamp=datetime.fromisoformat(record['timestamp'])))
+    if rows:
+        session.execute(insert(SwapMessage.__table__), rows)
+    session.commit()
+    # The bulk statements bypass the flush hooks that keep the dashboard cache current
+    dashboard_cache.invalidate(users)
+    return len(rows)
+
+
+class ChatWriteBehind:
+    """A worker's message queue, journal and flusher thread."""
+
+    def __init__(self, app, journal_dir, flush_interval=0.005, batch_size=200, max_pending=5000, fsync=True):
+        self.app = app
+        self.journal_dir = journal_dir
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.fsync = fsync
+        self.journal = None
+        self.flushed = 0
+        self.batches = 0
+        self.rejected = 0
+        self._pending = []
+        self._appended = 0  # journal appends so far
+        self._synced = 0    # of which fsynced
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._stopping = False
+        self._retrying = False
+
+    def _start(self):
+        # On first use rather than at init, so a pre-forking server starts one per worker
+        self.journal = MessageJournal.create(self.journal_dir, fsync=self.fsync)
+        self._thread = threading.Thread(target=self._run, name='chat-write-behind', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, conversation, sender_id, content):
+        """Journal a validated message from `sender_id`; returns it as an unsaved SwapMessage."""
+        record = {
+            'id': generate_uuid(),
+            'conversation_id': conversation.id,
+            'sender_id': sender_id,
+            'recipient_id': conversation.recipient_id if sender_id == conversation.sender_id
+            else conversation.sender_id,
+            'content': content,
+            'timestamp': naive_utc(datetime.now(timezone.utc)).isoformat(),
+        }
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self.rejected += 1
+                raise ChatBusy("Too many messages waiting to be saved; try again shortly")
+            if self.journal is None:
+                self._start()
+            self.journal.append([record], sync=False)
+            self._appended += 1
+            appended = self._appended
+            self._pending.append(record)
+            if len(self._pending) >= self.batch_size:
+                self._wake.set()
+        self._sync_journal(appended)
+        message = _record_message(record)
+        message.sender = db.session.get(User, sender_id)
+        return message
+
+    def _sync_journal(self, appended):
+        """Return once the journal is fsynced through append number `appended`."""
+        with self._sync_lock:
+            if self._synced >= appended:
+                return  # an fsync started after that append already covered it
+            with self._lock:
+                through = self._appended
+            self.journal.sync()
+            self._synced = through
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self):
+        """Write up to one batch of pending messages; returns how many were taken."""
+        with self._flush_lock:
+            with self._lock:
+                batch = self._pending[:self.batch_size]
+            if not batch:
+                return 0
+            with self.app.app_context():
+                try:
+                    # A failed attempt may have committed before the error reached us
+                    records = unstored(db.session, batch) if self._retrying else batch
+                    self.flushed += write_batch(db.session, records, self.app.logger)
+                    self._retrying = False
+                except Exception:
+                    self._retrying = True
+                    db.session.rollback()
+                    raise
+                finally:
+                    db.session.remove()
+            self.batches += 1
+            with self._lock:
+                del self._pending[:len(batch)]
+                if self._pending:
+                    self.journal.committed(record['id'] for record in batch)
+                else:
+                    self.journal.reset()
+            return len(batch)
+
+    def drain(self):
+        while self.flush():
+            pass
+
+    def _run(self):
+        backoff = self.flush_interval
+        while not self._stopping:
+            self._wake.wait(backoff)
+            self._wake.clear()
+            if self._stopping:
+                break  # close() writes what is left
+            try:
+                self.drain()
+                backoff = self.flush_interval
+            except Exception:
+                self.app.logger.exception("Chat write-behind flush failed; %d messages waiting", self.pending())
+                backoff = min(max(backoff * 2, 0.05), 2.0)
+
+    def close(self):
+        """Stop the flusher, write what is left and drop the journal if it is empty."""
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+        try:
+            self.drain()
+        except Exception:
+            self.app.logger.exception("Chat write-behind could not flush on shutdown; replayed on next start")
+        self.journal.close(remove=not self._pending)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pending': len(self._pending),
+                'max_pending': self.max_pending,
+                'flushed': self.flushed,
+                'batches': self.batches,
+                'rejected': self.rejected,
+            }
+
+
+def replay_journals(app, journal_dir):
+    """Insert the uncommitted messages of every journal no running worker holds; returns how many."""
+    replayed = 0
+    for path in sorted(glob.glob(os.path.join(journal_dir, JOURNAL_PATTERN))):
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            continue  # a worker booting alongside this one replayed it first
+        with f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                continue  # a live worker's journal
+            missing = unstored(db.session, read_journal(path))
+            if missing:
+                replayed += write_batch(db.session, missing, app.logger)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+    if replayed:
+        app.logger.warning("Replayed %d chat messages from unflushed journals", replayed)
+    return replayed
+
+
+def init_chat_write_behind(app):
+    """Replay journals left by crashed workers and, with CHAT_WRITE_BEHIND on, set up this worker's pipeline."""
+    journal_dir = app.config.get('CHAT_JOURNAL_DIR') or os.path.join(app.instance_path, 'chat-journal')
+    if os.path.isdir(journal_dir):
+        with app.app_context():
+            replay_journals(app, journal_dir)
+    if not app.config.get('CHAT_WRITE_BEHIND'):
+        return None
+    pipeline = ChatWriteBehind(
+        app, journal_dir,
+        flush_interval=app.config.get('CHAT_FLUSH_INTERVAL_MS', 5) / 1000,
+        batch_size=app.config.get('CHAT_FLUSH_BATCH_SIZE', 200),
+        max_pending=app.config.get('CHAT_MAX_PENDING_MESSAGES', 5000),
+    )
+    app.extensions['chat_write_behind'] = pipeline
+    return pipeline
@@ -0,0 +1,77 @@
+# services/conversation_activity.py
+"""
+Bulk rebuild of the conversation inbox columns.
+
+SwapConversation.message_count, first_message_at, last_message_at,
+last_message_preview and last_message_seq are maintained at flush time
+(models/conversation_activity.py). This
+recomputes them from swap_messages with one correlated UPDATE per id range,
+for backfills and for repairing drift after bulk writes that skip the ORM.
+"""
+
+from flask import current_app
+from sqlalchemy import String, case, cast, func, literal, select, update
+
+from app.models import db, SwapConversation, SwapMessage, MessageType
+from app.models.swap_message import PREVIEW_LENGTH
+from app.services.dashboard_cache import dashboard_cache
+from app.services.swap_status import chunk_bounds, _in_range
+
+
+def _preview():
+    """SQL twin of SwapMessage.preview."""
+    return case(
+        (SwapMessage.type == MessageType.TEXT, func.substr(SwapMessage.content, 1, PREVIEW_LENGTH)),
+        else_=literal('[') + func.lower(cast(SwapMessage.type, String)) + literal(']'),
+    )
+
+
+def _refresh(lower, upper):
+    messages = SwapMessage.conversation_id == SwapConversation.id
+    newest = (
+        select(_preview())
+        .where(messages)
+        .order_by(SwapMessage.timestamp.desc(), SwapMessage.id.desc())
+        .limit(1)
+    )
+    return (
+        update(SwapConversation)
+        .where(_in_range(SwapConversation.id, lower, upper))
+        .values(
+            message_count=select(func.count()).where(messages).scalar_subquery(),
+            first_message_at=select(func.min(SwapMessage.timestamp)).where(messages).scalar_subquery(),
+            last_message_at=select(func.max(SwapMessage.timestamp)).where(messages).scalar_subquery(),
+            last_message_preview=newest.scalar_subquery(),
+            last_message_seq=select(func.coalesce(func.max(SwapMessage.seq), 0)).where(messages).scalar_subquery(),
+        )
+    )
+
+
+def recompute_conversation_activity(session=None, chunk_size=None):
+    """
+    Rebuild every conversation's message count, first/last message times and preview.
+
+    Returns:
+        Number of conversations rewritten.
+    """
+    session = session or db.session
+    chunk_size = chunk_size or current_app.config.get('SWAP_STATUS_CHUNK_SIZE', 5000)
+    rewritten = 0
+    for lower, upper in chunk_bounds(session, chunk_size, SwapConversation.id):
+        result = session.execute(_refresh(lower, upper), execution_options={'synchronize_session': False})
+        rewritten += result.rowcount
+        session.commit()
+
+    # Bulk UPDATEs bypass the flush hooks that keep the dashboard cache current
+    session.expire_all()
+    dashboard_cache.clear()
+    return rewritten
+
+
+def init_conversation_activity(app):
+    """Register `flask recompute-conversation-activity`."""
+
+    @app.cli.command('recompute-conversation-activity')
+    def recompute_command():
+        """Rebuild conversation message counts, first/last message times and previews."""
+        print(f"Conversation activity rebuilt for {recompute_conversation_activity()} conversations.")
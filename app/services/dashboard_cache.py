@@ -0,0 +1,260 @@
+# services/dashboard_cache.py
+"""
+Per-user cache of the dashboard view model.
+
+Entries are keyed by user id and dropped as soon as a commit touches a
+Swap, SwapRequest, DiscussRequest, Skill, SwapConversation or SwapMessage
+row involving that user. Two backends are available:
+
+- LRUBackend: in-process, bounded, with a TTL. Other workers only see an
+  invalidation once their own entry expires, so keep the TTL short when
+  running several gunicorn workers.
+- SharedBackend: any Redis-compatible client (get/set/delete), shared by
+  every worker. LocalStore is an in-memory stand-in with the same interface
+  for development and tests.
+"""
+
+import fnmatch
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, union
+from sqlalchemy.orm import Session
+
+from app.models import db, Skill, Swap, SwapRequest, DiscussRequest, SwapConversation, SwapMessage
+
+
+class LRUBackend:
+    """Thread-safe LRU mapping with per-entry expiry."""
+
+    def __init__(self, maxsize=1024, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class LocalStore:
+    """In-memory stand-in for a Redis client (get / set(ex=) / delete / scan_iter(match=))."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ex if ex else None, value)
+        return True
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(self._data.pop(key, None) is not None for key in keys)
+
+    def scan_iter(self, match='*'):
+        with self._lock:
+            keys = [key for key in self._data if fnmatch.fnmatchcase(key, match)]
+        yield from keys
+
+
+class SharedBackend:
+    """Cache backend stored in a Redis-compatible key/value server."""
+
+    def __init__(self, client, ttl=30, prefix='dashboard:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        if url.startswith('memory://'):
+            return cls(LocalStore(), **kwargs)
+        import redis  # optional dependency, only needed for a real shared store
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=self.ttl)
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+    def clear(self):
+        # Only this cache's keys: the server may hold the Socket.IO queue and other tenants' data
+        batch = []
+        for key in self.client.scan_iter(match=self.prefix + '*'):
+            batch.append(key)
+            if len(batch) == 500:
+                self.client.delete(*batch)
+                batch = []
+        if batch:
+            self.client.delete(*batch)
+
+
+class DashboardCache:
+    """Front end over a backend that counts hits, misses and invalidations."""
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def init_app(self, app):
+        kind = app.config.get('DASHBOARD_CACHE_BACKEND', 'lru')
+        ttl = app.config.get('DASHBOARD_CACHE_TTL', 30)
+        if kind == 'shared':
+            self.backend = SharedBackend.from_url(app.config.get('DASHBOARD_CACHE_URL') or 'memory://', ttl=ttl)
+        elif kind == 'lru':
+            self.backend = LRUBackend(maxsize=app.config.get('DASHBOARD_CACHE_SIZE', 1024), ttl=ttl)
+        else:
+            self.backend = None
+        self.reset_stats()
+        _register_listeners()
+        app.extensions['dashboard_cache'] = self
+
+    def get_or_load(self, user_id, loader):
+        """Return the cached view model for `user_id`, building it with `loader` on a miss."""
+        if self.backend is None:
+            return loader(user_id)
+        value = self.backend.get(user_id)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = loader(user_id)
+        self.backend.set(user_id, value)
+        return value
+
+    def invalidate(self, user_ids):
+        user_ids = [uid for uid in user_ids if uid]
+        if self.backend is not None and user_ids:
+            self.backend.delete(*user_ids)
+            self.invalidations += len(user_ids)
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+    def reset_stats(self):
+        self.hits = self.misses = self.invalidations = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__ if self.backend else None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }
+
+
+dashboard_cache = DashboardCache()
+
+_PENDING_KEY = 'dashboard_cache_users'
+
+
+def _affected_users(session, instances):
+    """User ids whose dashboard shows any of the given rows."""
+    users = set()
+    swap_ids = set()
+    desired_skill_name_ids = set()
+
+    for obj in instances:
+        if isinstance(obj, (SwapRequest, DiscussRequest, SwapConversation)):
+            users.update((obj.sender_id, obj.recipient_id))
+            if isinstance(obj, SwapConversation):
+                swap_ids.add(obj.swap_id)
+        elif isinstance(obj, SwapMessage):
+            # Its conversation's counters are moved in SQL, not always through a dirty SwapConversation
+            users.update((obj.sender_id, obj.recipient_id))
+        elif isinstance(obj, Skill):
+            users.add(obj.user_id)
+        elif isinstance(obj, Swap):
+            users.add(obj.user_id)
+            swap_ids.add(obj.id)
+            desired_skill_name_ids.add(obj.desired_skill_name_id)
+
+    # A swap appears on the cards of everyone negotiating it and in the
+    # stream of everyone offering the skill it asks for.
+    selects = []
+    for model in (SwapRequest, DiscussRequest, SwapConversation):
+        if swap_ids:
+            selects.append(db.select(model.sender_id).filter(model.swap_id.in_(swap_ids)))
+            selects.append(db.select(model.recipient_id).filter(model.swap_id.in_(swap_ids)))
+    if desired_skill_name_ids:
+        selects.append(db.select(Skill.user_id).filter(Skill.skill_name_id.in_(desired_skill_name_ids)))
+    if selects:
+        users.update(session.connection().execute(union(*selects)).scalars())
+    return users
+
+
+def _after_flush(session, flush_context):
+    instances = list(session.new) + list(session.dirty) + list(session.deleted)
+    if not any(isinstance(obj, (Skill, Swap, SwapRequest, DiscussRequest, SwapConversation, SwapMessage))
+               for obj in instances):
+        return
+    session.info.setdefault(_PENDING_KEY, set()).update(_affected_users(session, instances))
+
+
+def _after_commit(session):
+    users = session.info.pop(_PENDING_KEY, None)
+    if users:
+        dashboard_cache.invalidate(users)
+
+
+def _after_soft_rollback(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _register_listeners():
+    for name, fn in (('after_flush', _after_flush),
+                     ('after_commit', _after_commit),
+                     ('after_soft_rollback', _after_soft_rollback)):
+        if not event.contains(Session, name, fn):
+            event.listen(Session, name, fn)
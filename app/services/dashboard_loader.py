@@ -0,0 +1,229 @@
+# services/dashboard_loader.py
+"""
+Builds everything dashboard.html needs in a fixed number of queries.
+
+Every relationship the template touches is eager loaded up front and the
+"already requested" / "already discussed" lookups are answered from sets
+built out of rows we load anyway, so the query count does not grow with the
+number of swaps or requests on the page.
+"""
+
+from flask import current_app
+from sqlalchemy import or_
+from sqlalchemy.orm import joinedload, contains_eager
+
+from app.models import (
+    db, Skill, Swap, SwapRequest, DiscussRequest, SwapConversation, SwapStatus, RequestStatus,
+)
+from app.services.reference_data import reference_data
+from app.services.matching import matching_index
+from app.services.match_scoring import build_candidate_arrays, category_affinity, top_k
+
+VISIBLE_SWAP_STATUSES = (SwapStatus.open, SwapStatus.in_discussion)
+
+
+def _skill_label(skill):
+    return reference_data().skill_names.get(skill.skill_name_id, "N/A") if skill else "N/A"
+
+
+def _skill_view(skill):
+    return {
+        'id': skill.id,
+        'skill_name_id': skill.skill_name_id,
+        'category_id': skill.category_id,
+        'name': _skill_label(skill),
+        'category_name': reference_data().categories.get(skill.category_id, "N/A"),
+        'description': skill.description,
+    }
+
+
+def swap_view(swap):
+    return {
+        'id': swap.id,
+        'user_id': swap.user_id,
+        'user_name': swap.user.name if swap.user else "Unknown",
+        'desired_skill_name_id': swap.desired_skill_name_id,
+        'desired_skill_name': reference_data().skill_names.get(swap.desired_skill_name_id, "N/A"),
+        'offered_skill_name': _skill_label(swap.offered_skill),
+        'description': swap.description,
+        'status': swap.status.value,
+        'timestamp': swap.timestamp,
+        'pending_requests': swap.pending_requests or 0,
+        'last_request_at': swap.last_request_at,
+    }
+
+
+def request_view(req):
+    """Shared view for SwapRequest and DiscussRequest rows."""
+    return {
+        'id': req.id,
+        'swap_id': req.swap_id,
+        'sender_id': req.sender_id,
+        'recipient_id': req.recipient_id,
+        'sender_name': req.sender.name if req.sender else "Unknown",
+        'recipient_name': req.recipient.name if req.recipient else "Unknown",
+        'sender_skill_name': _skill_label(req.sender_skill),
+        'recipient_skill_name': _skill_label(req.recipient_skill),
+        'swap_description': req.swap.description if req.swap else None,
+        'status': req.status.value,
+        'timestamp': req.timestamp,
+    }
+
+
+def _conversation_view(conversation, user_id):
+    discuss_request = conversation.discuss_request
+    if user_id == conversation.sender_id:
+        other_user = conversation.recipient
+        my_skill, their_skill = discuss_request.sender_skill, discuss_request.recipient_skill
+    else:
+        other_user = conversation.sender
+        my_skill, their_skill = discuss_request.recipient_skill, discuss_request.sender_skill
+    return {
+        'id': conversation.id,
+        'discuss_request_id': conversation.discuss_request_id,
+        'other_user_name': other_user.name if other_user else "Unknown",
+        'swap_description': conversation.swap.description,
+        'my_skill_name': _skill_label(my_skill),
+        'their_skill_name': _skill_label(their_skill),
+        'message_count': conversation.message_count or 0,
+        'last_message_at': conversation.last_message_at,
+        'last_message_preview': conversation.last_message_preview,
+    }
+
+
+def swap_stream_select(user_id):
+    """Visible swaps posted by other users that `user_id` has not requested yet."""
+    return db.select(Swap).filter(
+        Swap.user_id != user_id,
+        Swap.status.in_(VISIBLE_SWAP_STATUSES),
+        ~db.exists(
+            db.select(SwapRequest.id)
+            .filter(SwapRequest.swap_id == Swap.id, SwapRequest.sender_id == user_id)
+            .correlate(Swap)
+        ),
+    )
+
+
+def swap_load_options():
+    """Eager-load options for the swap stream cards."""
+    return (
+        joinedload(Swap.user),
+        joinedload(Swap.offered_skill),
+    )
+
+
+def request_load_options(model):
+    """Eager-load options for the request cards (both request models)."""
+    return (
+        joinedload(model.sender),
+        joinedload(model.recipient),
+        joinedload(model.swap),
+        joinedload(model.sender_skill),
+        joinedload(model.recipient_skill),
+    )
+
+
+def load_dashboard(user_id):
+    """
+    Build the dashboard view model for a user.
+
+    Returns:
+        dict of plain values ready to be passed to render_template. Issues
+        six queries regardless of how many swaps or requests exist; skill
+        and category names come from the reference data cache.
+    """
+    reference = reference_data()
+
+    user_skills = db.session.execute(
+        db.select(Skill).filter_by(user_id=user_id)
+    ).scalars().all()
+
+    swap_requests = db.session.execute(
+        db.select(SwapRequest)
+        .filter(or_(SwapRequest.sender_id == user_id, SwapRequest.recipient_id == user_id))
+        .options(*request_load_options(SwapRequest))
+    ).scalars().all()
+    sent_swap_requests = [r for r in swap_requests if r.sender_id == user_id]
+    received_swap_requests = [r for r in swap_requests if r.recipient_id == user_id]
+
+    discuss_requests = db.session.execute(
+        db.select(DiscussRequest)
+        .filter(or_(DiscussRequest.sender_id == user_id, DiscussRequest.recipient_id == user_id))
+        .options(*request_load_options(DiscussRequest))
+    ).scalars().all()
+    sent_discuss_requests = [r for r in discuss_requests if r.sender_id == user_id]
+    received_discuss_requests = [r for r in discuss_requests if r.recipient_id == user_id]
+
+    # Swaps the user has not requested yet, excluding their own
+    requested_swap_ids = {r.swap_id for r in sent_swap_requests}
+    # Candidates come from the matching index and are scored in one NumPy
+    # pass; only the top DASHBOARD_STREAM_SIZE are loaded as ORM objects.
+    # The database still filters out swaps that are no longer visible.
+    index = matching_index()
+    matches = [m for m in index.matches_for(user_id) if m.swap_id not in requested_swap_ids]
+    # Pending request counts are maintained on the swap row itself
+    pending_counts = dict(db.session.execute(
+        db.select(Swap.id, Swap.pending_requests)
+        .filter(
+            Swap.user_id != user_id,
+            Swap.status.in_(VISIBLE_SWAP_STATUSES),
+            Swap.desired_skill_name_id.in_({skill.skill_name_id for skill in user_skills}),
+            Swap.pending_requests > 0,
+        )
+    ).all())
+    candidates = build_candidate_arrays(matches, index, reference.category_codes, pending_counts)
+    affinity = category_affinity(
+        [skill.category_id for skill in user_skills]
+        + [r.recipient_skill.category_id for r in sent_swap_requests if r.recipient_skill],
+        reference.category_codes,
+    )
+    best = top_k(candidates, affinity, current_app.config.get('DASHBOARD_STREAM_SIZE', 60))
+    rank = {candidates.swap_ids[i]: position for position, i in enumerate(best)}
+    reciprocal = {m.swap_id for m in matches if m.reciprocal}
+    unrequested_swaps = db.session.execute(
+        swap_stream_select(user_id)
+        .filter(Swap.id.in_(list(rank)))
+        .options(*swap_load_options())
+    ).scalars().all()
+    unrequested_swaps.sort(key=lambda swap: rank[swap.id])
+
+    # A received swap request is "discussed" once the user has sent a discuss
+    # request to its sender about the same swap.
+    discussed = {(r.recipient_id, r.swap_id) for r in sent_discuss_requests}
+
+    active_conversations = db.session.execute(
+        db.select(SwapConversation)
+        .join(SwapConversation.swap)
+        .join(SwapConversation.discuss_request)
+        .filter(
+            (SwapConversation.sender_id == user_id) | (SwapConversation.recipient_id == user_id),
+            Swap.status != SwapStatus.completed,
+            DiscussRequest.status == RequestStatus.accepted,
+        )
+        .options(
+            contains_eager(SwapConversation.swap),
+            contains_eager(SwapConversation.discuss_request).joinedload(DiscussRequest.sender_skill),
+            contains_eager(SwapConversation.discuss_request).joinedload(DiscussRequest.recipient_skill),
+            joinedload(SwapConversation.sender),
+            joinedload(SwapConversation.recipient),
+        )
+        # Most recently active first; conversations with no messages yet go last
+        .order_by(SwapConversation.last_message_at.desc().nulls_last(), SwapConversation.id.desc())
+    ).unique().scalars().all()
+
+    return {
+        'skill_name_choices': reference.skill_name_choices,
+        'category_choices': reference.category_choices,
+        'offered_skill_choices': [(skill.id, _skill_label(skill)) for skill in user_skills],
+        'skills': [_skill_view(skill) for skill in user_skills],
+        'swaps': [dict(swap_view(swap), reciprocal=swap.id in reciprocal) for swap in unrequested_swaps],
+        'sent_swap_requests': [request_view(r) for r in sent_swap_requests],
+        'received_swap_requests': [request_view(r) for r in received_swap_requests],
+        'sent_discuss_requests': [request_view(r) for r in sent_discuss_requests],
+        'received_discuss_requests': [request_view(r) for r in received_discuss_requests],
+        'swap_request_exists': {swap.id: swap.id in requested_swap_ids for swap in unrequested_swaps},
+        'discuss_request_exists': {
+            r.id: (r.sender_id, r.swap_id) in discussed for r in received_swap_requests
+        },
+        'active_conversations': [_conversation_view(c, user_id) for c in active_conversations],
+    }
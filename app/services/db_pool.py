@@ -0,0 +1,203 @@
+# services/db_pool.py
+"""
+Connection pool settings and pool metrics.
+
+configure_pool() turns the DB_POOL_* settings in config.py into
+SQLALCHEMY_ENGINE_OPTIONS before the engines are built. Each gunicorn
+worker gets its own pool of DB_POOL_SIZE connections, plus up to
+DB_MAX_OVERFLOW extra ones under load; a request that finds all of them in
+use waits up to DB_POOL_TIMEOUT seconds. Connections are pinged on checkout
+and replaced after DB_POOL_RECYCLE seconds, so a restarted database or an
+idle-timeout on the server costs one retry instead of a failed request.
+
+With DB_PGBOUNCER set, PgBouncer in transaction mode does the pooling:
+each checkout opens a connection to PgBouncer (NullPool), and psycopg's
+automatic prepared statements are turned off, since the next transaction
+may land on a different server connection that never saw them.
+
+init_pool_metrics() counts checkouts, connections currently checked out
+and how long each checkout waited for one, per engine, for
+/api/stats/db-pool. Waits over DB_POOL_SLOW_WAIT_MS and pool timeouts are
+logged with the pool's state at the time.
+"""
+
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import NullPool, QueuePool
+
+from app.models import db
+
+
+class _TimedCheckout:
+    """Pool mixin reporting how long each checkout waited to its PoolMetrics."""
+
+    metrics = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeout:
+            if self.metrics is not None:
+                self.metrics.timed_out(time.perf_counter() - start)
+            raise
+        if self.metrics is not None:
+            self.metrics.waited(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep reporting to the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class InstrumentedNullPool(_TimedCheckout, NullPool):
+    pass
+
+
+def engine_options(uri, settings):
+    """create_engine() keyword arguments for `uri` under the DB_POOL_* `settings`."""
+    url = make_url(uri)
+    if url.get_backend_name() == 'sqlite':
+        # In-memory databases live in one connection (Flask-SQLAlchemy uses StaticPool)
+        if url.database in (None, '', ':memory:'):
+            return {}
+        return {
+            'poolclass': InstrumentedQueuePool,
+            'pool_size': settings.get('DB_POOL_SIZE', 5),
+            'max_overflow': settings.get('DB_MAX_OVERFLOW', 10),
+            'pool_timeout': settings.get('DB_POOL_TIMEOUT', 30),
+        }
+
+    if settings.get('DB_PGBOUNCER'):
+        options = {'poolclass': InstrumentedNullPool}
+        if url.get_driver_name() == 'psycopg':
+            options['connect_args'] = {'prepare_threshold': None}
+        return options
+
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': settings.get('DB_POOL_SIZE', 5),
+        'max_overflow': settings.get('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': settings.get('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': settings.get('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': settings.get('DB_POOL_PRE_PING', True),
+    }
+
+
+def configure_pool(app):
+    """Fill in SQLALCHEMY_ENGINE_OPTIONS from the DB_POOL_* settings; call before db.init_app()."""
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI')
+    if uri:
+        options = engine_options(uri, app.config)
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options | app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+
+
+class PoolMetrics:
+    """Checkout counters and wait times for one engine's pool."""
+
+    def __init__(self, name, engine, logger, slow_wait_ms=100.0):
+        self.name = name
+        self.engine = engine
+        self.logger = logger
+        self.slow_wait = slow_wait_ms / 1000
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.slow_waits = 0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+        engine.pool.metrics = self
+        event.listen(engine, 'connect', self._on_connect)
+        event.listen(engine, 'checkout', self._on_checkout)
+        event.listen(engine, 'checkin', self._on_checkin)
+        event.listen(engine, 'invalidate', self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def waited(self, seconds):
+        with self._lock:
+            self.waits += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            slow = seconds > self.slow_wait
+            if slow:
+                self.slow_waits += 1
+        if slow:
+            self.logger.warning("Waited %.0fms for a %s database connection (%s)",
+                                seconds * 1000, self.name, self.engine.pool.status())
+
+    def timed_out(self, seconds):
+        with self._lock:
+            self.timeouts += 1
+            self.waits += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+        self.logger.error("Gave up on a %s database connection after %.0fms (%s)",
+                          self.name, seconds * 1000, self.engine.pool.status())
+
+    def stats(self):
+        pool = self.engine.pool
+        with self._lock:
+            return {
+                'pool': type(pool).__name__,
+                'size': pool.size() if hasattr(pool, 'size') else None,
+                'overflow': pool.overflow() if hasattr(pool, 'overflow') else None,
+                'checked_out': self.checked_out,
+                'peak_checked_out': self.peak_checked_out,
+                'checkouts': self.checkouts,
+                'connects': self.connects,
+                'invalidations': self.invalidations,
+                'timeouts': self.timeouts,
+                'slow_waits': self.slow_waits,
+                'wait_ms_total': round(self.wait_total * 1000, 3),
+                'wait_ms_max': round(self.wait_max * 1000, 3),
+                'wait_ms_avg': round(self.wait_total * 1000 / self.waits, 3) if self.waits else 0.0,
+            }
+
+
+def init_pool_metrics(app):
+    """Attach a PoolMetrics to each of the app's engines, in app.extensions['pool_metrics']."""
+    slow_wait_ms = app.config.get('DB_POOL_SLOW_WAIT_MS', 100.0)
+    with app.app_context():
+        engines = dict(db.engines)
+    app.extensions['pool_metrics'] = {
+        key or 'primary': PoolMetrics(key or 'primary', engine, app.logger, slow_wait_ms)
+        for key, engine in engines.items()
+    }
+
+
+def pool_stats(app):
+    """Per-engine pool stats for this worker."""
+    return {name: metrics.stats() for name, metrics in app.extensions.get('pool_metrics', {}).items()}
@@ -0,0 +1,129 @@
+# services/match_scoring.py
+"""
+Vectorized ranking of swap-stream candidates.
+
+Candidates arrive from the matching index and are packed into parallel
+NumPy arrays (reciprocity flag, category code, pending request count, age
+in seconds). One pass computes
+
+    score = w_reciprocal * reciprocal
+          + w_affinity   * affinity[category]
+          + w_recency    * 0.5 ** (age / half_life)
+          + w_fresh      / (1 + pending_requests)
+
+where `affinity` is the user's normalised interest per category (their own
+skills plus the categories they have sent requests for). The reciprocal
+weight exceeds the sum of the others, so two-way matches always rank
+first. The top k are selected with argpartition, then only those k are
+sorted.
+
+NumPy is imported on first use rather than with the module: it is a tenth
+of a second of worker boot that only the dashboard needs.
+"""
+
+from datetime import datetime, timezone
+
+WEIGHTS = {
+    'reciprocal': 4.0,
+    'affinity': 1.5,
+    'recency': 1.0,
+    'fresh': 0.5,
+}
+RECENCY_HALF_LIFE = 7 * 24 * 3600  # seconds
+
+
+class CandidateArrays:
+    """Column-oriented candidate features; row i describes swap_ids[i]."""
+
+    __slots__ = ('swap_ids', 'reciprocal', 'category', 'pending_requests', 'age')
+
+    def __init__(self, swap_ids, reciprocal, category, pending_requests, age):
+        import numpy as np
+
+        self.swap_ids = swap_ids
+        self.reciprocal = np.asarray(reciprocal, dtype=np.int8)
+        self.category = np.asarray(category, dtype=np.int32)
+        self.pending_requests = np.asarray(pending_requests, dtype=np.int32)
+        self.age = np.asarray(age, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.swap_ids)
+
+
+def build_candidate_arrays(matches, index, category_codes, pending_counts, now=None):
+    """
+    Pack matching-index candidates into CandidateArrays.
+
+    Args:
+        matches: Match tuples from MatchingIndex.matches_for().
+        index: the MatchingIndex, used to look up each swap's offered skill.
+        category_codes: category_id -> dense int code (unknown categories get -1).
+        pending_counts: swap_id -> number of pending requests on the swap.
+    """
+    import numpy as np
+
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    n = len(matches)
+    reciprocal = np.zeros(n, dtype=np.int8)
+    category = np.full(n, -1, dtype=np.int32)
+    pending = np.zeros(n, dtype=np.int32)
+    age = np.zeros(n, dtype=np.float32)
+    swap_ids = []
+    for i, match in enumerate(matches):
+        swap_ids.append(match.swap_id)
+        reciprocal[i] = match.reciprocal
+        entry = index.swap(match.swap_id)
+        skill = index.skill(entry.offered_skill_id) if entry else None
+        if skill is not None:
+            category[i] = category_codes.get(skill.category_id, -1)
+        pending[i] = pending_counts.get(match.swap_id, 0)
+        if match.timestamp is not None:
+            age[i] = (now - match.timestamp).total_seconds()
+    return CandidateArrays(swap_ids, reciprocal, category, pending, age)
+
+
+def category_affinity(category_ids, category_codes):
+    """Normalised interest vector over category codes from a list of category ids."""
+    import numpy as np
+
+    affinity = np.zeros(len(category_codes) + 1, dtype=np.float32)  # last slot: unknown
+    codes = [category_codes.get(cat_id, -1) for cat_id in category_ids]
+    if codes:
+        np.add.at(affinity, np.asarray(codes, dtype=np.int32), 1.0)
+        affinity /= affinity.max()
+    affinity[-1] = 0.0
+    return affinity
+
+
+def score(candidates, affinity, weights=WEIGHTS, half_life=RECENCY_HALF_LIFE):
+    """Score every candidate in one vectorized pass."""
+    import numpy as np
+
+    return (
+        weights['reciprocal'] * candidates.reciprocal
+        + weights['affinity'] * affinity[candidates.category]  # code -1 hits the unknown slot
+        + weights['recency'] * np.exp2(-np.maximum(candidates.age, 0) / half_life)
+        + weights['fresh'] / (1.0 + candidates.pending_requests)
+    )
+
+
+def top_k(candidates, affinity, k, **kwargs):
+    """
+    Indices of the k best candidates, best first.
+
+    Returns:
+        numpy int array of row positions into `candidates`.
+    """
+    import numpy as np
+
+    n = len(candidates)
+    if n == 0:
+        return np.empty(0, dtype=np.intp)
+    scores = score(candidates, affinity, **kwargs)
+    if k < n:
+        best = np.argpartition(-scores, k - 1)[:k]
+    else:
+        best = np.arange(n)
+    # Ties broken by age so ordering is stable for equal scores
+    order = np.lexsort((candidates.age[best], -scores[best]))
+    return best[order]
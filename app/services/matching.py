@@ -0,0 +1,255 @@
+# services/matching.py
+"""
+In-memory inverted index for matching users to swaps.
+
+The index maps each skill_name_id to the visible (open / in_discussion)
+swaps asking for it and to the users offering it, so "matches for user X"
+walks only X's own skills and the swaps that want them instead of scanning
+the swaps table. A match is reciprocal when the swap's author also offers
+something X is asking for in one of X's own swaps; those rank first.
+
+Commits in this worker are applied incrementally through session events.
+Writes made by other workers are picked up by a full rebuild every
+MATCH_INDEX_REFRESH seconds. One request at a time rebuilds, into fresh
+maps, while the others keep reading the current ones; changes applied
+while the rebuild loads are replayed onto its result before it is swapped
+in, and an invalidate() during the load leaves the result due for another
+rebuild.
+"""
+
+import threading
+import time
+from datetime import timezone
+from collections import defaultdict, namedtuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models import db, Skill, Swap, SwapStatus
+
+VISIBLE_SWAP_STATUSES = (SwapStatus.open, SwapStatus.in_discussion)
+
+SwapEntry = namedtuple('SwapEntry', 'user_id offered_skill_id desired_skill_name_id timestamp')
+SkillEntry = namedtuple('SkillEntry', 'user_id skill_name_id category_id')
+Match = namedtuple('Match', 'swap_id user_id reciprocal timestamp')
+
+
+def _naive(timestamp):
+    """Columns are stored without a timezone; drop tzinfo so fresh and loaded rows compare."""
+    if timestamp is not None and timestamp.tzinfo is not None:
+        return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+class MatchingIndex:
+    def __init__(self, refresh_interval=30):
+        self.refresh_interval = refresh_interval
+        self._lock = threading.RLock()
+        self._rebuild_lock = threading.Lock()  # one rebuild at a time
+        self._built_at = None
+        self._loaded = False
+        self._generation = 0  # bumped by invalidate()
+        self._replay = None   # changes applied while a rebuild loads
+        self._reset()
+
+    def _reset(self):
+        self._swaps = {}                              # swap_id -> SwapEntry
+        self._swaps_by_desired = defaultdict(set)     # skill_name_id -> {swap_id}
+        self._swaps_by_user = defaultdict(set)        # user_id -> {swap_id}
+        self._skills = {}                             # skill_id -> SkillEntry
+        self._offers_by_user = defaultdict(set)       # user_id -> {skill_name_id}
+        self._offerers = defaultdict(set)             # skill_name_id -> {user_id}
+
+    # -- maintenance -------------------------------------------------------
+
+    def _load(self):
+        """(skill rows, visible swap rows) from the database (two queries)."""
+        skills = db.session.execute(
+            db.select(Skill.id, Skill.user_id, Skill.skill_name_id, Skill.category_id)
+        ).all()
+        swaps = db.session.execute(
+            db.select(Swap.id, Swap.user_id, Swap.offered_skill_id, Swap.desired_skill_name_id, Swap.timestamp)
+            .filter(Swap.status.in_(VISIBLE_SWAP_STATUSES))
+        ).all()
+        return skills, swaps
+
+    def rebuild(self):
+        """Load the index from the database, unless another thread is already doing so."""
+        with self._rebuild_lock:
+            self._rebuild()
+
+    def _rebuild(self):
+        with self._lock:
+            generation = self._generation
+            self._replay = []
+        try:
+            skills, swaps = self._load()
+            fresh = MatchingIndex()
+            for skill_id, *fields in skills:
+                fresh._add_skill(skill_id, SkillEntry(*fields))
+            for swap_id, *fields in swaps:
+                fresh._add_swap(swap_id, SwapEntry(*fields))
+        except BaseException:
+            with self._lock:
+                self._replay = None
+            raise
+        with self._lock:
+            # Commits applied while loading may not be in what was loaded
+            fresh._apply(self._replay)
+            self._replay = None
+            self._swaps, self._swaps_by_desired, self._swaps_by_user = (
+                fresh._swaps, fresh._swaps_by_desired, fresh._swaps_by_user)
+            self._skills, self._offers_by_user, self._offerers = (
+                fresh._skills, fresh._offers_by_user, fresh._offerers)
+            self._loaded = True
+            self._built_at = time.monotonic() if self._generation == generation else None
+
+    def invalidate(self):
+        """Force a rebuild on next use, after writes that bypassed the flush hooks."""
+        with self._lock:
+            self._generation += 1
+            self._built_at = None
+
+    def ensure_fresh(self):
+        if self._built_at is not None and time.monotonic() - self._built_at < self.refresh_interval:
+            return
+        # Serve the current index while another request rebuilds it; only
+        # wait when there is nothing to serve yet
+        if not self._rebuild_lock.acquire(blocking=not self._loaded):
+            return
+        try:
+            if self._built_at is None or time.monotonic() - self._built_at >= self.refresh_interval:
+                self._rebuild()
+        finally:
+            self._rebuild_lock.release()
+
+    def _add_skill(self, skill_id, entry):
+        self._remove_skill(skill_id)
+        self._skills[skill_id] = entry
+        self._offers_by_user[entry.user_id].add(entry.skill_name_id)
+        self._offerers[entry.skill_name_id].add(entry.user_id)
+
+    def _remove_skill(self, skill_id):
+        entry = self._skills.pop(skill_id, None)
+        if entry:
+            self._offers_by_user[entry.user_id].discard(entry.skill_name_id)
+            self._offerers[entry.skill_name_id].discard(entry.user_id)
+
+    def _add_swap(self, swap_id, entry):
+        self._remove_swap(swap_id)
+        self._swaps[swap_id] = entry
+        self._swaps_by_desired[entry.desired_skill_name_id].add(swap_id)
+        self._swaps_by_user[entry.user_id].add(swap_id)
+
+    def _remove_swap(self, swap_id):
+        entry = self._swaps.pop(swap_id, None)
+        if entry:
+            self._swaps_by_desired[entry.desired_skill_name_id].discard(swap_id)
+            self._swaps_by_user[entry.user_id].discard(swap_id)
+
+    def apply(self, changes):
+        """Apply (kind, key, payload) tuples collected from a committed flush."""
+        with self._lock:
+            if self._replay is not None:
+                self._replay.extend(changes)
+            if self._loaded:
+                self._apply(changes)
+
+    def _apply(self, changes):
+        for kind, key, payload in changes:
+            if kind == 'skill':
+                if payload is None:
+                    self._remove_skill(key)
+                else:
+                    self._add_skill(key, payload)
+            elif kind == 'swap':
+                if payload is None:
+                    self._remove_swap(key)
+                else:
+                    self._add_swap(key, payload)
+
+    # -- queries -----------------------------------------------------------
+
+    def skill(self, skill_id):
+        return self._skills.get(skill_id)
+
+    def swap(self, swap_id):
+        return self._swaps.get(swap_id)
+
+    def offerers_of(self, skill_name_id):
+        return set(self._offerers.get(skill_name_id, ()))
+
+    def wants_of(self, user_id):
+        """skill_name_ids the user is asking for in their own visible swaps."""
+        return {self._swaps[sid].desired_skill_name_id for sid in self._swaps_by_user.get(user_id, ())}
+
+    def matches_for(self, user_id):
+        """
+        Swaps by other users that want one of `user_id`'s skills.
+
+        Returns:
+            list of Match, reciprocal matches first, newest first within each group.
+        """
+        self.ensure_fresh()
+        with self._lock:
+            wants = self.wants_of(user_id)
+            matches = []
+            for skill_name_id in self._offers_by_user.get(user_id, ()):
+                for swap_id in self._swaps_by_desired.get(skill_name_id, ()):
+                    entry = self._swaps[swap_id]
+                    if entry.user_id == user_id:
+                        continue
+                    offered = self._skills.get(entry.offered_skill_id)
+                    reciprocal = offered is not None and offered.skill_name_id in wants
+                    matches.append(Match(swap_id, entry.user_id, reciprocal, entry.timestamp))
+        matches.sort(key=lambda m: (m.timestamp is not None, m.timestamp), reverse=True)
+        matches.sort(key=lambda m: not m.reciprocal)
+        return matches
+
+
+def init_matching(app):
+    app.extensions['matching_index'] = MatchingIndex(app.config.get('MATCH_INDEX_REFRESH', 30))
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_soft_rollback', _after_soft_rollback)
+
+
+def matching_index():
+    return current_app.extensions['matching_index']
+
+
+_PENDING_KEY = 'matching_changes'
+
+
+def _after_flush(session, flush_context):
+    changes = []
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Skill):
+            changes.append(('skill', obj.id, SkillEntry(obj.user_id, obj.skill_name_id, obj.category_id)))
+        elif isinstance(obj, Swap):
+            if obj.status in VISIBLE_SWAP_STATUSES:
+                entry = SwapEntry(obj.user_id, obj.offered_skill_id, obj.desired_skill_name_id, _naive(obj.timestamp))
+                changes.append(('swap', obj.id, entry))
+            else:
+                changes.append(('swap', obj.id, None))
+    for obj in session.deleted:
+        if isinstance(obj, Skill):
+            changes.append(('skill', obj.id, None))
+        elif isinstance(obj, Swap):
+            changes.append(('swap', obj.id, None))
+    if changes:
+        session.info.setdefault(_PENDING_KEY, []).extend(changes)
+
+
+def _after_commit(session):
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes and has_app_context():
+        index = current_app.extensions.get('matching_index')
+        if index is not None:
+            index.apply(changes)
+
+
+def _after_soft_rollback(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,112 @@
+# services/message_partitions.py
+"""
+Monthly partitions of swap_messages on PostgreSQL.
+
+swap_messages is declared PARTITION BY RANGE (timestamp) (see
+models/swap_message.py), one partition per calendar month named
+swap_messages_yYYYYmMM, plus swap_messages_default for any row outside them.
+ensure_partitions() creates the current month's partition and the next
+MESSAGE_PARTITION_MONTHS_AHEAD, so writes never land in the default one; it
+runs when a worker boots and as `flask create-message-partitions`, which a
+monthly cron should call on long-lived deployments.
+
+History reads (services/chat_history.py) bound timestamp by the
+conversation's first and last message times, so the planner prunes every
+partition outside that window. A new partition can't be added for a month
+the default partition already holds rows for, hence creating them ahead.
+
+Each partition gets its own unique (conversation_id, seq) index, as
+PostgreSQL only allows a unique index on the partitioned table itself if it
+includes timestamp.
+
+SQLite keeps a single plain table and everything here is a no-op.
+"""
+
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+
+from app.models import db
+
+PARTITIONED_TABLE = 'swap_messages'
+DEFAULT_PARTITION = f'{PARTITIONED_TABLE}_default'
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, n):
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f'{PARTITIONED_TABLE}_y{month.year}m{month.month:02d}'
+
+
+def partition_ddl(month):
+    """CREATE TABLE for the partition holding `month`'s messages."""
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {PARTITIONED_TABLE} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+
+def partition_index_ddl(name):
+    """CREATE INDEX making (conversation_id, seq) unique within the partition `name`."""
+    return f"CREATE UNIQUE INDEX IF NOT EXISTS {name}_conversation_seq ON {name} (conversation_id, seq)"
+
+
+def existing_partitions(connection):
+    return set(connection.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "WHERE parent.relname = :table"
+    ), {'table': PARTITIONED_TABLE}).scalars())
+
+
+def ensure_partitions(connection, months_ahead=3, since=None, today=None):
+    """
+    Create any missing monthly partitions from `since` (default: this month) through months_ahead.
+
+    Returns:
+        list of the partition names created (always empty off PostgreSQL).
+    """
+    if connection.dialect.name != 'postgresql':
+        return []
+    this_month = month_start(today or datetime.now(timezone.utc))
+    month = month_start(since) if since else this_month
+    existing = existing_partitions(connection)
+    created = []
+    if DEFAULT_PARTITION not in existing:
+        connection.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} "
+                                f"PARTITION OF {PARTITIONED_TABLE} DEFAULT"))
+        created.append(DEFAULT_PARTITION)
+    while month <= add_months(this_month, months_ahead):
+        if partition_name(month) not in existing:
+            connection.execute(text(partition_ddl(month)))
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+    for name in created:
+        connection.execute(text(partition_index_ddl(name)))
+    return created
+
+
+def ensure_message_partitions(app):
+    """Create this month's and the coming months' partitions; one catalog query when they exist."""
+    if db.engine.dialect.name != 'postgresql':
+        return []
+    with db.engine.begin() as connection:
+        return ensure_partitions(connection, app.config.get('MESSAGE_PARTITION_MONTHS_AHEAD', 3))
+
+
+def init_message_partitions(app):
+    """Register `flask create-message-partitions`."""
+
+    @app.cli.command('create-message-partitions')
+    def create_partitions_command():
+        """Create the swap_messages partitions for this month and the next MESSAGE_PARTITION_MONTHS_AHEAD."""
+        created = ensure_message_partitions(app)
+        print(f"Created partitions: {', '.join(created)}." if created else "No partitions to create.")
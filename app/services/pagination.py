@@ -0,0 +1,83 @@
+# services/pagination.py
+"""
+Keyset (cursor) pagination over (timestamp, id).
+
+Cursors are opaque URL-safe strings encoding the sort key of the last row
+on a page, so fetching the next page is an index range scan rather than an
+OFFSET that re-reads every earlier row.
+"""
+
+import base64
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import or_, and_
+
+from app.models import db
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue."""
+
+
+def encode_cursor(timestamp, row_id):
+    raw = f"{timestamp.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        timestamp, row_id = base64.urlsafe_b64decode(padded).decode().split('|', 1)
+        return datetime.fromisoformat(timestamp), row_id
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+def page_size(requested=None):
+    """Clamp a client supplied page size to the configured bounds."""
+    default = current_app.config.get('API_PAGE_SIZE', 20)
+    maximum = current_app.config.get('API_MAX_PAGE_SIZE', 100)
+    try:
+        size = int(requested) if requested else default
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, maximum))
+
+
+def keyset_page(stmt, model, cursor=None, limit=20, descending=True):
+    """
+    Fetch one page of `stmt` ordered by (model.timestamp, model.id).
+
+    Args:
+        stmt: a select() over `model`, with any filters already applied.
+        cursor: the `next_cursor` of the previous page, or None for the first.
+        descending: newest first when True, oldest first otherwise.
+
+    Returns:
+        (rows, next_cursor) where next_cursor is None on the last page.
+    """
+    ts_col, id_col = model.timestamp, model.id
+    if cursor:
+        ts, row_id = decode_cursor(cursor)
+        if descending:
+            stmt = stmt.filter(or_(ts_col < ts, and_(ts_col == ts, id_col < row_id)))
+        else:
+            stmt = stmt.filter(or_(ts_col > ts, and_(ts_col == ts, id_col > row_id)))
+
+    if descending:
+        stmt = stmt.order_by(ts_col.desc(), id_col.desc())
+    else:
+        stmt = stmt.order_by(ts_col.asc(), id_col.asc())
+
+    # Fetch one extra row to learn whether another page exists
+    rows = db.session.execute(
+        stmt.limit(limit + 1)
+    ).unique().scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.timestamp, last.id)
+    return rows, next_cursor
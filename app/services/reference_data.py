@@ -0,0 +1,112 @@
+# services/reference_data.py
+"""
+Read-mostly cache of the SkillName and Category tables.
+
+Both tables are seeded at startup and rarely change, yet every form page
+needs them for SelectField choices. Each worker loads them once and keeps
+prebuilt choice tuples plus id -> name maps. Writes to either table bump a
+version stamp in app_meta; workers compare their stamp against it at most
+every REFERENCE_CACHE_CHECK_INTERVAL seconds and reload when it differs.
+"""
+
+import threading
+import time
+import uuid
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, update, insert
+from sqlalchemy.orm import Session
+
+from app.models import db, SkillName, Category, AppMeta
+
+VERSION_KEY = 'reference_version'
+
+
+class ReferenceData:
+    """Immutable snapshot of the reference tables."""
+
+    def __init__(self, version, skill_names, categories):
+        self.version = version
+        self.skill_name_choices = [(sn_id, name) for sn_id, name in skill_names]
+        self.category_choices = [(cat_id, name) for cat_id, name in categories]
+        self.skill_names = dict(self.skill_name_choices)
+        self.categories = dict(self.category_choices)
+        # Dense integer codes, used to index NumPy arrays keyed by category
+        self.category_codes = {cat_id: code for code, (cat_id, _) in enumerate(self.category_choices)}
+
+
+class ReferenceCache:
+    def __init__(self, app=None):
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._stale = True
+        self._lock = threading.Lock()
+        self.check_interval = 5
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.check_interval = app.config.get('REFERENCE_CACHE_CHECK_INTERVAL', 5)
+        app.extensions['reference_cache'] = self
+        app.add_template_filter(lambda sn_id: self.get().skill_names.get(sn_id, "N/A"), 'skill_name_label')
+        app.add_template_filter(lambda cat_id: self.get().categories.get(cat_id, "N/A"), 'category_label')
+        if not event.contains(Session, 'after_flush', _after_flush):
+            event.listen(Session, 'after_flush', _after_flush)
+            event.listen(Session, 'after_commit', _after_commit)
+
+    def invalidate(self):
+        self._stale = True
+
+    def get(self):
+        """Return the current snapshot, reloading it if the version stamp moved."""
+        now = time.monotonic()
+        snapshot = self._snapshot
+        if snapshot is not None and not self._stale and now - self._checked_at < self.check_interval:
+            return snapshot
+
+        with self._lock:
+            version = db.session.execute(
+                db.select(AppMeta.value).filter_by(key=VERSION_KEY)
+            ).scalar_one_or_none()
+            # A missing stamp (None) is a version like any other: the first write
+            # through bump_version() inserts one, which moves it
+            if self._snapshot is None or self._snapshot.version != version:
+                skill_names = db.session.execute(
+                    db.select(SkillName.id, SkillName.name).order_by(SkillName.name)
+                ).all()
+                categories = db.session.execute(
+                    db.select(Category.id, Category.name).order_by(Category.name)
+                ).all()
+                self._snapshot = ReferenceData(version, skill_names, categories)
+            self._checked_at = now
+            self._stale = False
+            return self._snapshot
+
+
+def reference_data():
+    """Snapshot of the reference tables for the current app."""
+    return current_app.extensions['reference_cache'].get()
+
+
+def bump_version(connection):
+    """Stamp the reference tables as changed (runs inside the writing transaction)."""
+    stamp = uuid.uuid4().hex
+    result = connection.execute(
+        update(AppMeta).where(AppMeta.key == VERSION_KEY).values(value=stamp)
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(AppMeta).values(key=VERSION_KEY, value=stamp))
+
+
+def _after_flush(session, flush_context):
+    changed = list(session.new) + list(session.dirty) + list(session.deleted)
+    if any(isinstance(obj, (SkillName, Category)) for obj in changed):
+        bump_version(session.connection())
+        session.info['reference_changed'] = True
+
+
+def _after_commit(session):
+    if session.info.pop('reference_changed', False) and has_app_context():
+        cache = current_app.extensions.get('reference_cache')
+        if cache is not None:
+            cache.invalidate()
@@ -0,0 +1,114 @@
+# services/replicas.py
+"""
+Read replicas for read-only routes.
+
+Every SQLALCHEMY_BINDS entry whose key starts with `replica` (built from
+REPLICA_DATABASE_URIS in config.py) joins the app's ReplicaPool. Views
+decorated with @read_only have their GET/HEAD requests served from the
+pool, round-robin, by RoutingSession (models/routing.py); anything that
+writes, and any read after a write in the same request, uses the primary.
+
+A user who just wrote (say, accepted a request and was redirected to the
+chat) would otherwise read from a replica that has not caught up yet, so
+after a request writes, that user's reads stay on the primary for
+REPLICA_STICKY_SECONDS.
+
+A replica is pinged with SELECT 1 at most every
+REPLICA_HEALTH_CHECK_INTERVAL seconds. One that fails the ping is skipped
+until the interval has passed, and with no healthy replica reads fall back
+to the primary.
+"""
+
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, request, session
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.models import db
+from app.models.routing import mark_read_only
+
+REPLICA_BIND_PREFIX = 'replica'
+PRIMARY_UNTIL_KEY = 'primary_until'
+
+
+class ReplicaPool:
+    """Round-robin over the replica binds, skipping ones that fail a health check."""
+
+    def __init__(self, bind_keys, check_interval=5.0):
+        self.bind_keys = list(bind_keys)
+        self.check_interval = check_interval
+        self._next = 0
+        self._checked_at = {}
+        self._down_until = {}
+        self._lock = threading.Lock()
+
+    def choose(self):
+        """The next healthy replica engine, or None when there is none."""
+        for _ in range(len(self.bind_keys)):
+            with self._lock:
+                key = self.bind_keys[self._next % len(self.bind_keys)]
+                self._next += 1
+            if self._healthy(key):
+                return db.engines[key]
+        return None
+
+    def _healthy(self, key):
+        now = time.monotonic()
+        if self._down_until.get(key, 0.0) > now:
+            return False
+        checked_at = self._checked_at.get(key)
+        if checked_at is not None and now - checked_at < self.check_interval:
+            return True
+        try:
+            with db.engines[key].connect() as connection:
+                connection.execute(text("SELECT 1"))
+        except DBAPIError as e:
+            self.mark_down(key)
+            current_app.logger.warning("Replica %s failed its health check: %s", key, e)
+            return False
+        self._checked_at[key] = now
+        return True
+
+    def mark_down(self, key):
+        """Skip `key` until the next health check is due."""
+        self._down_until[key] = time.monotonic() + self.check_interval
+        self._checked_at.pop(key, None)
+
+    def status(self):
+        now = time.monotonic()
+        return {key: self._down_until.get(key, 0.0) <= now for key in self.bind_keys}
+
+
+def read_only(view):
+    """Route decorator: GET/HEAD requests to `view` may be served from a read replica."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method in ('GET', 'HEAD') and session.get(PRIMARY_UNTIL_KEY, 0) <= time.time():
+            mark_read_only()
+        return view(*args, **kwargs)
+
+    wrapper.read_only = True
+    return wrapper
+
+
+def _stick_writers_to_primary(response):
+    if db.session.info.get('wrote'):
+        session[PRIMARY_UNTIL_KEY] = time.time() + current_app.config.get('REPLICA_STICKY_SECONDS', 5.0)
+    return response
+
+
+def init_replicas(app):
+    """Build the app's ReplicaPool from its `replica*` binds (no-op without any)."""
+    keys = sorted(key for key in app.config.get('SQLALCHEMY_BINDS') or {}
+                  if key.startswith(REPLICA_BIND_PREFIX))
+    # Flask-SQLAlchemy keeps a (global) metadata per bind key; replicas own no
+    # tables, and create_all()/drop_all() must never touch them
+    for key in keys:
+        db.metadatas.pop(key, None)
+    if keys:
+        app.extensions['replicas'] = ReplicaPool(keys, app.config.get('REPLICA_HEALTH_CHECK_INTERVAL', 5.0))
+        app.after_request(_stick_writers_to_primary)
@@ -0,0 +1,209 @@
+# services/search.py
+"""
+Full-text search over skill and swap descriptions.
+
+Documents live in a dedicated index kept in sync by database triggers, so
+every write path (ORM, bulk SQL, migrations) updates it in the same
+transaction. The triggers fire only when an indexed column changes, so the
+status and counter updates swaps see all day leave the index alone. They
+are installed by migration 0010_search_index (or with the rest of a blank
+database, see app.sync_schema), never on boot; `flask search-reindex`
+rebuilds the documents.
+
+- SQLite: an FTS5 table `search_index` (porter stemming) whose rowids come
+  from `search_docs(kind, ref_id)`, so updates and deletes are rowid lookups.
+  ref_id holds the row's 16-byte key as stored.
+- PostgreSQL: `search_documents` with a stored tsvector column and a GIN
+  index, maintained by plpgsql triggers.
+
+A skill document is its skill name plus description; a swap document is the
+offered skill name, desired skill name and description. Queries are always
+answered from the index, never from LIKE scans.
+"""
+
+import re
+
+from markupsafe import escape
+from sqlalchemy import text, bindparam
+
+from app.models import db
+from app.models.base import UUIDKey
+
+# Sentinels wrapped around matched terms by the engine, swapped for <mark>
+# after the user-supplied text has been HTML-escaped.
+_MARK_START, _MARK_END = '\x02', '\x03'
+
+_SKILL_CONTENT = (
+    "COALESCE((SELECT name FROM skill_names WHERE id = {row}.skill_name_id), '')"
+    " || ' ' || {row}.description"
+)
+_SWAP_CONTENT = (
+    "COALESCE((SELECT sn.name FROM skills s JOIN skill_names sn ON sn.id = s.skill_name_id"
+    " WHERE s.id = {row}.offered_skill_id), '')"
+    " || ' ' || COALESCE((SELECT name FROM skill_names WHERE id = {row}.desired_skill_name_id), '')"
+    " || ' ' || {row}.description"
+)
+# (kind, table, document SQL, the columns the document is built from)
+_SOURCES = (
+    ('skill', 'skills', _SKILL_CONTENT, 'skill_name_id, description'),
+    ('swap', 'swaps', _SWAP_CONTENT, 'offered_skill_id, desired_skill_name_id, description'),
+)
+
+
+def _sqlite_ddl():
+    statements = [
+        "CREATE TABLE IF NOT EXISTS search_docs ("
+        " rowid INTEGER PRIMARY KEY, kind TEXT NOT NULL, ref_id BLOB NOT NULL, UNIQUE (kind, ref_id))",
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(content, tokenize = 'porter unicode61')",
+    ]
+    for kind, table, content, columns in _SOURCES:
+        insert = (
+            f"INSERT INTO search_docs (kind, ref_id) VALUES ('{kind}', NEW.id); "
+            f"INSERT INTO search_index (rowid, content) VALUES (last_insert_rowid(), {content.format(row='NEW')}); "
+        )
+        delete = (
+            f"DELETE FROM search_index WHERE rowid = "
+            f"(SELECT rowid FROM search_docs WHERE kind = '{kind}' AND ref_id = OLD.id); "
+            f"DELETE FROM search_docs WHERE kind = '{kind}' AND ref_id = OLD.id; "
+        )
+        # Dropped first so a database with older trigger definitions gets these
+        statements += [f"DROP TRIGGER IF EXISTS {table}_search_{suffix}" for suffix in ('ai', 'au', 'ad')]
+        statements += [
+            f"CREATE TRIGGER {table}_search_ai AFTER INSERT ON {table} BEGIN {insert}END",
+            f"CREATE TRIGGER {table}_search_au AFTER UPDATE OF {columns} ON {table} BEGIN {delete}{insert}END",
+            f"CREATE TRIGGER {table}_search_ad AFTER DELETE ON {table} BEGIN {delete}END",
+        ]
+    return statements
+
+
+def _postgres_ddl():
+    statements = [
+        "CREATE TABLE IF NOT EXISTS search_documents ("
+        " kind TEXT NOT NULL, ref_id TEXT NOT NULL, content TEXT NOT NULL,"
+        " tsv tsvector GENERATED ALWAYS AS (to_tsvector('english', content)) STORED,"
+        " PRIMARY KEY (kind, ref_id))",
+        "CREATE INDEX IF NOT EXISTS ix_search_documents_tsv ON search_documents USING GIN (tsv)",
+    ]
+    for kind, table, content, columns in _SOURCES:
+        statements += [
+            f"""CREATE OR REPLACE FUNCTION {table}_search_sync() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    DELETE FROM search_documents WHERE kind = '{kind}' AND ref_id = OLD.id::text;
+                    RETURN OLD;
+                END IF;
+                INSERT INTO search_documents (kind, ref_id, content)
+                VALUES ('{kind}', NEW.id::text, {content.format(row='NEW')})
+                ON CONFLICT (kind, ref_id) DO UPDATE SET content = EXCLUDED.content;
+                RETURN NEW;
+            END $$ LANGUAGE plpgsql""",
+            f"DROP TRIGGER IF EXISTS {table}_search_sync ON {table}",
+            f"CREATE TRIGGER {table}_search_sync AFTER INSERT OR UPDATE OF {columns} OR DELETE ON {table}"
+            f" FOR EACH ROW EXECUTE FUNCTION {table}_search_sync()",
+        ]
+    return statements
+
+
+def install_search(conn):
+    """Create the index tables and (re)create the triggers; the documents are left as they are."""
+    ddl = _postgres_ddl() if conn.dialect.name == 'postgresql' else _sqlite_ddl()
+    for statement in ddl:
+        conn.execute(text(statement))
+
+
+def _rebuild(conn):
+    if conn.dialect.name == 'postgresql':
+        conn.execute(text("TRUNCATE search_documents"))
+        for kind, table, content, _ in _SOURCES:
+            conn.execute(text(
+                f"INSERT INTO search_documents (kind, ref_id, content)"
+                f" SELECT '{kind}', t.id::text, {content.format(row='t')} FROM {table} t"
+            ))
+        return
+    conn.execute(text("DELETE FROM search_index"))
+    conn.execute(text("DELETE FROM search_docs"))
+    for kind, table, content, _ in _SOURCES:
+        conn.execute(text(f"INSERT INTO search_docs (kind, ref_id) SELECT '{kind}', id FROM {table}"))
+        conn.execute(text(
+            f"INSERT INTO search_index (rowid, content)"
+            f" SELECT d.rowid, {content.format(row='t')} FROM search_docs d"
+            f" JOIN {table} t ON t.id = d.ref_id WHERE d.kind = '{kind}'"
+        ))
+
+
+def rebuild_search_index():
+    with db.engine.begin() as conn:
+        _rebuild(conn)
+
+
+def init_search(app):
+    """Register `flask search-reindex`."""
+
+    @app.cli.command('search-reindex')
+    def search_reindex():
+        """Rebuild the full-text search index from the skills and swaps tables."""
+        rebuild_search_index()
+        print("Search index rebuilt.")
+
+
+def _fts5_query(terms):
+    """Quote each term so user input can never use FTS5 query syntax; last term is a prefix."""
+    quoted = ['"' + term.replace('"', '""') + '"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def _expanding(params):
+    return [bindparam(name, expanding=True) for name in ('kinds', 'statuses') if name in params]
+
+
+def _highlight(snippet):
+    return str(escape(snippet)).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+def search(query, kinds=('skill', 'swap'), limit=20, swap_statuses=None):
+    """
+    Ranked matches for a free-text query.
+
+    With `swap_statuses`, swaps in any other status are left out inside the
+    ranked query, so they never take up places within `limit`.
+
+    Returns:
+        list of dicts with kind, ref_id, rank (higher is better) and an
+        HTML-safe snippet with matches wrapped in <mark>.
+    """
+    terms = re.findall(r'\w+', query or '')
+    if not terms:
+        return []
+    kinds = list(kinds)
+    params = {'kinds': kinds, 'limit': limit}
+    status_filter = ''
+    if swap_statuses is not None:
+        status_filter = (" AND (d.kind <> 'swap' OR EXISTS (SELECT 1 FROM swaps s"
+                         " WHERE s.id = {ref_id} AND s.status IN :statuses))")
+        params['statuses'] = [status.name for status in swap_statuses]
+
+    if db.engine.dialect.name == 'postgresql':
+        rows = db.session.execute(text(
+            "SELECT kind, ref_id, ts_rank(tsv, q) AS rank,"
+            " ts_headline('english', content, q,"
+            f" 'StartSel={_MARK_START}, StopSel={_MARK_END}, MaxWords=24, MinWords=8') AS snippet"
+            " FROM search_documents d, plainto_tsquery('english', :q) q"
+            " WHERE tsv @@ q AND kind IN :kinds" + status_filter.format(ref_id='d.ref_id::uuid') +
+            " ORDER BY rank DESC LIMIT :limit"
+        ).bindparams(*_expanding(params)).columns(ref_id=UUIDKey),
+            dict(params, q=' '.join(terms))).all()
+    else:
+        rows = db.session.execute(text(
+            "SELECT d.kind, d.ref_id, -bm25(search_index) AS rank,"
+            f" snippet(search_index, 0, '{_MARK_START}', '{_MARK_END}', '…', 16) AS snippet"
+            " FROM search_index JOIN search_docs d ON d.rowid = search_index.rowid"
+            " WHERE search_index MATCH :q AND d.kind IN :kinds" + status_filter.format(ref_id='d.ref_id') +
+            " ORDER BY bm25(search_index) LIMIT :limit"
+        ).bindparams(*_expanding(params)).columns(ref_id=UUIDKey),
+            dict(params, q=_fts5_query(terms))).all()
+
+    return [
+        {'kind': kind, 'ref_id': ref_id, 'rank': float(rank), 'snippet': _highlight(snippet)}
+        for kind, ref_id, rank, snippet in rows
+    ]
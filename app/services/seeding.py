@@ -0,0 +1,169 @@
+# services/seeding.py
+"""
+Idempotent seeding of the Category and SkillName reference tables.
+
+The seed lists below are hashed and the hash is stamped in app_meta next to
+the reference data version. On startup ensure_seeded() reads that one row
+and does nothing more when it matches, so booting a worker costs a single
+query (none with SEED_ON_STARTUP off). When the lists change, each table
+gets one bulk INSERT ... ON CONFLICT DO NOTHING, so rows already present
+are left alone and concurrent workers cannot insert duplicates.
+
+`flask seed-reference-data` runs the same seeding on demand.
+"""
+
+import hashlib
+import importlib
+import json
+
+from sqlalchemy import insert, select, update
+
+from app.models import db, Category, SkillName, AppMeta
+from app.models.base import generate_uuid
+from app.services.reference_data import bump_version
+
+SEED_HASH_KEY = 'seed_hash'
+
+# 🎓 University Life Categories (expanded)
+category_data = [
+    "Academic Tutoring",
+    "Tech & Programming",
+    "Campus Gigs & Freelance",
+    "Creative Skills",
+    "Career Prep & Productivity",
+    "Languages & Culture",
+    "Health & Wellness",
+    "Music & Performing Arts",
+    "Student Leadership & Advocacy",
+    "Life Skills",
+    "Financial Literacy",
+    "Mental Health & Self-Care",
+    "Outdoor & Adventure",
+    "Entrepreneurship & Startups",
+]
+
+# 🧠 Realistic Student Skills (expanded)
+skill_name_data = [
+    # Academic Tutoring
+    "Calculus Help", "Intro to Python", "Organic Chemistry Tutoring", "Essay Editing", "Research Help",
+    "Statistics Fundamentals", "Physics Problem Solving", "Linear Algebra Assistance", "Essay Writing Tips",
+
+    # Tech & Programming
+    "Web Design", "Java Debugging", "SQL Queries", "App Prototyping", "GitHub Basics",
+    "Data Visualization with Python", "Intro to Machine Learning", "Linux Command Line", "APIs with Flask",
+
+    # Campus Gigs & Freelance
+    "Photography for Events", "Resume Headshots", "Dorm Moving Help", "Flyer Design", "Social Media Posts",
+    "Tutoring Scheduling Assistant", "Event Setup Crew", "Campus Tour Guide", "Freelance Writing",
+
+    # Creative Skills
+    "Canva Design", "Spoken Word Coaching", "Podcast Editing", "Poster Art", "T-shirt Design",
+    "Creative Writing Workshops", "Digital Illustration Basics", "Video Editing Basics", "Photography Editing",
+
+    # Career Prep & Productivity
+    "Resume Reviews", "LinkedIn Optimization", "Time Blocking", "Notion Templates", "Study Scheduling",
+    "Interview Practice", "Networking Strategies", "Public Speaking Confidence", "Project Management Basics",
+
+    # Languages & Culture
+    "Beginner Spanish", "French Conversation Practice", "ASL Basics", "Cultural Exchange Partner",
+    "Japanese for Beginners", "Meditation & Mindfulness in Different Cultures", "German Basics", "Chinese Mandarin Intro",
+
+    # Health & Wellness
+    "Gym Partnering", "Meal Prepping on a Budget", "Mindfulness Techniques", "Yoga for Beginners",
+    "Stress Management", "Sleep Hygiene Tips", "Healthy Cooking", "Running Form Coaching",
+
+    # Music & Performing Arts
+    "Guitar Chords", "Music Production with FL Studio", "Dance Choreography", "Open Mic Performance Tips",
+    "Beatboxing Basics", "Stage Presence Coaching", "Piano Basics", "Songwriting Techniques",
+
+    # Student Leadership & Advocacy
+    "Event Planning Tips", "Student Org Management", "Campus Fundraising", "Public Speaking Coaching",
+    "Conflict Resolution in Groups", "Volunteer Coordination", "Leadership Skills", "Advocacy Strategies",
+
+    # Life Skills
+    "Laundry Tips", "Cooking Nigerian Jollof", "Budgeting with Excel", "Roommate Conflict Resolution",
+    "Basic Car Maintenance", "Travel Planning on a Budget", "Time Management", "Personal Safety",
+
+    # Financial Literacy
+    "Credit Score Basics", "Student Loan Management", "Investment 101", "Tax Filing for Beginners", "Building an Emergency Fund",
+
+    # Mental Health & Self-Care
+    "Dealing with Anxiety", "Building Healthy Habits", "Meditation for Beginners", "Journaling for Mental Clarity",
+
+    # Outdoor & Adventure
+    "Backpacking Essentials", "Rock Climbing Basics", "Camping Cooking Tips", "Hiking Trail Recommendations",
+
+    # Entrepreneurship & Startups
+    "Pitch Deck Creation", "Lean Startup Methodology", "Building an MVP", "Finding Co-Founders", "Marketing on a Budget",
+]
+
+
+
+def seed_hash():
+    """Content hash of the seed lists; changes whenever an entry is added, removed or renamed."""
+    payload = json.dumps({'categories': category_data, 'skill_names': skill_name_data}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _insert_missing(connection, model, names):
+    """One INSERT of every name not yet present; returns the number of rows added."""
+    rows = [{'id': generate_uuid(), 'name': name} for name in dict.fromkeys(names)]
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        dialect_insert = importlib.import_module(f'sqlalchemy.dialects.{dialect}').insert
+        stmt = dialect_insert(model).values(rows).on_conflict_do_nothing(index_elements=['name'])
+    else:
+        existing = set(connection.execute(select(model.name).where(model.name.in_(names))).scalars())
+        rows = [row for row in rows if row['name'] not in existing]
+        if not rows:
+            return 0
+        stmt = insert(model).values(rows)
+    return connection.execute(stmt).rowcount
+
+
+def seed_reference_data(session=None):
+    """
+    Insert any missing categories and skill names and stamp the seed hash.
+
+    Returns:
+        dict mapping table name to the number of rows inserted.
+    """
+    session = session or db.session
+    connection = session.connection()
+    inserted = {
+        model.__tablename__: _insert_missing(connection, model, names)
+        for model, names in ((Category, category_data), (SkillName, skill_name_data))
+    }
+    if any(inserted.values()):
+        # Core inserts skip the flush hook that normally bumps the version
+        bump_version(connection)
+        session.info['reference_changed'] = True
+
+    stamp = seed_hash()
+    if connection.execute(update(AppMeta).where(AppMeta.key == SEED_HASH_KEY).values(value=stamp)).rowcount == 0:
+        connection.execute(insert(AppMeta).values(key=SEED_HASH_KEY, value=stamp))
+    session.commit()
+    return inserted
+
+
+def ensure_seeded(app):
+    """Seed at startup only when the stamped hash is missing or stale: one query otherwise."""
+    if not app.config.get('SEED_ON_STARTUP', True):
+        return
+    stamped = db.session.execute(
+        select(AppMeta.value).where(AppMeta.key == SEED_HASH_KEY)
+    ).scalar_one_or_none()
+    if stamped != seed_hash():
+        inserted = seed_reference_data()
+        app.logger.info("Seeded %d categories and %d skill names",
+                        inserted['categories'], inserted['skill_names'])
+
+
+def init_seeding(app):
+    """Register `flask seed-reference-data`."""
+
+    @app.cli.command('seed-reference-data')
+    def seed_command():
+        """Insert any missing categories and skill names."""
+        inserted = seed_reference_data()
+        print(f"Inserted {inserted['categories']} categories and {inserted['skill_names']} skill names.")
@@ -0,0 +1,168 @@
+# services/swap_status.py
+"""
+Set-based recomputation of every swap's status.
+
+Swap.update_status() derives a swap's status from its requests one object
+at a time, which is fine after a single accept/reject but pulls the whole
+database across when run over every swap. Here each status rule is one
+aggregate over swap_requests applied with UPDATE ... FROM:
+
+  open           no swap requests at all
+  cancelled      every swap request rejected or cancelled
+  in_discussion  a swap request accepted, or some still pending and a
+                 discuss request accepted
+  open           some pending, nothing accepted
+
+The rules are mutually exclusive, so their order does not matter. Completed
+swaps are final (set when both sides accept in chat) and never recomputed.
+Each range first has its request counters (see models/transitions.py) and
+last_request_at rebuilt from the requests, repairing any drift; swaps whose
+counters already match are not rewritten.
+
+Swaps are processed in primary-key ranges of SWAP_STATUS_CHUNK_SIZE rows,
+each range in its own short transaction, so the job never holds locks on
+the whole table. UUIDv7 keys make these ranges roughly creation-ordered.
+"""
+
+from flask import current_app
+from sqlalchemy import and_, case, exists, func, or_, select, update
+
+from app.models import db, Swap, SwapRequest, DiscussRequest, SwapStatus, RequestStatus
+from app.models.transitions import SWAP_REQUEST_COUNTERS, DISCUSS_REQUEST_COUNTERS
+from app.services.dashboard_cache import dashboard_cache
+from app.services.matching import matching_index
+
+CLOSED_REQUEST_STATUSES = (RequestStatus.rejected, RequestStatus.cancelled)
+
+
+def _in_range(column, lower, upper):
+    conditions = []
+    if lower is not None:
+        conditions.append(column > lower)
+    if upper is not None:
+        conditions.append(column <= upper)
+    return and_(True, *conditions)
+
+
+def chunk_bounds(session, chunk_size, key=Swap.id):
+    """Yield (lower, upper] `key` ranges of at most chunk_size rows; None means unbounded."""
+    lower = None
+    while True:
+        stmt = select(key).order_by(key).offset(chunk_size - 1).limit(1)
+        if lower is not None:
+            stmt = stmt.where(key > lower)
+        upper = session.execute(stmt).scalar_one_or_none()
+        yield lower, upper
+        if upper is None:
+            return
+        lower = upper
+
+
+def _request_totals(lower, upper):
+    """Per-swap counts over swap_requests, restricted to one id range."""
+    total = func.count()
+    accepted = func.sum(case((SwapRequest.status == RequestStatus.accepted, 1), else_=0))
+    closed = func.sum(case((SwapRequest.status.in_(CLOSED_REQUEST_STATUSES), 1), else_=0))
+    discussed = exists().where(
+        DiscussRequest.swap_id == SwapRequest.swap_id,
+        DiscussRequest.status == RequestStatus.accepted,
+    )
+    stmt = (
+        select(SwapRequest.swap_id)
+        .where(_in_range(SwapRequest.swap_id, lower, upper))
+        .group_by(SwapRequest.swap_id)
+    )
+    return stmt, total, accepted, closed, discussed
+
+
+def _refresh_counters(lower, upper):
+    """
+    One UPDATE recounting the request counters and last_request_at over the (lower, upper] range;
+    only swaps whose stored values differ from the recount are written.
+    """
+    counters = {}
+    for model, mapping in ((SwapRequest, SWAP_REQUEST_COUNTERS), (DiscussRequest, DISCUSS_REQUEST_COUNTERS)):
+        for status, column in mapping.items():
+            counters.setdefault(column, (model, []))[1].append(status)
+    recount = select(Swap.id, *(
+        select(func.count())
+        .where(model.swap_id == Swap.id, model.status.in_(statuses))
+        .scalar_subquery()
+        .label(column)
+        for column, (model, statuses) in counters.items()
+    ), (
+        select(func.max(SwapRequest.timestamp))
+        .where(SwapRequest.swap_id == Swap.id)
+        .scalar_subquery()
+        .label('last_request_at')
+    )).where(_in_range(Swap.id, lower, upper)).subquery()
+    columns = [*counters, 'last_request_at']
+    return (
+        update(Swap)
+        .where(Swap.id == recount.c.id)
+        .where(or_(*(getattr(Swap, column).is_distinct_from(recount.c[column]) for column in columns)))
+        .values({column: recount.c[column] for column in columns})
+    )
+
+
+def _rules(lower, upper):
+    """(status, UPDATE statement) for each rule over the (lower, upper] range."""
+    stmt, total, accepted, closed, discussed = _request_totals(lower, upper)
+    aggregates = {
+        SwapStatus.cancelled: stmt.having(closed == total),
+        SwapStatus.in_discussion: stmt.having(or_(accepted > 0, and_(closed < total, discussed))),
+        SwapStatus.open: stmt.having(and_(accepted == 0, closed < total, ~discussed)),
+    }
+
+    rules = [(
+        SwapStatus.open,
+        update(Swap)
+        .where(_in_range(Swap.id, lower, upper))
+        .where(~exists().where(SwapRequest.swap_id == Swap.id)),
+    )]
+    for status, aggregate in aggregates.items():
+        matched = aggregate.subquery()
+        rules.append((status, update(Swap).where(Swap.id == matched.c.swap_id)))
+    return [
+        (status, stmt.where(Swap.status.not_in((status, SwapStatus.completed))).values(status=status))
+        for status, stmt in rules
+    ]
+
+
+def recompute_swap_statuses(session=None, chunk_size=None):
+    """
+    Bring every swap's status in line with its requests.
+
+    Returns:
+        dict mapping SwapStatus to the number of swaps moved into it.
+    """
+    session = session or db.session
+    chunk_size = chunk_size or current_app.config.get('SWAP_STATUS_CHUNK_SIZE', 5000)
+    changed = dict.fromkeys(SwapStatus, 0)
+    recounted = 0
+    for lower, upper in chunk_bounds(session, chunk_size):
+        result = session.execute(_refresh_counters(lower, upper), execution_options={'synchronize_session': False})
+        recounted += result.rowcount
+        for status, stmt in _rules(lower, upper):
+            result = session.execute(stmt, execution_options={'synchronize_session': False})
+            changed[status] += result.rowcount
+        session.commit()
+
+    # Bulk UPDATEs bypass the flush hooks that keep the caches current; the
+    # dashboard and match scores show the counters as well as the statuses
+    if recounted or any(changed.values()):
+        session.expire_all()
+        dashboard_cache.clear()
+        matching_index().invalidate()
+    return changed
+
+
+def init_swap_status(app):
+    """Register `flask recompute-swap-statuses`."""
+
+    @app.cli.command('recompute-swap-statuses')
+    def recompute_command():
+        """Recompute every swap's status from its requests, in id-range chunks."""
+        changed = recompute_swap_statuses()
+        summary = ', '.join(f"{count} {status.value}" for status, count in changed.items() if count)
+        print(f"Swap statuses updated: {summary or 'none changed'}.")
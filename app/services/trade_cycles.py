@@ -0,0 +1,233 @@
+# services/trade_cycles.py
+"""
+Multi-party trade ring detection over open swaps.
+
+Each open swap is an edge in a directed graph over skill names, from the
+skill its author wants to the skill they offer. A ring A -> B -> C -> A
+(A gives what B wants, B gives what C wants, C gives what A wants) is then
+a cycle in that graph whose edges belong to distinct users.
+
+Enumerating every cycle is exponential on a dense graph, so rings are
+built greedily instead: oldest swaps first, each swap closes at most one
+ring, and the search from a swap is bounded to rings of MAX_RING_LENGTH
+legs using set intersections over the skill adjacency. Connected
+components are independent, so large graphs are split by component and
+solved in a process pool.
+
+Suggested rings are served from a copy recomputed every TRADE_RING_REFRESH
+seconds. Only the first computation runs on a request; after that a stale
+copy is served while one background thread recomputes it.
+"""
+
+import os
+import threading
+import time
+from collections import defaultdict, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import current_app
+
+from app.models import db, Skill, Swap, SwapStatus
+
+MIN_RING_LENGTH = 3
+MAX_RING_LENGTH = 4
+# Only fan out to worker processes when a graph has at least this many swaps;
+# below this, pickling components to workers costs more than the search
+# (TRADE_RING_POOL_THRESHOLD overrides this for suggested_rings)
+POOL_THRESHOLD = 50_000
+# How many queued swaps to look past when skipping users already in a ring
+USER_SCAN_LIMIT = 8
+
+SwapEdge = namedtuple('SwapEdge', 'swap_id user_id wants offers timestamp')
+
+
+def load_open_swaps():
+    """All open swaps as SwapEdge tuples, oldest first (one query)."""
+    rows = db.session.execute(
+        db.select(Swap.id, Swap.user_id, Swap.desired_skill_name_id, Skill.skill_name_id, Swap.timestamp)
+        .join(Skill, Swap.offered_skill_id == Skill.id)
+        .filter(Swap.status == SwapStatus.open)
+        .order_by(Swap.timestamp, Swap.id)
+    ).all()
+    return [SwapEdge(*row) for row in rows]
+
+
+def connected_components(swaps):
+    """Group swaps by weakly connected component of the skill graph."""
+    parent = {}
+
+    def find(node):
+        root = node
+        while parent.setdefault(root, root) != root:
+            root = parent[root]
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+        return root
+
+    for swap in swaps:
+        a, b = find(swap.wants), find(swap.offers)
+        if a != b:
+            parent[a] = b
+
+    groups = defaultdict(list)
+    for swap in swaps:
+        groups[find(swap.wants)].append(swap)
+    return list(groups.values())
+
+
+class _Available:
+    """Unused swaps bucketed by (wants, offers) with live adjacency sets."""
+
+    def __init__(self, swaps):
+        self.buckets = defaultdict(deque)
+        self.out = defaultdict(set)   # wants -> {offers}
+        self.into = defaultdict(set)  # offers -> {wants}
+        for swap in swaps:
+            self.buckets[(swap.wants, swap.offers)].append(swap)
+            self.out[swap.wants].add(swap.offers)
+            self.into[swap.offers].add(swap.wants)
+        self.used = set()
+
+    def pick(self, wants, offers, users):
+        """Oldest unused swap on an edge whose author is not in `users`."""
+        bucket = self.buckets.get((wants, offers))
+        if not bucket:
+            return None
+        while bucket and bucket[0].swap_id in self.used:
+            bucket.popleft()
+        if not bucket:
+            self._drop(wants, offers)
+            return None
+        for i, swap in enumerate(bucket):
+            if i >= USER_SCAN_LIMIT:
+                break
+            if swap.swap_id not in self.used and swap.user_id not in users:
+                return swap
+        return None
+
+    def take(self, swaps):
+        for swap in swaps:
+            self.used.add(swap.swap_id)
+
+    def _drop(self, wants, offers):
+        self.out[wants].discard(offers)
+        self.into[offers].discard(wants)
+
+
+def _close_ring(first, avail):
+    """Find 2-3 more swaps closing a ring that starts with `first`, or None."""
+    start, head = first.wants, first.offers
+    users = {first.user_id}
+
+    # Three legs: first gives `head`; B wants head, offers x; C wants x, offers start
+    for x in avail.out.get(head, frozenset()) & avail.into.get(start, frozenset()):
+        if x in (start, head):
+            continue
+        b = avail.pick(head, x, users)
+        if b is None:
+            continue
+        c = avail.pick(x, start, users | {b.user_id})
+        if c is not None:
+            return [first, b, c]
+
+    if MAX_RING_LENGTH < 4:
+        return None
+
+    # Four legs: head -> x -> y -> start
+    into_start = avail.into.get(start, frozenset())
+    for x in list(avail.out.get(head, frozenset())):
+        if x in (start, head):
+            continue
+        b = avail.pick(head, x, users)
+        if b is None:
+            continue
+        for y in avail.out.get(x, frozenset()) & into_start:
+            if y in (start, head, x):
+                continue
+            c = avail.pick(x, y, users | {b.user_id})
+            if c is None:
+                continue
+            d = avail.pick(y, start, users | {b.user_id, c.user_id})
+            if d is not None:
+                return [first, b, c, d]
+    return None
+
+
+def find_rings_in_component(swaps):
+    """Greedy ring search within one component; swaps must be oldest first."""
+    avail = _Available(swaps)
+    rings = []
+    for swap in swaps:
+        if swap.swap_id in avail.used:
+            continue
+        avail.used.add(swap.swap_id)  # never pick the starting swap as a later leg
+        ring = _close_ring(swap, avail)
+        if ring is None:
+            avail.used.discard(swap.swap_id)
+            continue
+        avail.take(ring)
+        rings.append([leg.swap_id for leg in ring])
+    return rings
+
+
+def find_trade_rings(swaps, processes=None, pool_threshold=POOL_THRESHOLD):
+    """
+    Find 3- and 4-way trade rings among open swaps.
+
+    Args:
+        swaps: SwapEdge tuples, oldest first.
+        processes: worker processes for large graphs (defaults to CPU count).
+
+    Returns:
+        list of rings, each a list of swap ids in giving order.
+    """
+    components = [c for c in connected_components(swaps) if len(c) >= MIN_RING_LENGTH]
+    if len(swaps) < pool_threshold or len(components) < 2:
+        return [ring for component in components for ring in find_rings_in_component(component)]
+
+    # Biggest components first so the pool is not left waiting on a straggler
+    components.sort(key=len, reverse=True)
+    workers = min(processes or os.cpu_count() or 1, len(components))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(find_rings_in_component, components, chunksize=max(1, len(components) // (workers * 4)))
+        return [ring for rings in results for ring in rings]
+
+
+def _compute_rings(state, pool_threshold):
+    swaps = load_open_swaps()
+    by_id = {swap.swap_id: swap for swap in swaps}
+    rings = find_trade_rings(swaps, pool_threshold=pool_threshold)
+    state['rings'] = [[by_id[swap_id] for swap_id in ring] for ring in rings]
+    state['computed_at'] = time.monotonic()
+
+
+def _refresh_rings(app, state):
+    """Recompute the rings in a background thread; releases the state's lock."""
+    try:
+        with app.app_context():
+            _compute_rings(state, app.config.get('TRADE_RING_POOL_THRESHOLD', POOL_THRESHOLD))
+    except Exception:
+        app.logger.exception("Trade ring refresh failed")
+    finally:
+        state['lock'].release()
+
+
+def suggested_rings(user_id):
+    """
+    Rings involving `user_id`, recomputed at most every TRADE_RING_REFRESH seconds.
+
+    Returns:
+        list of rings, each a list of SwapEdge legs in giving order.
+    """
+    state = current_app.extensions.setdefault(
+        'trade_rings', {'computed_at': None, 'rings': [], 'lock': threading.Lock()})
+    refresh = current_app.config.get('TRADE_RING_REFRESH', 300)
+    if state['computed_at'] is None:
+        # Nothing to serve yet: the first request computes them, once
+        with state['lock']:
+            if state['computed_at'] is None:
+                _compute_rings(state, current_app.config.get('TRADE_RING_POOL_THRESHOLD', POOL_THRESHOLD))
+    elif time.monotonic() - state['computed_at'] >= refresh and state['lock'].acquire(blocking=False):
+        threading.Thread(target=_refresh_rings, args=(current_app._get_current_object(), state),
+                         name='trade-rings', daemon=True).start()
+    return [ring for ring in state['rings'] if any(leg.user_id == user_id for leg in ring)]
@@ -3,5 +3,14 @@ from flask_socketio import SocketIO
 socketio = SocketIO(cors_allowed_origins="*")
 
 def register_socket_events(app):
-    from . import events  # import handlers to register them
-    socketio.init_app(app)
+    from . import chat, notifications  # registers the /chat namespace and the per-user rooms
+    from .message_queue import init_message_queue, message_queue_manager
+    socketio.init_app(
+        app, cors_allowed_origins="*", async_mode=app.config.get('SOCKETIO_ASYNC_MODE'),
+        # Passed every time: init_app keeps the options of the previous app it set up
+        client_manager=message_queue_manager(app.config.get('SOCKETIO_MESSAGE_QUEUE'),
+                                             channel=app.config.get('SOCKETIO_CHANNEL', 'flask-socketio')),
+        # Without sticky sessions a long-polling client's requests land on different workers
+        transports=None if app.config.get('SOCKETIO_STICKY_SESSIONS', True) else ['websocket'],
+    )
+    init_message_queue(app)
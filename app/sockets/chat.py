@@ -1,16 +1,67 @@
+# sockets/chat.py
+"""
+The /chat Socket.IO namespace.
+
+Connections are authenticated by the Flask session cookie, as for every
+page; nothing the client sends about who it is or which room it is in is
+trusted. A client joins a conversation by id, and only a participant may;
+the room is the SwapConversation id. send_message stores the message (see
+services/chat_messages.py), acknowledges it to the sender and pushes it to
+the rest of the room.
+"""
+
+from flask import request, session
+from flask_socketio import Namespace, join_room, leave_room
+
+from app.models import db, SwapConversation
+from app.services.chat_messages import (
+    CHAT_NAMESPACE, InvalidMessage, broadcast_message, is_participant, message_view, post_message,
+)
+from app.services.chat_write_behind import ChatBusy
 from . import socketio
-from flask_socketio import emit, join_room
-
-@socketio.on('join_chat')
-def handle_join_chat(data):
-    room = data.get('room')
-    username = data.get('username')
-    join_room(room)
-    emit('chat_announcement', {'msg': f'{username} has joined the chat'}, room=room)
-
-@socketio.on('send_message')
-def handle_send_message(data):
-    room = data.get('room')
-    message = data.get('message')
-    sender = data.get('sender')
-    emit('receive_message', {'sender': sender, 'message': message}, room=room)
+
+
+def _conversation(data):
+    """The conversation named in `data` if the session user takes part in it, else None."""
+    user_id = session.get('user_id')
+    conversation_id = (data or {}).get('conversation_id') if isinstance(data, dict) else None
+    if not user_id or not conversation_id:
+        return None
+    conversation = db.session.get(SwapConversation, conversation_id)
+    if conversation is None or not is_participant(conversation, user_id):
+        return None
+    return conversation
+
+
+class ChatNamespace(Namespace):
+
+    def on_connect(self, auth=None):
+        # Refusing the connection sends the client a connect_error
+        return bool(session.get('user_id'))
+
+    def on_join(self, data):
+        conversation = _conversation(data)
+        if conversation is None:
+            return {'success': False, 'error': 'Conversation not found'}
+        join_room(conversation.id)
+        return {'success': True}
+
+    def on_leave(self, data):
+        if isinstance(data, dict) and data.get('conversation_id'):
+            leave_room(data['conversation_id'])
+        return {'success': True}
+
+    def on_send_message(self, data):
+        conversation = _conversation(data)
+        if conversation is None:
+            return {'success': False, 'error': 'Conversation not found'}
+        try:
+            message = post_message(conversation, session['user_id'], data.get('content'))
+        except (InvalidMessage, ChatBusy) as e:
+            return {'success': False, 'error': str(e)}
+        # The sender gets the message in the ack; everyone else in the room as an event
+        broadcast_message(message, skip_sid=request.sid)
+        return {'success': True, 'message': message_view(message)}
+
+
+socketio.on_namespace(ChatNamespace(CHAT_NAMESPACE))
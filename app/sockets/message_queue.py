@@ -0,0 +1,306 @@
+# sockets/message_queue.py
+"""
+Pub/sub backends that carry Socket.IO emits between workers.
+
+Every gunicorn worker runs its own Socket.IO server and only knows the
+clients connected to it, so an emit to a room (a conversation, user_<id>)
+made in one worker would miss the room's members held by the others. With
+SOCKETIO_MESSAGE_QUEUE set, each emit, room change and disconnect is also
+published on SOCKETIO_CHANNEL; every worker listens there and delivers what
+it hears to its own clients. The URL picks the backend:
+- redis:// or rediss:// - a Redis-protocol server, through python-socketio's
+  RedisManager (needs the redis package);
+- unix:///path/broker.sock or tcp://host:port - a LocalBroker started with
+  `flask socketio-broker`, for several workers on one machine without Redis;
+- memory:// - within one process only (tests, threads sharing a bus).
+
+Like Redis pub/sub, these are fire and forget: a worker that is cut off
+from the backend misses what is published until it reconnects. Chat
+clients catch up from the history API on reconnecting.
+
+The local backends carry JSON, never pickles, so whoever can reach the
+broker can at most send events. The broker only listens on a unix socket
+(guarded by its file permissions) or a loopback address.
+"""
+
+import ipaddress
+import json
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import click
+import socketio
+from socketio.pubsub_manager import PubSubManager
+
+_HEADER = struct.Struct('!I')
+
+
+def _send_frame(sock, payload):
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock, size):
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Socket.IO broker connection closed")
+        data += chunk
+    return data
+
+
+def _recv_frame(sock):
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return _recv_exact(sock, size)
+
+
+def _address(url):
+    """(socket family, address) for a unix:// or tcp:// broker URL."""
+    parts = urlsplit(url)
+    if parts.scheme == 'unix':
+        return socket.AF_UNIX, parts.path
+    if parts.scheme == 'tcp':
+        host = parts.hostname or '127.0.0.1'
+        if host != 'localhost' and not ipaddress.ip_address(host).is_loopback:
+            raise ValueError(f"The Socket.IO broker only listens on loopback addresses, not {host}")
+        return socket.AF_INET, (host, parts.port or 6380)
+    raise ValueError(f"Not a local broker URL: {url}")
+
+
+def _encode(data):
+    return json.dumps(data, separators=(',', ':')).encode()
+
+
+def _decode(frame):
+    # Decoded here so PubSubManager never sees bytes, which it would try to unpickle
+    try:
+        message = json.loads(frame)
+    except ValueError:
+        return None
+    return message if isinstance(message, dict) else None
+
+
+class LocalBroker:
+    """
+    Fan-out server for LocalSocketManager.
+
+    A connection opens with one frame, 'pub:<channel>' or 'sub:<channel>'.
+    Every later frame on a publisher connection is sent on to each
+    subscriber of its channel, the publisher's own worker included (the
+    manager skips what it sent itself).
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.family, self.address = _address(url)
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+        self._server = None
+
+    def _handle(self, sock):
+        role, _, channel = _recv_frame(sock).decode().partition(':')
+        if role == 'sub':
+            with self._lock:
+                self._subscribers[channel].add(sock)
+            try:
+                # Acknowledged once registered, so the worker misses nothing published after
+                _send_frame(sock, b'ok')
+                while sock.recv(1):
+                    pass  # subscribers send nothing more; this returns when they go away
+            finally:
+                with self._lock:
+                    self._subscribers[channel].discard(sock)
+        else:
+            while True:
+                self._publish(channel, _recv_frame(sock))
+
+    def _publish(self, channel, frame):
+        with self._lock:
+            for subscriber in list(self._subscribers[channel]):
+                try:
+                    _send_frame(subscriber, frame)
+                except OSError:
+                    self._subscribers[channel].discard(subscriber)
+
+    def bind(self):
+        broker = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                try:
+                    broker._handle(self.request)
+                except (OSError, UnicodeDecodeError):
+                    pass  # the worker went away
+
+        if self.family == socket.AF_UNIX:
+            if os.path.exists(self.address):
+                os.unlink(self.address)  # left by a broker that did not shut down
+            base = socketserver.ThreadingUnixStreamServer
+        else:
+            base = socketserver.ThreadingTCPServer
+
+        class Server(base):
+            allow_reuse_address = True
+            daemon_threads = True
+
+        self._server = Server(self.address, Handler)
+        if self.family == socket.AF_UNIX:
+            os.chmod(self.address, 0o600)  # only the workers' own user may publish
+        return self
+
+    def serve_forever(self):
+        if self._server is None:
+            self.bind()
+        self._server.serve_forever()
+
+    def start(self):
+        """Serve from a daemon thread; returns the broker."""
+        if self._server is None:
+            self.bind()
+        threading.Thread(target=self._server.serve_forever, name='socketio-broker', daemon=True).start()
+        return self
+
+    def shutdown(self):
+        self._server.shutdown()
+        self._server.server_close()
+        with self._lock:
+            for subscriber in set().union(*self._subscribers.values()):
+                subscriber.close()
+            self._subscribers.clear()
+        if self.family == socket.AF_UNIX and os.path.exists(self.address):
+            os.unlink(self.address)
+
+
+class LocalSocketManager(PubSubManager):
+    """Client manager that publishes and listens through a LocalBroker."""
+
+    name = 'localsocket'
+
+    def __init__(self, url, channel='flask-socketio', write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.url = url
+        self.family, self.address = _address(url)
+        self._publisher = None
+        self._subscriber = None
+        self._publish_lock = threading.Lock()
+
+    def _connect(self, role):
+        sock = socket.socket(self.family, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.address)
+            _send_frame(sock, f'{role}:{self.channel}'.encode())
+            if role == 'sub':
+                _recv_frame(sock)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def initialize(self):
+        if not self.write_only:
+            # Subscribed before the first client is accepted, so nothing sent to it is missed
+            try:
+                self._subscriber = self._connect('sub')
+            except OSError:
+                self._get_logger().exception("Socket.IO broker %s unavailable; retrying", self.url)
+        super().initialize()
+
+    def _publish(self, data):
+        payload = _encode(data)
+        with self._publish_lock:
+            for attempt in range(2):
+                try:
+                    if self._publisher is None:
+                        self._publisher = self._connect('pub')
+                    _send_frame(self._publisher, payload)
+                    return
+                except OSError:
+                    # The broker restarted since the last publish: reconnect once
+                    if self._publisher is not None:
+                        self._publisher.close()
+                        self._publisher = None
+                    if attempt:
+                        raise
+
+    def _listen(self):
+        while True:
+            try:
+                if self._subscriber is None:
+                    self._subscriber = self._connect('sub')
+                message = _decode(_recv_frame(self._subscriber))
+                if message is not None:
+                    yield message
+            except OSError:
+                self._get_logger().warning("Lost the Socket.IO broker %s; reconnecting", self.url)
+                if self._subscriber is not None:
+                    self._subscriber.close()
+                    self._subscriber = None
+                time.sleep(1)
+
+
+class MemoryManager(PubSubManager):
+    """Client manager over an in-process bus, for servers that share one process."""
+
+    name = 'memory'
+
+    _channels = defaultdict(list)
+    _channels_lock = threading.Lock()
+
+    def __init__(self, url='memory://', channel='flask-socketio', write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self._queue = queue.Queue()
+
+    def initialize(self):
+        if not self.write_only:
+            with self._channels_lock:
+                self._channels[self.channel].append(self._queue)
+        super().initialize()
+
+    def _publish(self, data):
+        # Encoded as on the wire, so no listener shares the sender's objects
+        payload = _encode(data)
+        with self._channels_lock:
+            listeners = list(self._channels[self.channel])
+        for listener in listeners:
+            listener.put(payload)
+
+    def _listen(self):
+        while True:
+            message = _decode(self._queue.get())
+            if message is not None:
+                yield message
+
+
+def message_queue_manager(url, channel='flask-socketio', write_only=False):
+    """The Socket.IO client manager for SOCKETIO_MESSAGE_QUEUE `url` (a single-process one when unset)."""
+    if not url:
+        return socketio.Manager()
+    if url.startswith('memory://'):
+        return MemoryManager(url, channel=channel, write_only=write_only)
+    if url.startswith(('unix://', 'tcp://')):
+        return LocalSocketManager(url, channel=channel, write_only=write_only)
+    if url.startswith(('redis://', 'rediss://')):
+        return socketio.RedisManager(url, channel=channel, write_only=write_only)
+    raise ValueError(f"Unsupported SOCKETIO_MESSAGE_QUEUE: {url}")
+
+
+def init_message_queue(app):
+    """Register `flask socketio-broker`."""
+
+    @app.cli.command('socketio-broker')
+    @click.option('--url', default=None,
+                  help="unix:///path or tcp://host:port to listen on (default SOCKETIO_MESSAGE_QUEUE).")
+    def broker_command(url):
+        """Run the local pub/sub broker that carries Socket.IO emits between this machine's workers."""
+        url = url or app.config.get('SOCKETIO_MESSAGE_QUEUE')
+        if not url or not url.startswith(('unix://', 'tcp://')):
+            raise click.UsageError("Set SOCKETIO_MESSAGE_QUEUE (or --url) to a unix:// or tcp:// URL.")
+        click.echo(f"Socket.IO broker listening on {url}")
+        LocalBroker(url).serve_forever()
@@ -1,13 +1,41 @@
+# sockets/notifications.py
+"""
+Per-user notifications on the default namespace.
+
+A signed-in client joins its user's room, user_<id>, on connecting, and
+notify_user() pushes receive_notification to every tab that user has open,
+whichever worker each is connected to (see sockets/message_queue.py).
+"""
+
+from flask import session
+from flask_socketio import join_room
 from . import socketio
-from flask_socketio import emit
 
-@socketio.on('send_notification')
-def handle_send_notification(data):
-    target_user_id = data.get('target_user_id')
-    notification_type = data.get('type')
-    message = data.get('message')
 
-    emit('receive_notification', {
+def user_room(user_id):
+    return f'user_{user_id}'
+
+
+def notify_user(user_id, notification_type, message, sender_id=None):
+    socketio.emit('receive_notification', {
         'type': notification_type,
-        'message': message
-    }, room=f'user_{target_user_id}')
+        'message': message,
+        'sender_id': sender_id,
+    }, to=user_room(user_id))
+
+
+@socketio.on('connect')
+def handle_connect(auth=None):
+    user_id = session.get('user_id')
+    if not user_id:
+        return False
+    join_room(user_room(user_id))
+
+
+@socketio.on('send_notification')
+def handle_send_notification(data):
+    if not isinstance(data, dict) or not data.get('target_user_id'):
+        return {'success': False, 'error': 'No recipient'}
+    # The sender comes from the session, never from the payload
+    notify_user(data['target_user_id'], data.get('type'), data.get('message'), sender_id=session.get('user_id'))
+    return {'success': True}
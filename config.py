@@ -8,6 +8,27 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URI') 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Read replicas for @read_only routes: comma-separated URIs, each bound as replica_<n>
+    SQLALCHEMY_BINDS = {
+        f'replica_{n}': uri.strip()
+        for n, uri in enumerate(os.getenv('REPLICA_DATABASE_URIS', '').split(',')) if uri.strip()
+    }
+    REPLICA_HEALTH_CHECK_INTERVAL = float(os.getenv('REPLICA_HEALTH_CHECK_INTERVAL', 5))
+    # Seconds a user's reads stay on the primary after they write (replication lag cover)
+    REPLICA_STICKY_SECONDS = float(os.getenv('REPLICA_STICKY_SECONDS', 5))
+    
+    # Connection pool per worker process (see services/db_pool.py); size * workers
+    # plus overflow must stay under the server's max_connections
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    # Behind PgBouncer in transaction mode: no local pool, no server-side prepared statements
+    DB_PGBOUNCER = os.getenv('DB_PGBOUNCER', 'false').lower() == 'true'
+    # Checkouts that wait longer than this (ms) for a connection are logged
+    DB_POOL_SLOW_WAIT_MS = float(os.getenv('DB_POOL_SLOW_WAIT_MS', 100))
+    
     # Production settings
     DEBUG = False
     TESTING = False
@@ -17,8 +38,74 @@ class Config:
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
     
-    # SocketIO settings
-    SOCKETIO_ASYNC_MODE = 'eventlet'
+    # JSON API pagination
+    API_PAGE_SIZE = int(os.getenv('API_PAGE_SIZE', 20))
+    API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', 100))
+    # Chat messages per history page, and on first opening a chat
+    CHAT_PAGE_SIZE = int(os.getenv('CHAT_PAGE_SIZE', 50))
+    
+    # Per-user dashboard cache: 'lru' (per worker), 'shared' or 'none'
+    DASHBOARD_CACHE_BACKEND = os.getenv('DASHBOARD_CACHE_BACKEND', 'lru')
+    DASHBOARD_CACHE_URL = os.getenv('DASHBOARD_CACHE_URL')  # redis://... or memory://
+    DASHBOARD_CACHE_TTL = int(os.getenv('DASHBOARD_CACHE_TTL', 30))
+    DASHBOARD_CACHE_SIZE = int(os.getenv('DASHBOARD_CACHE_SIZE', 1024))
+    
+    # Seconds between reference data (SkillName/Category) version checks
+    REFERENCE_CACHE_CHECK_INTERVAL = float(os.getenv('REFERENCE_CACHE_CHECK_INTERVAL', 5))
+    
+    # Number of scored swaps shown in the dashboard stream
+    DASHBOARD_STREAM_SIZE = int(os.getenv('DASHBOARD_STREAM_SIZE', 60))
+    
+    # Seconds between full rebuilds of the swap matching index
+    MATCH_INDEX_REFRESH = float(os.getenv('MATCH_INDEX_REFRESH', 30))
+    
+    # Seconds between recomputations of suggested multi-party trade rings
+    TRADE_RING_REFRESH = float(os.getenv('TRADE_RING_REFRESH', 300))
+    
+    # Open swaps from which ring detection splits the graph across worker processes
+    TRADE_RING_POOL_THRESHOLD = int(os.getenv('TRADE_RING_POOL_THRESHOLD', 50_000))
+    
+    # Migrate the database and create the coming message partitions when a worker boots (under
+    # a PostgreSQL advisory lock); turn off where `flask db upgrade` and
+    # `flask create-message-partitions` run as deploy steps instead
+    MIGRATE_ON_STARTUP = os.getenv('MIGRATE_ON_STARTUP', 'true').lower() == 'true'
+    
+    # Check the seed hash (and seed the reference tables if it moved) when a worker boots;
+    # turn off where `flask seed-reference-data` runs as a deploy step instead
+    SEED_ON_STARTUP = os.getenv('SEED_ON_STARTUP', 'true').lower() == 'true'
+    
+    # Swaps per transaction when recomputing every swap's status
+    SWAP_STATUS_CHUNK_SIZE = int(os.getenv('SWAP_STATUS_CHUNK_SIZE', 5000))
+    
+    # Completed/cancelled swaps idle this many days move to the archive tables
+    # (`flask archive-swaps`), this many swaps per transaction
+    ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', 180))
+    ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', 500))
+    
+    # Monthly swap_messages partitions created ahead of time (PostgreSQL only)
+    MESSAGE_PARTITION_MONTHS_AHEAD = int(os.getenv('MESSAGE_PARTITION_MONTHS_AHEAD', 3))
+    
+    # Chat write-behind: acknowledge a message once it is fsynced to this worker's journal and
+    # insert messages in batches every CHAT_FLUSH_INTERVAL_MS or CHAT_FLUSH_BATCH_SIZE messages;
+    # sends are refused while CHAT_MAX_PENDING_MESSAGES are waiting. The journal directory must
+    # outlive the process (replayed on the next start); default <instance folder>/chat-journal
+    CHAT_WRITE_BEHIND = os.getenv('CHAT_WRITE_BEHIND', 'false').lower() == 'true'
+    CHAT_JOURNAL_DIR = os.getenv('CHAT_JOURNAL_DIR')
+    CHAT_FLUSH_INTERVAL_MS = float(os.getenv('CHAT_FLUSH_INTERVAL_MS', 5))
+    CHAT_FLUSH_BATCH_SIZE = int(os.getenv('CHAT_FLUSH_BATCH_SIZE', 200))
+    CHAT_MAX_PENDING_MESSAGES = int(os.getenv('CHAT_MAX_PENDING_MESSAGES', 5000))
+    
+    # SocketIO settings: 'threading' serves websockets through simple-websocket, under
+    # `flask run`, run.py or gunicorn's threaded workers (`gunicorn --threads N run:app`)
+    SOCKETIO_ASYNC_MODE = os.getenv('SOCKETIO_ASYNC_MODE', 'threading')
+    # With more than one worker, emits reach clients on the other workers through
+    # SOCKETIO_MESSAGE_QUEUE: redis://..., unix:///path or tcp://host:port for a
+    # `flask socketio-broker` on the same machine, memory:// within one process
+    SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE')
+    SOCKETIO_CHANNEL = os.getenv('SOCKETIO_CHANNEL', 'flask-socketio')
+    # Long-polling needs every request of a client on the same worker; set to false when nothing
+    # pins them there (several gunicorn workers on one port, a round-robin balancer) to use websocket only
+    SOCKETIO_STICKY_SESSIONS = os.getenv('SOCKETIO_STICKY_SESSIONS', 'true').lower() == 'true'
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Import-time audit for SkillSwap.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter and
+reports where the time goes: the slowest modules by cumulative time and
+the total self time per top-level package. Importing run.py also builds
+the app, so its own line includes create_app().
+
+    python import_audit.py                 # audit `import run`
+    python import_audit.py app --top 40
+    python import_audit.py --budget 1500   # exit 1 if the import takes longer
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import namedtuple
+
+ImportRecord = namedtuple('ImportRecord', 'self_us cumulative_us depth name')
+
+_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure(module='run', runs=1, env=None):
+    """
+    Import `module` in `runs` fresh interpreters and keep the fastest.
+
+    Returns:
+        list of ImportRecord in -X importtime order (children before parents).
+    """
+    child_env = dict(os.environ, **(env or {}))
+    child_env.setdefault('DATABASE_URI', 'sqlite:///:memory:')
+    best = None
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=_ROOT, env=child_env, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+        records = [
+            ImportRecord(int(m[1]), int(m[2]), len(m[3]) // 2, m[4])
+            for m in map(_LINE.match, result.stderr.splitlines()) if m
+        ]
+        if best is None or total_us(records, module) < total_us(best, module):
+            best = records
+    return best
+
+
+def total_us(records, module):
+    """Cumulative import time of `module` itself, in microseconds."""
+    return next(r.cumulative_us for r in reversed(records) if r.name == module)
+
+
+def by_package(records):
+    """Self time summed per top-level package, slowest first."""
+    totals = {}
+    for record in records:
+        package = record.name.split('.')[0]
+        totals[package] = totals.get(package, 0) + record.self_us
+    return sorted(totals.items(), key=lambda item: -item[1])
+
+
+def report(records, module, top=25):
+    print(f"import {module}: {total_us(records, module) / 1000:.1f}ms cumulative\n")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for record in sorted(records, key=lambda r: -r.cumulative_us)[:top]:
+        print(f"{record.cumulative_us / 1000:10.1f}ms {record.self_us / 1000:8.1f}ms  "
+              f"{'  ' * record.depth}{record.name}")
+    print(f"\n{'self':>12}  package")
+    for package, self_us in by_package(records)[:top]:
+        print(f"{self_us / 1000:10.1f}ms  {package}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('module', nargs='?', default='run')
+    parser.add_argument('--top', type=int, default=25, help="rows per table")
+    parser.add_argument('--runs', type=int, default=3, help="fresh interpreters; the fastest is reported")
+    parser.add_argument('--budget', type=float, help="fail if the import takes longer (ms)")
+    args = parser.parse_args()
+
+    records = measure(args.module, runs=args.runs)
+    report(records, args.module, args.top)
+    if args.budget is not None and total_us(records, args.module) / 1000 > args.budget:
+        print(f"\n❌ import {args.module} is over the {args.budget:.0f}ms budget")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""baseline schema, as previously built by db.create_all()
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+request_status = sa.Enum('pending', 'accepted', 'rejected', 'cancelled', name='requeststatus')
+swap_status = sa.Enum('open', 'in_discussion', 'completed', 'cancelled', name='swapstatus')
+message_type = sa.Enum('TEXT', 'IMAGE', 'FILE', name='messagetype')
+
+
+def upgrade():
+    op.create_table(
+        'users',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('name', sa.String(length=60), nullable=False),
+        sa.Column('email', sa.String(length=60), nullable=False),
+        sa.Column('password', sa.String(length=255), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'categories',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name'),
+    )
+    op.create_table(
+        'skill_names',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name'),
+    )
+    op.create_table(
+        'app_meta',
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('value', sa.String(length=128), nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+    )
+    op.create_table(
+        'skills',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('skill_name_id', sa.String(), nullable=False),
+        sa.Column('category_id', sa.String(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id']),
+        sa.ForeignKeyConstraint(['skill_name_id'], ['skill_names.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'skill_name_id', name='uq_user_skill'),
+    )
+    op.create_table(
+        'swaps',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('offered_skill_id', sa.String(), nullable=False),
+        sa.Column('desired_skill_name_id', sa.String(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('status', swap_status, nullable=False),
+        sa.ForeignKeyConstraint(['desired_skill_name_id'], ['skill_names.id']),
+        sa.ForeignKeyConstraint(['offered_skill_id'], ['skills.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'discuss_requests',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('sender_id', sa.String(), nullable=False),
+        sa.Column('recipient_id', sa.String(), nullable=False),
+        sa.Column('swap_id', sa.String(), nullable=False),
+        sa.Column('sender_skill_id', sa.String(), nullable=False),
+        sa.Column('recipient_skill_id', sa.String(), nullable=False),
+        sa.Column('status', request_status, nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['recipient_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['recipient_skill_id'], ['skills.id']),
+        sa.ForeignKeyConstraint(['sender_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['sender_skill_id'], ['skills.id']),
+        sa.ForeignKeyConstraint(['swap_id'], ['swaps.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'swap_requests',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('sender_id', sa.String(), nullable=False),
+        sa.Column('recipient_id', sa.String(), nullable=False),
+        sa.Column('swap_id', sa.String(), nullable=False),
+        sa.Column('sender_skill_id', sa.String(), nullable=False),
+        sa.Column('recipient_skill_id', sa.String(), nullable=False),
+        sa.Column('status', request_status, nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['recipient_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['recipient_skill_id'], ['skills.id']),
+        sa.ForeignKeyConstraint(['sender_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['sender_skill_id'], ['skills.id']),
+        sa.ForeignKeyConstraint(['swap_id'], ['swaps.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'swap_conversations',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('swap_id', sa.String(), nullable=False),
+        sa.Column('sender_id', sa.String(), nullable=False),
+        sa.Column('recipient_id', sa.String(), nullable=False),
+        sa.Column('discuss_request_id', sa.String(), nullable=True),
+        sa.Column('sender_accepted', sa.Boolean(), nullable=False),
+        sa.Column('recipient_accepted', sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(['discuss_request_id'], ['discuss_requests.id']),
+        sa.ForeignKeyConstraint(['recipient_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['sender_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['swap_id'], ['swaps.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'swap_messages',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('conversation_id', sa.String(), nullable=False),
+        sa.Column('sender_id', sa.String(), nullable=False),
+        sa.Column('recipient_id', sa.String(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('type', message_type, nullable=False),
+        sa.ForeignKeyConstraint(['conversation_id'], ['swap_conversations.id']),
+        sa.ForeignKeyConstraint(['recipient_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['sender_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade():
+    op.drop_table('swap_messages')
+    op.drop_table('swap_conversations')
+    op.drop_table('swap_requests')
+    op.drop_table('discuss_requests')
+    op.drop_table('swaps')
+    op.drop_table('skills')
+    op.drop_table('app_meta')
+    op.drop_table('skill_names')
+    op.drop_table('categories')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_table('users')
+    message_type.drop(op.get_bind(), checkfirst=True)
+    swap_status.drop(op.get_bind(), checkfirst=True)
+    request_status.drop(op.get_bind(), checkfirst=True)
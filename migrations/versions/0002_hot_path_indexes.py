@@ -0,0 +1,43 @@
+"""secondary indexes for the dashboard, inbox and chat queries
+
+Revision ID: 0002_hot_path_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_hot_path_indexes'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+# skills(user_id) is already served by the uq_user_skill (user_id, skill_name_id) index.
+INDEXES = [
+    ('ix_swap_requests_sender_swap', 'swap_requests', ['sender_id', 'swap_id']),
+    ('ix_swap_requests_recipient', 'swap_requests', ['recipient_id']),
+    ('ix_swap_requests_swap_status', 'swap_requests', ['swap_id', 'status']),
+    ('ix_discuss_requests_sender_recipient_swap', 'discuss_requests', ['sender_id', 'recipient_id', 'swap_id']),
+    ('ix_discuss_requests_recipient', 'discuss_requests', ['recipient_id']),
+    ('ix_swaps_status_desired_skill_name', 'swaps', ['status', 'desired_skill_name_id']),
+    ('ix_swaps_user', 'swaps', ['user_id']),
+    ('ix_swap_messages_conversation_timestamp', 'swap_messages', ['conversation_id', 'timestamp']),
+    ('ix_swap_conversations_sender', 'swap_conversations', ['sender_id']),
+    ('ix_swap_conversations_recipient', 'swap_conversations', ['recipient_id']),
+    ('ix_swap_conversations_discuss_request', 'swap_conversations', ['discuss_request_id']),
+]
+
+
+def upgrade():
+    # CONCURRENTLY keeps writes flowing on PostgreSQL but can't run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
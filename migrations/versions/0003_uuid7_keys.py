@@ -0,0 +1,88 @@
+"""store primary and foreign keys as native UUID / 16-byte BLOB
+
+Revision ID: 0003_uuid7_keys
+Revises: 0002_hot_path_indexes
+Create Date: 2026-10-18 11:00:00.000000
+
+Existing uuid4 values are converted in place; new rows get time-ordered
+UUIDv7 keys from app.models.base.uuid7.
+"""
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_uuid7_keys'
+down_revision = '0002_hot_path_indexes'
+branch_labels = None
+depends_on = None
+
+# Parents before children, so SQLite's search triggers see converted parents
+KEY_COLUMNS = {
+    'users': ['id'],
+    'categories': ['id'],
+    'skill_names': ['id'],
+    'skills': ['id', 'user_id', 'skill_name_id', 'category_id'],
+    'swaps': ['id', 'user_id', 'offered_skill_id', 'desired_skill_name_id'],
+    'discuss_requests': ['id', 'sender_id', 'recipient_id', 'swap_id', 'sender_skill_id', 'recipient_skill_id'],
+    'swap_requests': ['id', 'sender_id', 'recipient_id', 'swap_id', 'sender_skill_id', 'recipient_skill_id'],
+    'swap_conversations': ['id', 'swap_id', 'sender_id', 'recipient_id', 'discuss_request_id'],
+    'swap_messages': ['id', 'conversation_id', 'sender_id', 'recipient_id'],
+}
+
+
+def _text_to_blob(value):
+    return uuid.UUID(value).bytes if isinstance(value, str) else value
+
+
+def _blob_to_text(value):
+    return str(uuid.UUID(bytes=value)) if isinstance(value, bytes) else value
+
+
+def _foreign_keys(bind):
+    inspector = sa.inspect(bind)
+    return [(table, fk) for table in KEY_COLUMNS for fk in inspector.get_foreign_keys(table)]
+
+
+def _postgresql(using, type_):
+    # Foreign keys must go while both ends change type, then come back
+    foreign_keys = _foreign_keys(op.get_bind())
+    for table, fk in foreign_keys:
+        op.drop_constraint(fk['name'], table, type_='foreignkey')
+    for table, columns in KEY_COLUMNS.items():
+        for column in columns:
+            op.alter_column(table, column, type_=type_, postgresql_using=using.format(column=column))
+    for table, fk in foreign_keys:
+        op.create_foreign_key(fk['name'], table, fk['referred_table'],
+                              fk['constrained_columns'], fk['referred_columns'])
+
+
+def _sqlite(convert, type_, nullable_columns=('discuss_request_id',)):
+    bind = op.get_bind()
+    bind.connection.driver_connection.create_function('convert_key', 1, convert, deterministic=True)
+    for table, columns in KEY_COLUMNS.items():
+        assignments = ', '.join(f"{column} = convert_key({column})" for column in columns)
+        op.execute(f"UPDATE {table} SET {assignments}")
+    for table, columns in KEY_COLUMNS.items():
+        with op.batch_alter_table(table) as batch:
+            for column in columns:
+                batch.alter_column(column, type_=type_, existing_nullable=column in nullable_columns)
+    if sa.inspect(bind).has_table('search_docs'):
+        op.execute("UPDATE search_docs SET ref_id = convert_key(ref_id)")
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        _postgresql('{column}::uuid', postgresql.UUID(as_uuid=True))
+    else:
+        _sqlite(_text_to_blob, sa.LargeBinary(16))
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        _postgresql('{column}::text', sa.String())
+    else:
+        _sqlite(_blob_to_text, sa.String())
@@ -0,0 +1,27 @@
+"""index discuss_requests by swap for the bulk status recomputation
+
+Revision ID: 0004_discuss_swap_index
+Revises: 0003_uuid7_keys
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_discuss_swap_index'
+down_revision = '0003_uuid7_keys'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index('ix_discuss_requests_swap_status', 'discuss_requests', ['swap_id', 'status'],
+                        postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_discuss_requests_swap_status', table_name='discuss_requests',
+                      postgresql_concurrently=True)
@@ -0,0 +1,42 @@
+"""per-swap request counters for O(1) status transitions
+
+Revision ID: 0005_swap_request_counters
+Revises: 0004_discuss_swap_index
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_swap_request_counters'
+down_revision = '0004_discuss_swap_index'
+branch_labels = None
+depends_on = None
+
+# counter column -> (request table, statuses it tallies)
+COUNTERS = {
+    'pending_requests': ('swap_requests', ('pending',)),
+    'accepted_requests': ('swap_requests', ('accepted',)),
+    'closed_requests': ('swap_requests', ('rejected', 'cancelled')),
+    'accepted_discussions': ('discuss_requests', ('accepted',)),
+}
+
+
+def upgrade():
+    for column in COUNTERS:
+        op.add_column('swaps', sa.Column(column, sa.Integer(), server_default='0', nullable=False))
+
+    assignments = ', '.join(
+        f"{column} = (SELECT count(*) FROM {table} r WHERE r.swap_id = swaps.id"
+        f" AND r.status IN ({', '.join(repr(status) for status in statuses)}))"
+        for column, (table, statuses) in COUNTERS.items()
+    )
+    op.execute(f"UPDATE swaps SET {assignments}")
+
+
+def downgrade():
+    with op.batch_alter_table('swaps') as batch:
+        for column in reversed(list(COUNTERS)):
+            batch.drop_column(column)
@@ -0,0 +1,49 @@
+"""denormalized last-activity columns on swaps and conversations
+
+Revision ID: 0006_activity_columns
+Revises: 0005_swap_request_counters
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_activity_columns'
+down_revision = '0005_swap_request_counters'
+branch_labels = None
+depends_on = None
+
+PREVIEW_LENGTH = 120
+
+
+def upgrade():
+    op.add_column('swaps', sa.Column('last_request_at', sa.DateTime(), nullable=True))
+    op.add_column('swap_conversations', sa.Column('message_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('swap_conversations', sa.Column('last_message_at', sa.DateTime(), nullable=True))
+    op.add_column('swap_conversations', sa.Column('last_message_preview', sa.String(length=PREVIEW_LENGTH), nullable=True))
+
+    op.execute(
+        "UPDATE swaps SET last_request_at = "
+        "(SELECT max(r.timestamp) FROM swap_requests r WHERE r.swap_id = swaps.id)"
+    )
+    op.execute(
+        "UPDATE swap_conversations SET "
+        "message_count = (SELECT count(*) FROM swap_messages m WHERE m.conversation_id = swap_conversations.id), "
+        "last_message_at = (SELECT max(m.timestamp) FROM swap_messages m "
+        "WHERE m.conversation_id = swap_conversations.id), "
+        "last_message_preview = (SELECT CASE WHEN m.type = 'TEXT' "
+        f"THEN substr(m.content, 1, {PREVIEW_LENGTH}) ELSE '[' || lower(CAST(m.type AS TEXT)) || ']' END "
+        "FROM swap_messages m WHERE m.conversation_id = swap_conversations.id "
+        "ORDER BY m.timestamp DESC, m.id DESC LIMIT 1)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('swap_conversations') as batch:
+        batch.drop_column('last_message_preview')
+        batch.drop_column('last_message_at')
+        batch.drop_column('message_count')
+    with op.batch_alter_table('swaps') as batch:
+        batch.drop_column('last_request_at')
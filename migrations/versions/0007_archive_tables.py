@@ -0,0 +1,115 @@
+"""archive tables for old completed and cancelled swaps
+
+Revision ID: 0007_archive_tables
+Revises: 0006_activity_columns
+Create Date: 2026-10-18 19:00:00.000000
+
+Column-for-column copies of the swap tables plus archived_at, without
+foreign keys (see app/models/archive.py).
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_archive_tables'
+down_revision = '0006_activity_columns'
+branch_labels = None
+depends_on = None
+
+PREVIEW_LENGTH = 120
+
+# The enum types already exist on PostgreSQL; reuse them
+request_status = postgresql.ENUM('pending', 'accepted', 'rejected', 'cancelled', name='requeststatus',
+                                 create_type=False)
+swap_status = postgresql.ENUM('open', 'in_discussion', 'completed', 'cancelled', name='swapstatus',
+                              create_type=False)
+message_type = postgresql.ENUM('TEXT', 'IMAGE', 'FILE', name='messagetype', create_type=False)
+
+
+def _key():
+    if op.get_bind().dialect.name == 'postgresql':
+        return postgresql.UUID(as_uuid=True)
+    return sa.LargeBinary(length=16)
+
+
+def _request_columns(key):
+    return [
+        sa.Column('id', key, nullable=False),
+        sa.Column('sender_id', key, nullable=False),
+        sa.Column('recipient_id', key, nullable=False),
+        sa.Column('swap_id', key, nullable=False),
+        sa.Column('sender_skill_id', key, nullable=False),
+        sa.Column('recipient_skill_id', key, nullable=False),
+        sa.Column('status', request_status, nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    ]
+
+
+def upgrade():
+    key = _key()
+    op.create_table(
+        'archived_swaps',
+        sa.Column('id', key, nullable=False),
+        sa.Column('user_id', key, nullable=False),
+        sa.Column('offered_skill_id', key, nullable=False),
+        sa.Column('desired_skill_name_id', key, nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('status', swap_status, nullable=False),
+        sa.Column('pending_requests', sa.Integer(), nullable=False),
+        sa.Column('accepted_requests', sa.Integer(), nullable=False),
+        sa.Column('closed_requests', sa.Integer(), nullable=False),
+        sa.Column('accepted_discussions', sa.Integer(), nullable=False),
+        sa.Column('last_request_at', sa.DateTime(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_archived_swaps_user', 'archived_swaps', ['user_id'])
+
+    op.create_table('archived_swap_requests', *_request_columns(key))
+    op.create_index('ix_archived_swap_requests_swap', 'archived_swap_requests', ['swap_id'])
+    op.create_table('archived_discuss_requests', *_request_columns(key))
+    op.create_index('ix_archived_discuss_requests_swap', 'archived_discuss_requests', ['swap_id'])
+
+    op.create_table(
+        'archived_swap_conversations',
+        sa.Column('id', key, nullable=False),
+        sa.Column('swap_id', key, nullable=False),
+        sa.Column('sender_id', key, nullable=False),
+        sa.Column('recipient_id', key, nullable=False),
+        sa.Column('discuss_request_id', key, nullable=True),
+        sa.Column('sender_accepted', sa.Boolean(), nullable=False),
+        sa.Column('recipient_accepted', sa.Boolean(), nullable=False),
+        sa.Column('message_count', sa.Integer(), nullable=False),
+        sa.Column('last_message_at', sa.DateTime(), nullable=True),
+        sa.Column('last_message_preview', sa.String(length=PREVIEW_LENGTH), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_archived_swap_conversations_discuss_request', 'archived_swap_conversations',
+                    ['discuss_request_id'])
+
+    op.create_table(
+        'archived_swap_messages',
+        sa.Column('id', key, nullable=False),
+        sa.Column('conversation_id', key, nullable=False),
+        sa.Column('sender_id', key, nullable=False),
+        sa.Column('recipient_id', key, nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('type', message_type, nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_archived_swap_messages_conversation_timestamp', 'archived_swap_messages',
+                    ['conversation_id', 'timestamp'])
+
+
+def downgrade():
+    for table in ('archived_swap_messages', 'archived_swap_conversations', 'archived_discuss_requests',
+                  'archived_swap_requests', 'archived_swaps'):
+        op.drop_table(table)
@@ -0,0 +1,116 @@
+"""partition swap_messages by month on PostgreSQL
+
+Revision ID: 0008_partition_swap_messages
+Revises: 0007_archive_tables
+Create Date: 2026-10-18 21:00:00.000000
+
+swap_messages is rebuilt with (id, timestamp) as its primary key, as
+PostgreSQL requires the partition column in every unique constraint; on
+PostgreSQL it is also PARTITION BY RANGE (timestamp), with one partition per
+month from the oldest message through three months ahead plus a default
+partition. SQLite gets the same single table with the wider key.
+
+Conversations gain first_message_at, which with last_message_at bounds
+history reads so the planner can prune partitions.
+"""
+from datetime import date, datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_partition_swap_messages'
+down_revision = '0007_archive_tables'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+COLUMNS = 'id, conversation_id, sender_id, recipient_id, content, timestamp, type'
+
+message_type = postgresql.ENUM('TEXT', 'IMAGE', 'FILE', name='messagetype', create_type=False)
+
+
+def _key():
+    if op.get_bind().dialect.name == 'postgresql':
+        return postgresql.UUID(as_uuid=True)
+    return sa.LargeBinary(length=16)
+
+
+def _add_months(month, n):
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_messages_table(name, primary_key, **kwargs):
+    key = _key()
+    op.create_table(
+        name,
+        sa.Column('id', key, nullable=False),
+        sa.Column('conversation_id', key, nullable=False),
+        sa.Column('sender_id', key, nullable=False),
+        sa.Column('recipient_id', key, nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('type', message_type, nullable=False),
+        sa.ForeignKeyConstraint(['conversation_id'], ['swap_conversations.id']),
+        sa.ForeignKeyConstraint(['sender_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['recipient_id'], ['users.id']),
+        sa.PrimaryKeyConstraint(*primary_key),
+        **kwargs,
+    )
+
+
+def _create_partitions(parent):
+    oldest = op.get_bind().execute(sa.text("SELECT min(timestamp) FROM swap_messages")).scalar()
+    today = datetime.now(timezone.utc)
+    month = date((oldest or today).year, (oldest or today).month, 1)
+    last = _add_months(date(today.year, today.month, 1), MONTHS_AHEAD)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE swap_messages_y{month.year}m{month.month:02d} PARTITION OF {parent} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+    op.execute(f"CREATE TABLE swap_messages_default PARTITION OF {parent} DEFAULT")
+
+
+def _swap_in(new_table):
+    """Copy swap_messages into new_table, then put new_table in its place."""
+    op.execute(f"INSERT INTO {new_table} ({COLUMNS}) SELECT {COLUMNS} FROM swap_messages")
+    op.drop_table('swap_messages')
+    op.rename_table(new_table, 'swap_messages')
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(f"ALTER INDEX {new_table}_pkey RENAME TO swap_messages_pkey")
+    op.create_index('ix_swap_messages_conversation_timestamp', 'swap_messages', ['conversation_id', 'timestamp'])
+
+
+def upgrade():
+    for table in ('swap_conversations', 'archived_swap_conversations'):
+        op.add_column(table, sa.Column('first_message_at', sa.DateTime(), nullable=True))
+    for conversations, messages in (('swap_conversations', 'swap_messages'),
+                                    ('archived_swap_conversations', 'archived_swap_messages')):
+        op.execute(
+            f"UPDATE {conversations} SET first_message_at = "
+            f"(SELECT min(m.timestamp) FROM {messages} m WHERE m.conversation_id = {conversations}.id)"
+        )
+
+    if op.get_bind().dialect.name == 'postgresql':
+        _create_messages_table('swap_messages_partitioned', ['id', 'timestamp'],
+                               postgresql_partition_by='RANGE (timestamp)')
+        _create_partitions('swap_messages_partitioned')
+        _swap_in('swap_messages_partitioned')
+    else:
+        _create_messages_table('swap_messages_rebuilt', ['id', 'timestamp'])
+        _swap_in('swap_messages_rebuilt')
+
+
+def downgrade():
+    # Dropping the partitioned table drops its partitions with it
+    _create_messages_table('swap_messages_unpartitioned', ['id'])
+    _swap_in('swap_messages_unpartitioned')
+
+    for table in ('archived_swap_conversations', 'swap_conversations'):
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column('first_message_at')
@@ -0,0 +1,75 @@
+"""per-conversation message sequence numbers
+
+Revision ID: 0009_message_seq
+Revises: 0008_partition_swap_messages
+Create Date: 2026-10-18 23:00:00.000000
+
+Messages gain seq, numbered 1, 2, 3... per conversation in (timestamp, id)
+order, and conversations gain last_message_seq, the allocator new messages
+take their seq from. (conversation_id, seq) is unique: one index on SQLite,
+one per monthly partition on PostgreSQL (a unique index on the partitioned
+table would have to include timestamp).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009_message_seq'
+down_revision = '0008_partition_swap_messages'
+branch_labels = None
+depends_on = None
+
+TABLES = (('swap_conversations', 'swap_messages'), ('archived_swap_conversations', 'archived_swap_messages'))
+
+
+def _partitions():
+    return op.get_bind().execute(sa.text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "WHERE parent.relname = 'swap_messages'"
+    )).scalars().all()
+
+
+def upgrade():
+    for conversations, messages in TABLES:
+        op.add_column(conversations, sa.Column('last_message_seq', sa.Integer(), nullable=False,
+                                               server_default='0'))
+        op.add_column(messages, sa.Column('seq', sa.Integer(), nullable=True))
+        op.execute(
+            f"UPDATE {messages} SET seq = numbered.seq FROM ("
+            f"SELECT id, row_number() OVER (PARTITION BY conversation_id ORDER BY timestamp, id) AS seq "
+            f"FROM {messages}) AS numbered WHERE {messages}.id = numbered.id"
+        )
+        op.execute(
+            f"UPDATE {conversations} SET last_message_seq = "
+            f"(SELECT coalesce(max(m.seq), 0) FROM {messages} m WHERE m.conversation_id = {conversations}.id)"
+        )
+        with op.batch_alter_table(messages) as batch:
+            batch.alter_column('seq', existing_type=sa.Integer(), nullable=False)
+
+    if op.get_bind().dialect.name == 'postgresql':
+        for partition in _partitions():
+            op.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {partition}_conversation_seq "
+                       f"ON {partition} (conversation_id, seq)")
+    else:
+        op.create_index('ux_swap_messages_conversation_seq', 'swap_messages', ['conversation_id', 'seq'],
+                        unique=True)
+    op.create_index('ux_archived_swap_messages_conversation_seq', 'archived_swap_messages',
+                    ['conversation_id', 'seq'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ux_archived_swap_messages_conversation_seq', table_name='archived_swap_messages')
+    if op.get_bind().dialect.name == 'postgresql':
+        for partition in _partitions():
+            op.execute(f"DROP INDEX IF EXISTS {partition}_conversation_seq")
+    else:
+        op.drop_index('ux_swap_messages_conversation_seq', table_name='swap_messages')
+
+    for conversations, messages in TABLES:
+        with op.batch_alter_table(messages) as batch:
+            batch.drop_column('seq')
+        with op.batch_alter_table(conversations) as batch:
+            batch.drop_column('last_message_seq')
@@ -0,0 +1,115 @@
+"""full-text search index and triggers
+
+Revision ID: 0010_search_index
+Revises: 0009_message_seq
+Create Date: 2026-10-19 09:00:00.000000
+
+The search index and its sync triggers used to be (re)installed by every
+worker on boot. They are schema, so they live here now. The triggers are
+recreated to fire only when an indexed column changes; status and counter
+updates on swaps no longer rewrite search documents. The documents are
+rebuilt once, here; afterwards `flask search-reindex` does that on demand.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0010_search_index'
+down_revision = '0009_message_seq'
+branch_labels = None
+depends_on = None
+
+SKILL_CONTENT = (
+    "COALESCE((SELECT name FROM skill_names WHERE id = {row}.skill_name_id), '')"
+    " || ' ' || {row}.description"
+)
+SWAP_CONTENT = (
+    "COALESCE((SELECT sn.name FROM skills s JOIN skill_names sn ON sn.id = s.skill_name_id"
+    " WHERE s.id = {row}.offered_skill_id), '')"
+    " || ' ' || COALESCE((SELECT name FROM skill_names WHERE id = {row}.desired_skill_name_id), '')"
+    " || ' ' || {row}.description"
+)
+SOURCES = (
+    ('skill', 'skills', SKILL_CONTENT, 'skill_name_id, description'),
+    ('swap', 'swaps', SWAP_CONTENT, 'offered_skill_id, desired_skill_name_id, description'),
+)
+
+
+def _upgrade_sqlite():
+    op.execute("CREATE TABLE IF NOT EXISTS search_docs ("
+               " rowid INTEGER PRIMARY KEY, kind TEXT NOT NULL, ref_id BLOB NOT NULL, UNIQUE (kind, ref_id))")
+    op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS search_index "
+               "USING fts5(content, tokenize = 'porter unicode61')")
+    for kind, table, content, columns in SOURCES:
+        insert = (
+            f"INSERT INTO search_docs (kind, ref_id) VALUES ('{kind}', NEW.id); "
+            f"INSERT INTO search_index (rowid, content) VALUES (last_insert_rowid(), {content.format(row='NEW')}); "
+        )
+        delete = (
+            f"DELETE FROM search_index WHERE rowid = "
+            f"(SELECT rowid FROM search_docs WHERE kind = '{kind}' AND ref_id = OLD.id); "
+            f"DELETE FROM search_docs WHERE kind = '{kind}' AND ref_id = OLD.id; "
+        )
+        for suffix in ('ai', 'au', 'ad'):
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_search_{suffix}")
+        op.execute(f"CREATE TRIGGER {table}_search_ai AFTER INSERT ON {table} BEGIN {insert}END")
+        op.execute(f"CREATE TRIGGER {table}_search_au AFTER UPDATE OF {columns} ON {table} "
+                   f"BEGIN {delete}{insert}END")
+        op.execute(f"CREATE TRIGGER {table}_search_ad AFTER DELETE ON {table} BEGIN {delete}END")
+
+    op.execute("DELETE FROM search_index")
+    op.execute("DELETE FROM search_docs")
+    for kind, table, content, _ in SOURCES:
+        op.execute(f"INSERT INTO search_docs (kind, ref_id) SELECT '{kind}', id FROM {table}")
+        op.execute(f"INSERT INTO search_index (rowid, content)"
+                   f" SELECT d.rowid, {content.format(row='t')} FROM search_docs d"
+                   f" JOIN {table} t ON t.id = d.ref_id WHERE d.kind = '{kind}'")
+
+
+def _upgrade_postgresql():
+    op.execute("CREATE TABLE IF NOT EXISTS search_documents ("
+               " kind TEXT NOT NULL, ref_id TEXT NOT NULL, content TEXT NOT NULL,"
+               " tsv tsvector GENERATED ALWAYS AS (to_tsvector('english', content)) STORED,"
+               " PRIMARY KEY (kind, ref_id))")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_search_documents_tsv ON search_documents USING GIN (tsv)")
+    for kind, table, content, columns in SOURCES:
+        op.execute(f"""CREATE OR REPLACE FUNCTION {table}_search_sync() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    DELETE FROM search_documents WHERE kind = '{kind}' AND ref_id = OLD.id::text;
+                    RETURN OLD;
+                END IF;
+                INSERT INTO search_documents (kind, ref_id, content)
+                VALUES ('{kind}', NEW.id::text, {content.format(row='NEW')})
+                ON CONFLICT (kind, ref_id) DO UPDATE SET content = EXCLUDED.content;
+                RETURN NEW;
+            END $$ LANGUAGE plpgsql""")
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_search_sync ON {table}")
+        op.execute(f"CREATE TRIGGER {table}_search_sync AFTER INSERT OR UPDATE OF {columns} OR DELETE ON {table}"
+                   f" FOR EACH ROW EXECUTE FUNCTION {table}_search_sync()")
+
+    op.execute("TRUNCATE search_documents")
+    for kind, table, content, _ in SOURCES:
+        op.execute(f"INSERT INTO search_documents (kind, ref_id, content)"
+                   f" SELECT '{kind}', t.id::text, {content.format(row='t')} FROM {table} t")
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        _upgrade_postgresql()
+    else:
+        _upgrade_sqlite()
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for _, table, _, _ in SOURCES:
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_search_sync ON {table}")
+            op.execute(f"DROP FUNCTION IF EXISTS {table}_search_sync()")
+        op.execute("DROP TABLE IF EXISTS search_documents")
+    else:
+        for _, table, _, _ in SOURCES:
+            for suffix in ('ai', 'au', 'ad'):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_search_{suffix}")
+        op.execute("DROP TABLE IF EXISTS search_index")
+        op.execute("DROP TABLE IF EXISTS search_docs")
@@ -1,8 +1,27 @@
+import os
+
+# create_app() loads config.Config, which reads DATABASE_URI at import time
+os.environ.setdefault('DATABASE_URI', 'sqlite:///:memory:')
+
 import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
 from app import create_app
-from app.models import db, User, Category, SkillName, Skill, Swap, SwapRequest
+from app.models import (
+    db, User, Category, SkillName, Skill, Swap, SwapRequest, DiscussRequest, SwapConversation, RequestStatus,
+    SwapMessage, MessageType,
+)
 from werkzeug.security import generate_password_hash
-import os
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip the benchmarks marked slow unless RUN_SLOW_TESTS is set."""
+    if os.getenv('RUN_SLOW_TESTS'):
+        return
+    skip = pytest.mark.skip(reason="benchmark; set RUN_SLOW_TESTS=1 to run")
+    for item in items:
+        if 'slow' in item.keywords:
+            item.add_marker(skip)
 
 @pytest.fixture
 def app():
@@ -90,3 +109,174 @@ def test_skill(app, test_user, test_skill_name):
         db.session.add(skill)
         db.session.commit()
         return skill
+
+@pytest.fixture
+def query_counter(app):
+    """Count SQL statements executed against the app engine."""
+    from contextlib import contextmanager
+    from sqlalchemy import event
+
+    @contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+    return counter
+
+
+def _make_user(name):
+    user = User(name=name, email=f"{name.lower()}@example.com", password=generate_password_hash("password123"))
+    db.session.add(user)
+    return user
+
+
+def _populate(ids, others, start):
+    """Give `me` one swap, one received swap request and one accepted discussion per other user."""
+    me_id, my_skill_id, category_id = ids
+    me = db.session.get(User, me_id)
+    my_skill = db.session.get(Skill, my_skill_id)
+    category = db.session.get(Category, category_id)
+    for i in range(start, start + others):
+        other = _make_user(f"Other{i}")
+        offered_name = SkillName(name=f"Loader Offered {i}")
+        db.session.add(offered_name)
+        db.session.flush()
+        other_skill = Skill(user_id=other.id, skill_name_id=offered_name.id,
+                            category_id=category.id, description="Offered skill description")
+        db.session.add(other_skill)
+        db.session.flush()
+        swap = Swap(user_id=other.id, offered_skill_id=other_skill.id,
+                    desired_skill_name_id=my_skill.skill_name_id, description=f"Swap {i}")
+        my_swap = Swap(user_id=me.id, offered_skill_id=my_skill.id,
+                       desired_skill_name_id=offered_name.id, description=f"My swap {i}")
+        db.session.add_all([swap, my_swap])
+        db.session.flush()
+        db.session.add(SwapRequest(sender_id=other.id, recipient_id=me.id, swap_id=my_swap.id,
+                                   sender_skill_id=other_skill.id, recipient_skill_id=my_skill.id))
+        discuss = DiscussRequest(sender_id=me.id, recipient_id=other.id, swap_id=my_swap.id,
+                                 sender_skill_id=my_skill.id, recipient_skill_id=other_skill.id,
+                                 status=RequestStatus.accepted)
+        db.session.add(discuss)
+        db.session.flush()
+        db.session.add(SwapConversation(swap_id=my_swap.id, sender_id=me.id, recipient_id=other.id,
+                                        discuss_request_id=discuss.id))
+    db.session.commit()
+
+
+@pytest.fixture
+def make_user():
+    """Factory: add a user called `name` (email <name>@example.com) to the session."""
+    return _make_user
+
+
+@pytest.fixture
+def populate():
+    """Factory: give a user swaps, requests and accepted discussions with `others` new users."""
+    return _populate
+
+
+def _include(object, name, type_, reflected, compare_to):
+    return not (type_ == 'table' and name.startswith('search_'))
+
+
+def _schema_diff():
+    with db.engine.connect() as connection:
+        context = MigrationContext.configure(connection, opts={'include_object': _include})
+        return compare_metadata(context, db.metadata)
+
+
+@pytest.fixture
+def schema_diff():
+    """Differences between the database (in the current app context) and the models; [] when in step."""
+    return _schema_diff
+
+
+@pytest.fixture
+def conversation(app):
+    """A conversation between two users, with no messages yet; returns ids."""
+    with app.app_context():
+        category = db.session.execute(db.select(Category)).scalars().first()
+        name = db.session.execute(db.select(SkillName)).scalars().first()
+        owner = User(name="Owner", email="owner@example.com", password=generate_password_hash("password123"))
+        asker = User(name="Asker", email="asker@example.com", password=generate_password_hash("password123"))
+        db.session.add_all([owner, asker])
+        db.session.flush()
+        skill = Skill(user_id=owner.id, skill_name_id=name.id, category_id=category.id,
+                      description="Owner skill description")
+        db.session.add(skill)
+        db.session.flush()
+        swap = Swap(user_id=owner.id, offered_skill_id=skill.id, desired_skill_name_id=name.id,
+                    description="Partitioned chat")
+        db.session.add(swap)
+        db.session.flush()
+        conversation = SwapConversation(swap_id=swap.id, sender_id=asker.id, recipient_id=owner.id)
+        db.session.add(conversation)
+        db.session.commit()
+        return {'conversation': conversation.id, 'owner': owner.id, 'asker': asker.id}
+
+
+def _make_message(ids, content, at):
+    return SwapMessage(conversation_id=ids['conversation'], sender_id=ids['asker'], recipient_id=ids['owner'],
+                       content=content, type=MessageType.TEXT, timestamp=at)
+
+
+@pytest.fixture
+def make_message():
+    """Factory: an unsaved message from the asker to the owner of `conversation` ids."""
+    return _make_message
+
+
+def _make_chat():
+    """An accepted discussion between two users with its conversation, plus an outsider; returns ids."""
+    category = db.session.execute(db.select(Category)).scalars().first()
+    names = db.session.execute(db.select(SkillName).limit(2)).scalars().all()
+    owner = User(name="Owner", email="owner@example.com", password=generate_password_hash("password123"))
+    asker = User(name="Asker", email="asker@example.com", password=generate_password_hash("password123"))
+    outsider = User(name="Outsider", email="outsider@example.com",
+                    password=generate_password_hash("password123"))
+    db.session.add_all([owner, asker, outsider])
+    db.session.flush()
+    owner_skill = Skill(user_id=owner.id, skill_name_id=names[0].id, category_id=category.id,
+                        description="Owner skill description")
+    asker_skill = Skill(user_id=asker.id, skill_name_id=names[1].id, category_id=category.id,
+                        description="Asker skill description")
+    db.session.add_all([owner_skill, asker_skill])
+    db.session.flush()
+    swap = Swap(user_id=owner.id, offered_skill_id=owner_skill.id, desired_skill_name_id=names[1].id,
+                description="Socket chat")
+    db.session.add(swap)
+    db.session.flush()
+    discuss = DiscussRequest(sender_id=owner.id, recipient_id=asker.id, swap_id=swap.id,
+                             sender_skill_id=owner_skill.id, recipient_skill_id=asker_skill.id,
+                             status=RequestStatus.accepted)
+    db.session.add(discuss)
+    db.session.flush()
+    conversation = SwapConversation(swap_id=swap.id, sender_id=owner.id, recipient_id=asker.id,
+                                    discuss_request_id=discuss.id)
+    db.session.add(conversation)
+    db.session.commit()
+    return {'owner': owner.id, 'asker': asker.id, 'outsider': outsider.id,
+            'discuss_request': discuss.id, 'conversation': conversation.id}
+
+
+@pytest.fixture
+def make_chat():
+    """Factory: an accepted discussion with its conversation, plus an outsider, in the current app; returns ids."""
+    return _make_chat
+
+
+@pytest.fixture
+def chat(app):
+    """make_chat() in the test app."""
+    with app.app_context():
+        return _make_chat()
@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from app.models import (
+    db, User, Category, SkillName, Skill, Swap, SwapRequest, SwapConversation, SwapMessage, MessageType,
+)
+from app.models.swap_message import PREVIEW_LENGTH
+from app.services.conversation_activity import recompute_conversation_activity
+from app.services.swap_status import recompute_swap_statuses
+from werkzeug.security import generate_password_hash
+
+
+@pytest.fixture
+def conversation(app):
+    """A swap with one conversation between its owner and an asker; returns ids."""
+    with app.app_context():
+        category = db.session.execute(db.select(Category)).scalars().first()
+        names = db.session.execute(db.select(SkillName).limit(2)).scalars().all()
+        owner = User(name="Owner", email="owner@example.com", password=generate_password_hash("password123"))
+        asker = User(name="Asker", email="asker@example.com", password=generate_password_hash("password123"))
+        db.session.add_all([owner, asker])
+        db.session.flush()
+        owner_skill = Skill(user_id=owner.id, skill_name_id=names[0].id, category_id=category.id,
+                            description="Owner skill description")
+        asker_skill = Skill(user_id=asker.id, skill_name_id=names[1].id, category_id=category.id,
+                            description="Asker skill description")
+        db.session.add_all([owner_skill, asker_skill])
+        db.session.flush()
+        swap = Swap(user_id=owner.id, offered_skill_id=owner_skill.id, desired_skill_name_id=names[1].id,
+                    description="Swap under test")
+        db.session.add(swap)
+        db.session.flush()
+        conversation = SwapConversation(swap_id=swap.id, sender_id=asker.id, recipient_id=owner.id)
+        db.session.add(conversation)
+        db.session.commit()
+        return {'swap': swap.id, 'conversation': conversation.id, 'owner': owner.id, 'asker': asker.id,
+                'owner_skill': owner_skill.id, 'asker_skill': asker_skill.id}
+
+
+def _message(ids, content, **kwargs):
+    return SwapMessage(conversation_id=ids['conversation'], sender_id=ids['asker'],
+                       recipient_id=ids['owner'], content=content, **kwargs)
+
+
+def _activity(conversation_id):
+    conversation = db.session.get(SwapConversation, conversation_id)
+    db.session.refresh(conversation)
+    return conversation.message_count, conversation.last_message_preview, conversation.last_message_at
+
+
+class TestActivityColumns:
+    """Test the maintained last-activity columns and their repair."""
+
+    def test_messages_update_conversation(self, app, conversation):
+        with app.app_context():
+            start = datetime(2026, 1, 1, 12, 0)
+            db.session.add_all([
+                _message(conversation, "second", timestamp=start + timedelta(minutes=1)),
+                _message(conversation, "first", timestamp=start),
+            ])
+            db.session.commit()
+            assert _activity(conversation['conversation']) == (2, "second", start + timedelta(minutes=1))
+
+            db.session.add(_message(conversation, "x" * 500, timestamp=start + timedelta(minutes=2)))
+            db.session.commit()
+            count, preview, _ = _activity(conversation['conversation'])
+            assert count == 3 and preview == "x" * PREVIEW_LENGTH
+
+            db.session.add(_message(conversation, "/uploads/cat.png", type=MessageType.IMAGE,
+                                    timestamp=start + timedelta(minutes=3)))
+            db.session.commit()
+            assert _activity(conversation['conversation'])[:2] == (4, "[image]")
+
+    def test_count_is_incremented_in_sql(self, app, conversation, query_counter):
+        with app.app_context():
+            db.session.get(SwapConversation, conversation['conversation'])
+            with query_counter() as statements:
+                db.session.add(_message(conversation, "hello"))
+                db.session.commit()
+            updates = [s for s in statements if s.lstrip().startswith('UPDATE swap_conversations')]
+            assert len(updates) == 1
+            assert 'message_count=(swap_conversations.message_count + ' in updates[0].replace(' = ', '=')
+
+    def test_new_swap_request_sets_last_request_at(self, app, conversation):
+        with app.app_context():
+            made_at = datetime(2026, 2, 1, 9, 30, tzinfo=timezone.utc)
+            for timestamp in (made_at, made_at - timedelta(days=1)):
+                db.session.add(SwapRequest(sender_id=conversation['asker'], recipient_id=conversation['owner'],
+                                           swap_id=conversation['swap'], sender_skill_id=conversation['asker_skill'],
+                                           recipient_skill_id=conversation['owner_skill'], timestamp=timestamp))
+                db.session.commit()
+            swap = db.session.get(Swap, conversation['swap'])
+            db.session.refresh(swap)
+            assert swap.last_request_at == made_at.replace(tzinfo=None)
+            assert swap.pending_requests == 2
+
+    def test_recompute_repairs_drift(self, app, conversation):
+        with app.app_context():
+            at = datetime(2026, 3, 1, 8, 0)
+            db.session.add_all([_message(conversation, "older", timestamp=at),
+                                _message(conversation, "newest", timestamp=at + timedelta(hours=1))])
+            db.session.add(SwapRequest(sender_id=conversation['asker'], recipient_id=conversation['owner'],
+                                       swap_id=conversation['swap'], sender_skill_id=conversation['asker_skill'],
+                                       recipient_skill_id=conversation['owner_skill'], timestamp=at))
+            db.session.commit()
+            db.session.execute(db.update(SwapConversation).values(
+                message_count=0, last_message_at=None, last_message_preview=None))
+            db.session.execute(db.update(Swap).values(last_request_at=None))
+            db.session.commit()
+
+            assert recompute_conversation_activity(chunk_size=1) == 1
+            recompute_swap_statuses()
+            assert _activity(conversation['conversation']) == (2, "newest", at + timedelta(hours=1))
+            assert db.session.get(Swap, conversation['swap']).last_request_at == at
+
+    def test_repair_command(self, app, conversation, runner):
+        result = runner.invoke(args=['recompute-conversation-activity'])
+        assert result.exit_code == 0
+        assert 'rebuilt for 1 conversations' in result.output
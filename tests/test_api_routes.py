@@ -0,0 +1,101 @@
+import pytest
+from datetime import datetime, timedelta
+from app.models import db, User, Category, SkillName, Skill, Swap, SwapRequest, SwapStatus
+from werkzeug.security import generate_password_hash
+
+
+@pytest.fixture
+def stream(app):
+    """One user offering a skill and 25 swaps from another user wanting it."""
+    with app.app_context():
+        me = User(name="Me", email="me@example.com", password=generate_password_hash("password123"))
+        other = User(name="Other", email="other@example.com", password=generate_password_hash("password123"))
+        wanted = SkillName(name="API Wanted")
+        offered = SkillName(name="API Offered")
+        db.session.add_all([me, other, wanted, offered])
+        db.session.flush()
+        category = db.session.execute(db.select(Category)).scalars().first()
+        my_skill = Skill(user_id=me.id, skill_name_id=wanted.id, category_id=category.id, description="Mine")
+        other_skill = Skill(user_id=other.id, skill_name_id=offered.id, category_id=category.id, description="Theirs")
+        db.session.add_all([my_skill, other_skill])
+        db.session.flush()
+
+        base = datetime(2025, 1, 1)
+        for i in range(25):
+            # Pairs of swaps share a timestamp so the id tiebreaker is exercised
+            db.session.add(Swap(user_id=other.id, offered_skill_id=other_skill.id,
+                                desired_skill_name_id=wanted.id, description=f"Swap {i}",
+                                timestamp=base + timedelta(minutes=i // 2),
+                                status=SwapStatus.in_discussion if i % 5 == 0 else SwapStatus.open))
+        db.session.commit()
+        return {'me': me.id, 'other': other.id, 'my_skill': my_skill.id,
+                'other_skill': other_skill.id, 'wanted': wanted.id}
+
+
+def _login(client, user_id):
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+
+
+class TestApiRoutes:
+    """Test the cursor-paginated JSON API."""
+
+    def test_requires_login(self, client):
+        """Test that the API rejects anonymous callers."""
+        response = client.get('/api/swaps')
+        assert response.status_code == 401
+
+    def test_swap_stream_pages_cover_everything_once(self, client, stream):
+        """Test that walking the cursors returns every swap exactly once, newest first."""
+        _login(client, stream['me'])
+        seen, cursor, pages = [], None, 0
+        while True:
+            url = '/api/swaps?limit=10' + (f'&cursor={cursor}' if cursor else '')
+            body = client.get(url).get_json()
+            seen.extend(body['items'])
+            cursor = body['next_cursor']
+            pages += 1
+            if not cursor:
+                break
+
+        assert pages == 3
+        assert len({item['id'] for item in seen}) == 25
+        keys = [(item['timestamp'], item['id']) for item in seen]
+        assert keys == sorted(keys, reverse=True)
+
+    def test_swap_stream_filters(self, client, stream):
+        """Test status and desired_skill_name_id filters."""
+        _login(client, stream['me'])
+        body = client.get('/api/swaps?status=in_discussion&limit=100').get_json()
+        assert len(body['items']) == 5
+        assert all(item['status'] == 'in_discussion' for item in body['items'])
+
+        body = client.get('/api/swaps?desired_skill_name_id=nope').get_json()
+        assert body['items'] == []
+
+    def test_bad_parameters(self, client, stream):
+        """Test that unknown statuses and cursors are rejected."""
+        _login(client, stream['me'])
+        assert client.get('/api/swaps?status=bogus').status_code == 400
+        assert client.get('/api/swaps?cursor=not-a-cursor').status_code == 400
+        assert client.get('/api/swap-requests?box=outbox').status_code == 400
+
+    def test_request_inbox(self, client, app, stream):
+        """Test the sent and received swap request inboxes."""
+        with app.app_context():
+            swap = db.session.execute(db.select(Swap)).scalars().first()
+            db.session.add(SwapRequest(sender_id=stream['me'], recipient_id=stream['other'], swap_id=swap.id,
+                                       sender_skill_id=stream['my_skill'],
+                                       recipient_skill_id=stream['other_skill']))
+            db.session.commit()
+
+        _login(client, stream['me'])
+        sent = client.get('/api/swap-requests?box=sent').get_json()
+        assert len(sent['items']) == 1
+        assert sent['items'][0]['recipient_name'] == "Other"
+        assert client.get('/api/swap-requests?box=received').get_json()['items'] == []
+        assert client.get('/api/swap-requests?box=sent&status=accepted').get_json()['items'] == []
+
+        # The requested swap drops out of the stream
+        body = client.get('/api/swaps?limit=100').get_json()
+        assert len(body['items']) == 24
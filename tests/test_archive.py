@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from app.models import (
+    db, User, Category, SkillName, Skill, Swap, SwapRequest, DiscussRequest, SwapConversation, SwapMessage,
+    SwapStatus, RequestStatus, MessageType,
+    ArchivedSwap, ArchivedSwapRequest, ArchivedDiscussRequest, ArchivedSwapConversation, ArchivedSwapMessage,
+)
+from app.services.archive import archive_swaps, find, is_archived
+from app.services.dashboard_loader import swap_view
+from werkzeug.security import generate_password_hash
+
+LONG_AGO = datetime.now(timezone.utc) - timedelta(days=400)
+RECENTLY = datetime.now(timezone.utc) - timedelta(days=1)
+
+# (request status, swap status set afterwards, created at, last chat message at)
+CASES = {
+    'old_completed': (RequestStatus.accepted, SwapStatus.completed, LONG_AGO, LONG_AGO),
+    'old_cancelled': (RequestStatus.rejected, None, LONG_AGO, None),
+    'recent_chat': (RequestStatus.accepted, SwapStatus.completed, LONG_AGO, RECENTLY),
+    'recent_completed': (RequestStatus.accepted, SwapStatus.completed, RECENTLY, None),
+    'old_open': (RequestStatus.pending, None, LONG_AGO, None),
+}
+ARCHIVED_CASES = {'old_completed', 'old_cancelled'}
+
+
+@pytest.fixture
+def finished_swaps(app):
+    """One swap per CASES entry, each with a swap request and an accepted discussion; returns ids."""
+    with app.app_context():
+        category = db.session.execute(db.select(Category)).scalars().first()
+        names = db.session.execute(db.select(SkillName).limit(2)).scalars().all()
+        owner = User(name="Owner", email="owner@example.com", password=generate_password_hash("password123"))
+        asker = User(name="Asker", email="asker@example.com", password=generate_password_hash("password123"))
+        db.session.add_all([owner, asker])
+        db.session.flush()
+        owner_skill = Skill(user_id=owner.id, skill_name_id=names[0].id, category_id=category.id,
+                            description="Owner skill description")
+        asker_skill = Skill(user_id=asker.id, skill_name_id=names[1].id, category_id=category.id,
+                            description="Asker skill description")
+        db.session.add_all([owner_skill, asker_skill])
+        db.session.flush()
+
+        ids = {'owner': owner.id, 'asker': asker.id}
+        for case, (request_status, swap_status, created, chatted) in CASES.items():
+            swap = Swap(user_id=owner.id, offered_skill_id=owner_skill.id, desired_skill_name_id=names[1].id,
+                        description=case, timestamp=created)
+            db.session.add(swap)
+            db.session.flush()
+            db.session.add(SwapRequest(sender_id=asker.id, recipient_id=owner.id, swap_id=swap.id,
+                                       sender_skill_id=asker_skill.id, recipient_skill_id=owner_skill.id,
+                                       status=request_status, timestamp=created))
+            discuss = DiscussRequest(sender_id=owner.id, recipient_id=asker.id, swap_id=swap.id,
+                                     sender_skill_id=owner_skill.id, recipient_skill_id=asker_skill.id,
+                                     status=RequestStatus.accepted, timestamp=created)
+            db.session.add(discuss)
+            db.session.flush()
+            conversation = SwapConversation(swap_id=swap.id, sender_id=owner.id, recipient_id=asker.id,
+                                            discuss_request_id=discuss.id)
+            db.session.add(conversation)
+            db.session.flush()
+            if chatted:
+                for i, at in enumerate((created, chatted)):
+                    db.session.add(SwapMessage(conversation_id=conversation.id, sender_id=owner.id,
+                                               recipient_id=asker.id, content=f"{case} message {i}",
+                                               type=MessageType.TEXT, timestamp=at))
+            db.session.flush()
+            if swap_status:
+                swap.status = swap_status
+            ids[case] = {'swap': swap.id, 'discuss_request': discuss.id, 'conversation': conversation.id}
+        db.session.commit()
+        return ids
+
+
+def _live_swaps():
+    return set(db.session.execute(db.select(Swap.description)).scalars())
+
+
+def _archived_swaps():
+    return set(db.session.execute(db.select(ArchivedSwap.description)).scalars())
+
+
+class TestArchive:
+    """Test moving finished swaps to the archive tables and reading them back."""
+
+    @pytest.mark.parametrize('batch_size', [1, 500])
+    def test_old_finished_swaps_move_with_their_rows(self, app, finished_swaps, batch_size):
+        with app.app_context():
+            moved = archive_swaps(older_than_days=30, batch_size=batch_size)
+            assert moved == {'swaps': 2, 'swap_requests': 2, 'discuss_requests': 2,
+                             'swap_conversations': 2, 'swap_messages': 2}
+            assert _archived_swaps() == ARCHIVED_CASES
+            assert _live_swaps() == set(CASES) - ARCHIVED_CASES
+            for model in (SwapRequest, DiscussRequest, SwapConversation):
+                assert db.session.execute(db.select(db.func.count()).select_from(model)).scalar() == 3
+            assert db.session.execute(db.select(db.func.count()).select_from(SwapMessage)).scalar() == 2
+            for model in (ArchivedSwapRequest, ArchivedDiscussRequest, ArchivedSwapConversation,
+                          ArchivedSwapMessage):
+                assert db.session.execute(db.select(db.func.count()).select_from(model)).scalar() == 2
+
+            # Nothing left to do on a second run
+            assert not any(archive_swaps(older_than_days=30).values())
+
+    def test_find_falls_back_to_the_archive(self, app, finished_swaps):
+        with app.app_context():
+            archive_swaps(older_than_days=30)
+            old = finished_swaps['old_completed']
+            swap = find(Swap, old['swap'])
+            assert isinstance(swap, ArchivedSwap) and is_archived(swap)
+            assert swap.status == SwapStatus.completed
+            assert swap.archived_at is not None
+            assert swap_view(swap)['user_name'] == "Owner"
+            assert [r.status for r in swap.swap_requests] == [RequestStatus.accepted]
+
+            discuss_request = find(DiscussRequest, old['discuss_request'])
+            messages = discuss_request.swap_conversation.messages
+            assert [m.content for m in messages] == ["old_completed message 0", "old_completed message 1"]
+            assert messages[0].sender.name == "Owner"
+            assert discuss_request.swap_conversation.messages[-1].preview == "old_completed message 1"
+
+            live = find(Swap, finished_swaps['old_open']['swap'])
+            assert isinstance(live, Swap) and not is_archived(live)
+            assert find(Swap, 'not-a-swap') is None
+
+    def test_archived_chat_is_read_only(self, app, client, finished_swaps):
+        with app.app_context():
+            archive_swaps(older_than_days=30)
+        with client.session_transaction() as sess:
+            sess['user_id'] = finished_swaps['asker']
+        url = f"/chat/{finished_swaps['old_completed']['discuss_request']}"
+        response = client.get(url)
+        assert response.status_code == 200
+        assert b"old_completed message 1" in response.data
+        assert b"archived" in response.data
+
+        assert client.post(url, data={'message': "Anyone there?"}).status_code == 409
+        with app.app_context():
+            assert db.session.execute(db.select(db.func.count()).select_from(SwapMessage)).scalar() == 2
+
+    def test_swap_detail_api(self, app, client, finished_swaps):
+        with app.app_context():
+            archive_swaps(older_than_days=30)
+        with client.session_transaction() as sess:
+            sess['user_id'] = finished_swaps['asker']
+        data = client.get(f"/api/swaps/{finished_swaps['old_cancelled']['swap']}").get_json()
+        assert data['archived'] and data['swap']['status'] == 'cancelled'
+        data = client.get(f"/api/swaps/{finished_swaps['old_open']['swap']}").get_json()
+        assert not data['archived'] and data['swap']['description'] == 'old_open'
+        assert client.get("/api/swaps/missing").status_code == 404
+
+    def test_cli_command(self, app, runner, finished_swaps):
+        result = runner.invoke(args=['archive-swaps', '--older-than-days', '30'])
+        assert result.exit_code == 0
+        assert "2 swaps" in result.output and "2 swap_messages" in result.output
+        result = runner.invoke(args=['archive-swaps', '--older-than-days', '30'])
+        assert "nothing to archive" in result.output
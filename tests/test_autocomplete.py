@@ -0,0 +1,121 @@
+import time
+
+import pytest
+from app.models import db, User, SkillName
+from app.services.autocomplete import AutocompleteIndex, skill_autocomplete
+from werkzeug.security import generate_password_hash
+
+
+@pytest.fixture
+def index():
+    idx = AutocompleteIndex()
+    idx.sync({'1': "Guitar Chords", '2': "Classical Guitar", '3': "Healthy Cooking", '4': "Python Basics"}, 'v1')
+    return idx
+
+
+@pytest.fixture
+def user_id(app):
+    with app.app_context():
+        user = User(name="Typist", email="typist@example.com", password=generate_password_hash("password123"))
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+def _nodes(node):
+    yield node
+    for child in node.children.values():
+        yield from _nodes(child)
+
+
+class TestAutocompleteIndex:
+    """Test the in-memory SkillName trie and trigram index."""
+
+    def test_prefix_matches_any_word(self, index):
+        # Whole-name prefix matches come before later-word matches
+        assert index.complete("gui") == ['1', '2']
+        assert index.complete("classical g") == ['2']
+        assert index.complete("  COOK ") == ['3']
+        assert index.complete("xyz") == []
+        assert index.complete("") == []
+
+    def test_fuzzy_tolerates_typos(self, index):
+        assert set(index.fuzzy("gitar")) == {'1', '2'}
+        assert index.fuzzy("pythn basic")[0] == '4'
+        assert index.suggest("cookng") == [('3', "Healthy Cooking")]
+
+    def test_sync_applies_only_changes(self, index):
+        index.sync({'1': "Guitar Chords", '2': "Jazz Guitar", '5': "Go Programming"}, 'v2')
+        assert index.complete("classical") == []
+        assert index.complete("jazz") == ['2']
+        assert index.complete("go") == ['5']
+        assert index.complete("cook") == [] and index.fuzzy("cooking") == []
+        assert len(index) == 3
+        # Same version is a no-op
+        index.sync({}, 'v2')
+        assert len(index) == 3
+
+    def test_remove_prunes_repeated_words(self):
+        idx = AutocompleteIndex()
+        idx.add('1', "Cha Cha")
+        idx.remove('1')
+        assert idx.complete("cha") == [] and len(idx) == 0
+
+    @pytest.mark.parametrize('removed', ["Cha Cha", "Cha Cha Chat", "Chat Chat Cha"])
+    def test_remove_keeps_names_sharing_a_prefix(self, removed):
+        names = {'1': "Cha Cha", '2': "Cha Cha Chat", '3': "Chat Chat Cha", '4': "Chai"}
+        idx = AutocompleteIndex()
+        idx.sync(names, 'v1')
+        gone = next(sn_id for sn_id, name in names.items() if name == removed)
+        idx.remove(gone)
+        kept = {sn_id: name for sn_id, name in names.items() if sn_id != gone}
+
+        fresh = AutocompleteIndex()
+        fresh.sync(kept, 'v1')
+        for prefix in ("c", "cha", "cha c", "cha cha", "cha cha c", "chat", "chat c", "chai"):
+            assert idx.complete(prefix) == fresh.complete(prefix), prefix
+        # No node still lists the removed id, and none is left leading nowhere
+        assert all(gone not in node.ids and node.ids for node in _nodes(idx._root))
+
+    def test_removing_a_missing_id_changes_nothing(self, index):
+        before = {prefix: index.complete(prefix) for prefix in ("gui", "classical", "cook", "py")}
+        index.remove('no-such-id')
+        assert len(index) == 4
+        assert {prefix: index.complete(prefix) for prefix in before} == before
+
+    def test_lookup_is_sub_millisecond(self, index):
+        big = AutocompleteIndex()
+        big.sync({str(i): f"Skill {i} Topic{i % 97}" for i in range(5000)}, 'v1')
+        started = time.perf_counter()
+        for _ in range(100):
+            big.suggest("topic4", 10)
+        assert (time.perf_counter() - started) / 100 < 0.001
+
+
+class TestSkillNameEndpoint:
+    """Test /api/skill-names and its tracking of new SkillName rows."""
+
+    def test_requires_login(self, client):
+        assert client.get('/api/skill-names?q=gui').status_code == 401
+
+    def test_suggestions_follow_new_skill_names(self, client, app, user_id):
+        with client.session_transaction() as sess:
+            sess['user_id'] = user_id
+        body = client.get('/api/skill-names?q=guitar').get_json()
+        assert body['success'] and any(item['name'] == "Guitar Chords" for item in body['items'])
+
+        with app.app_context():
+            db.session.add(SkillName(name="Ukulele Strumming"))
+            db.session.commit()
+        items = client.get('/api/skill-names?q=ukul&limit=3').get_json()['items']
+        assert [item['name'] for item in items] == ["Ukulele Strumming"]
+
+        with app.app_context():
+            assert len(skill_autocomplete()) == db.session.query(SkillName).count()
+
+    def test_dashboard_does_not_ship_skill_names(self, client, app, user_id):
+        with client.session_transaction() as sess:
+            sess['user_id'] = user_id
+        html = client.get('/dashboard').get_data(as_text=True)
+        assert "Guitar Chords" not in html
+        assert "/api/skill-names" in html
@@ -0,0 +1,157 @@
+from datetime import datetime, timedelta
+
+import pytest
+from app.models import db, SwapMessage, MessageType
+from app.services.chat_messages import CHAT_NAMESPACE, MAX_MESSAGE_LENGTH
+from app.sockets import socketio
+
+
+def _connect(app, user_id=None):
+    """A /chat socket client carrying the session cookie of `user_id` (anonymous when None)."""
+    client = app.test_client()
+    if user_id:
+        with client.session_transaction() as sess:
+            sess['user_id'] = user_id
+    return socketio.test_client(app, namespace=CHAT_NAMESPACE, flask_test_client=client)
+
+
+def _joined(app, chat, user):
+    socket = _connect(app, chat[user])
+    assert socket.emit('join', {'conversation_id': chat['conversation']},
+                       namespace=CHAT_NAMESPACE, callback=True) == {'success': True}
+    return socket
+
+
+def _pushed(socket):
+    # The test client unwraps the payload of `message` events, as it does for send()
+    return [event['args'] for event in socket.get_received(CHAT_NAMESPACE) if event['name'] == 'message']
+
+
+def _stored():
+    return db.session.execute(db.select(SwapMessage.content, SwapMessage.sender_id)).all()
+
+
+class TestChatSocket:
+    """Test the authenticated /chat Socket.IO namespace and the form POST fallback."""
+
+    def test_anonymous_connection_is_refused(self, app):
+        socket = _connect(app)
+        assert not socket.is_connected(CHAT_NAMESPACE)
+
+    def test_outsider_cannot_join_or_send(self, app, chat):
+        socket = _connect(app, chat['outsider'])
+        assert socket.is_connected(CHAT_NAMESPACE)
+        ack = socket.emit('join', {'conversation_id': chat['conversation']}, namespace=CHAT_NAMESPACE, callback=True)
+        assert ack['success'] is False
+        ack = socket.emit('send_message', {'conversation_id': chat['conversation'], 'content': "Let me in"},
+                          namespace=CHAT_NAMESPACE, callback=True)
+        assert ack['success'] is False
+        assert _stored() == []
+
+    def test_send_persists_and_pushes_to_the_room(self, app, chat):
+        owner = _joined(app, chat, 'owner')
+        asker = _joined(app, chat, 'asker')
+        owner.get_received(CHAT_NAMESPACE)
+
+        ack = asker.emit('send_message', {'conversation_id': chat['conversation'], 'content': "  Hello!  ",
+                                          'sender_id': chat['owner']},
+                         namespace=CHAT_NAMESPACE, callback=True)
+        assert ack['success'] is True
+        # The sender comes from the session, never from the payload
+        assert ack['message']['sender_id'] == chat['asker']
+        assert ack['message']['content'] == "Hello!"
+        assert _stored() == [("Hello!", chat['asker'])]
+
+        assert _pushed(owner) == [ack['message']]
+        # The sender already has it from the ack
+        assert _pushed(asker) == []
+
+    def test_invalid_messages_are_rejected(self, app, chat):
+        asker = _joined(app, chat, 'asker')
+        for content in ("   ", None, "x" * (MAX_MESSAGE_LENGTH + 1)):
+            ack = asker.emit('send_message', {'conversation_id': chat['conversation'], 'content': content},
+                             namespace=CHAT_NAMESPACE, callback=True)
+            assert ack['success'] is False
+        assert _stored() == []
+
+    def test_form_post_fallback_stores_and_pushes(self, app, chat):
+        owner = _joined(app, chat, 'owner')
+        owner.get_received(CHAT_NAMESPACE)
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = chat['asker']
+        response = client.post(f"/chat/{chat['discuss_request']}", data={'message': "Posted"})
+        assert response.status_code == 302
+        assert _stored() == [("Posted", chat['asker'])]
+        assert [m['content'] for m in _pushed(owner)] == ["Posted"]
+
+        response = client.get(f"/chat/{chat['discuss_request']}")
+        assert b"Posted" in response.data
+        assert b"io('/chat')" in response.data
+
+
+@pytest.fixture
+def history(app, chat):
+    """Seven messages in `chat`, two of them sent in the same instant; returns their contents in order."""
+    start = datetime(2026, 3, 1, 12, 0)
+    at = [start + timedelta(minutes=i) for i in (0, 1, 2, 3, 3, 4, 5)]
+    with app.app_context():
+        for i, timestamp in enumerate(at):
+            db.session.add(SwapMessage(conversation_id=chat['conversation'], sender_id=chat['asker'],
+                                       recipient_id=chat['owner'], content=f"message {i}",
+                                       type=MessageType.TEXT, timestamp=timestamp))
+            db.session.commit()
+        rows = db.session.execute(
+            db.select(SwapMessage.content).order_by(SwapMessage.timestamp, SwapMessage.id)
+        ).scalars().all()
+    return rows
+
+
+class TestChatHistory:
+    """Test the keyset-paginated chat history and the first-page chat render."""
+
+    def _client(self, app, user_id):
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = user_id
+        return client
+
+    def test_chat_renders_only_the_latest_page(self, app, chat, history):
+        app.config['CHAT_PAGE_SIZE'] = 3
+        response = self._client(app, chat['owner']).get(f"/chat/{chat['discuss_request']}")
+        assert response.status_code == 200
+        shown = [content for content in history if content.encode() in response.data]
+        assert shown == history[-3:]
+        assert b'id="loadOlderBtn"' in response.data
+
+    def test_paging_back_covers_the_history_once(self, app, chat, history):
+        client = self._client(app, chat['owner'])
+        url = f"/api/conversations/{chat['conversation']}/messages"
+        data = client.get(url, query_string={'limit': 3}).get_json()
+        pages = [[m['content'] for m in data['items']]]
+        while data['next_cursor']:
+            data = client.get(url, query_string={'limit': 3, 'before': data['next_cursor']}).get_json()
+            pages.insert(0, [m['content'] for m in data['items']])
+        assert [len(page) for page in pages] == [1, 3, 3]
+        assert sum(pages, []) == history
+
+    def test_since_returns_only_newer_messages(self, app, chat, history):
+        client = self._client(app, chat['asker'])
+        url = f"/api/conversations/{chat['conversation']}/messages"
+        items = client.get(url, query_string={'limit': 4}).get_json()['items']
+        # A client that saw up to the first of the two simultaneous messages
+        seen = next(m for m in items if m['content'] == history[3])
+        data = client.get(url, query_string={'since': seen['cursor'], 'limit': 2}).get_json()
+        assert [m['content'] for m in data['items']] == history[4:6]
+        data = client.get(url, query_string={'since': data['next_cursor'], 'limit': 2}).get_json()
+        assert [m['content'] for m in data['items']] == history[6:]
+        assert data['next_cursor'] is None
+
+        last = data['items'][-1]['cursor']
+        assert client.get(url, query_string={'since': last}).get_json()['items'] == []
+
+    def test_access_and_bad_cursors(self, app, chat, history):
+        url = f"/api/conversations/{chat['conversation']}/messages"
+        assert app.test_client().get(url).status_code == 401
+        assert self._client(app, chat['outsider']).get(url).status_code == 404
+        assert self._client(app, chat['owner']).get(url, query_string={'before': 'garbage'}).status_code == 400
@@ -0,0 +1,242 @@
+import os
+import threading
+import time
+
+import pytest
+from sqlalchemy import event
+
+import config
+from app import create_app
+from app.models import db, SwapConversation, SwapMessage
+from app.models.base import generate_uuid
+from app.services import chat_write_behind
+from app.services.chat_messages import CHAT_NAMESPACE
+from app.services.chat_write_behind import MessageJournal, read_journal, replay_journals, write_batch
+from app.sockets import socketio
+
+
+@pytest.fixture
+def write_behind(tmp_path, monkeypatch, make_chat):
+    """
+    An app on a SQLite file with write-behind on; returns (app, make_chat() ids).
+
+    The flusher only runs on a full batch, so tests decide when messages are written.
+    """
+    monkeypatch.setattr(config.Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'chat.db'}")
+    monkeypatch.setattr(config.Config, 'CHAT_WRITE_BEHIND', True)
+    monkeypatch.setattr(config.Config, 'CHAT_JOURNAL_DIR', str(tmp_path / 'journal'))
+    monkeypatch.setattr(config.Config, 'CHAT_FLUSH_INTERVAL_MS', 60_000)
+    app = create_app()
+    app.config.update({'TESTING': True, 'SECRET_KEY': 'test-secret-key'})
+    with app.app_context():
+        ids = make_chat()
+    yield app, ids
+    app.extensions['chat_write_behind'].close()
+
+
+def _login(client, user_id):
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+    return client
+
+
+def _socket(app, user_id, conversation_id):
+    socket = socketio.test_client(app, namespace=CHAT_NAMESPACE, flask_test_client=_login(app.test_client(), user_id))
+    socket.emit('join', {'conversation_id': conversation_id}, namespace=CHAT_NAMESPACE, callback=True)
+    return socket
+
+
+def _pushed(socket):
+    # The test client unwraps the payload of `message` events
+    return [event['args'] for event in socket.get_received(CHAT_NAMESPACE) if event['name'] == 'message']
+
+
+def _stored(app):
+    with app.app_context():
+        return db.session.execute(
+            db.select(SwapMessage.content, SwapMessage.seq).order_by(SwapMessage.seq)
+        ).all()
+
+
+def _record(ids, content, at):
+    return {'id': generate_uuid(), 'conversation_id': ids['conversation'], 'sender_id': ids['asker'],
+            'recipient_id': ids['owner'], 'content': content, 'timestamp': at}
+
+
+class TestChatWriteBehind:
+    """Test journaled, batched chat message ingestion."""
+
+    def test_send_is_delivered_before_it_is_stored(self, write_behind):
+        app, ids = write_behind
+        pipeline = app.extensions['chat_write_behind']
+        owner = _socket(app, ids['owner'], ids['conversation'])
+        asker = _socket(app, ids['asker'], ids['conversation'])
+        owner.get_received(CHAT_NAMESPACE)
+
+        ack = asker.emit('send_message', {'conversation_id': ids['conversation'], 'content': "Quick one"},
+                         namespace=CHAT_NAMESPACE, callback=True)
+        assert ack['success'] is True and ack['message']['seq'] is None
+        assert [m['content'] for m in _pushed(owner)] == ["Quick one"]
+        assert _stored(app) == []
+        assert [r['content'] for r in read_journal(pipeline.journal.path)] == ["Quick one"]
+
+        pipeline.drain()
+        assert _stored(app) == [("Quick one", 1)]
+        with app.app_context():
+            conversation = db.session.get(SwapConversation, ids['conversation'])
+            assert (conversation.message_count, conversation.last_message_seq) == (1, 1)
+            assert conversation.last_message_preview == "Quick one"
+        assert os.path.getsize(pipeline.journal.path) == 0
+
+    def test_a_batch_is_one_insert(self, write_behind):
+        app, ids = write_behind
+        pipeline = app.extensions['chat_write_behind']
+        with app.app_context():
+            conversation = db.session.get(SwapConversation, ids['conversation'])
+            second = SwapConversation(swap_id=conversation.swap_id, sender_id=ids['outsider'],
+                                      recipient_id=ids['owner'])
+            db.session.add(second)
+            db.session.commit()
+            for n in range(3):
+                pipeline.submit(conversation, ids['asker'], f"first chat {n}")
+            for n in range(2):
+                pipeline.submit(second, ids['outsider'], f"second chat {n}")
+            second_id = second.id
+            engine = db.engine
+
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            assert pipeline.flush() == 5
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+        assert len([s for s in statements if s.lstrip().startswith('INSERT INTO swap_messages')]) == 1
+        assert len([s for s in statements if s.lstrip().startswith('UPDATE swap_conversations')]) == 2
+
+        with app.app_context():
+            seqs = db.session.execute(
+                db.select(SwapMessage.conversation_id, SwapMessage.seq).order_by(SwapMessage.content)
+            ).all()
+        assert seqs == [(ids['conversation'], 1), (ids['conversation'], 2), (ids['conversation'], 3),
+                        (second_id, 1), (second_id, 2)]
+        assert pipeline.stats()['batches'] == 1
+
+    def test_backpressure(self, write_behind):
+        app, ids = write_behind
+        pipeline = app.extensions['chat_write_behind']
+        pipeline.max_pending = 2
+        asker = _socket(app, ids['asker'], ids['conversation'])
+        for n in range(2):
+            ack = asker.emit('send_message', {'conversation_id': ids['conversation'], 'content': f"m{n}"},
+                             namespace=CHAT_NAMESPACE, callback=True)
+            assert ack['success'] is True
+
+        ack = asker.emit('send_message', {'conversation_id': ids['conversation'], 'content': "one too many"},
+                         namespace=CHAT_NAMESPACE, callback=True)
+        assert ack['success'] is False and 'try again' in ack['error']
+        client = _login(app.test_client(), ids['asker'])
+        assert client.post(f"/chat/{ids['discuss_request']}", data={'message': "via form"}).status_code == 503
+        assert pipeline.stats()['rejected'] == 2
+
+        pipeline.drain()
+        assert client.post(f"/chat/{ids['discuss_request']}", data={'message': "via form"}).status_code == 302
+        pipeline.drain()
+        assert [content for content, _ in _stored(app)] == ["m0", "m1", "via form"]
+
+    def test_journal_fsync_does_not_block_other_sends(self, write_behind, monkeypatch):
+        app, ids = write_behind
+        pipeline = app.extensions['chat_write_behind']
+        syncing, release, syncs = threading.Event(), threading.Event(), []
+
+        def slow_fsync(fd):
+            syncs.append(fd)
+            syncing.set()
+            release.wait(5)
+
+        monkeypatch.setattr(chat_write_behind.os, 'fsync', slow_fsync)
+
+        def send(content):
+            with app.app_context():
+                pipeline.submit(db.session.get(SwapConversation, ids['conversation']), ids['asker'], content)
+
+        first = threading.Thread(target=send, args=("first",))
+        first.start()
+        assert syncing.wait(5)
+        # The first send is still in its fsync; the second is queued and journaled meanwhile
+        second = threading.Thread(target=send, args=("second",))
+        second.start()
+        deadline = time.monotonic() + 5
+        while pipeline.pending() < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert pipeline.pending() == 2 and second.is_alive()
+        release.set()
+        first.join(5)
+        second.join(5)
+        assert not first.is_alive() and not second.is_alive()
+        assert len(syncs) <= 2
+        assert [r['content'] for r in read_journal(pipeline.journal.path)] == ["first", "second"]
+
+    def test_background_flusher_writes_within_the_interval(self, write_behind):
+        app, ids = write_behind
+        pipeline = app.extensions['chat_write_behind']
+        pipeline.flush_interval = 0.005
+        with app.app_context():
+            pipeline.submit(db.session.get(SwapConversation, ids['conversation']), ids['asker'], "hello")
+        deadline = time.monotonic() + 5
+        while not _stored(app) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert _stored(app) == [("hello", 1)]
+
+    def test_orphaned_journals_are_replayed_on_startup(self, write_behind, tmp_path):
+        app, ids = write_behind
+        journal_dir = str(tmp_path / 'journal')
+        already = _record(ids, "already stored", '2026-10-18T10:00:00')
+        with app.app_context():
+            write_batch(db.session, [dict(already)])
+
+        # A worker that died after journaling four messages, one of them stored but not marked
+        lost_1, marked, lost_2 = (_record(ids, content, f'2026-10-18T10:0{n}:00')
+                                  for n, content in enumerate(("lost 1", "marked", "lost 2"), 1))
+        crashed = MessageJournal.create(journal_dir)
+        crashed.append([already, lost_1, marked, lost_2])
+        crashed.committed([marked['id']])
+        crashed._file.write(b'{"message": {"id": "torn')
+        crashed.close()
+        # A live worker's journal is left alone
+        live = MessageJournal.create(journal_dir)
+        live.append([_record(ids, "in flight", '2026-10-18T10:04:00')])
+
+        assert read_journal(crashed.path) == [already, lost_1, lost_2]
+        booted = create_app()
+        assert _stored(booted) == [("already stored", 1), ("lost 1", 2), ("lost 2", 3)]
+        assert not os.path.exists(crashed.path)
+        assert os.path.exists(live.path)
+        with booted.app_context():
+            assert replay_journals(booted, journal_dir) == 0
+        live.close(remove=True)
+
+    def test_journal_replayed_by_another_worker_is_skipped(self, write_behind, tmp_path, monkeypatch):
+        app, ids = write_behind
+        journal_dir = str(tmp_path / 'journal')
+        gone, kept = MessageJournal.create(journal_dir), MessageJournal.create(journal_dir)
+        gone.append([_record(ids, "replayed elsewhere", '2026-10-18T10:00:00')])
+        kept.append([_record(ids, "still here", '2026-10-18T10:01:00')])
+        gone.close()
+        kept.close()
+        real_glob = chat_write_behind.glob.glob
+
+        def glob_then_lose_one(pattern):
+            # Another booting worker replays and removes a journal right after this one listed it
+            paths = real_glob(pattern)
+            os.remove(gone.path)
+            return paths
+
+        monkeypatch.setattr(chat_write_behind.glob, 'glob', glob_then_lose_one)
+        with app.app_context():
+            assert replay_journals(app, journal_dir) == 1
+        assert _stored(app) == [("still here", 1)]
+        assert not os.path.exists(kept.path)
@@ -0,0 +1,154 @@
+import time
+import pytest
+from app.models import db, User, Category, SkillName, Skill, Swap, SwapConversation, SwapMessage
+from app.services.dashboard_cache import dashboard_cache, LRUBackend, SharedBackend, LocalStore
+from werkzeug.security import generate_password_hash
+
+
+@pytest.fixture
+def people(app):
+    """Two users, each offering one skill."""
+    with app.app_context():
+        category = db.session.execute(db.select(Category)).scalars().first()
+        ids = {}
+        for name in ("Ada", "Bob"):
+            user = User(name=name, email=f"{name.lower()}@example.com", password=generate_password_hash("password123"))
+            skill_name = SkillName(name=f"Cache {name}")
+            db.session.add_all([user, skill_name])
+            db.session.flush()
+            skill = Skill(user_id=user.id, skill_name_id=skill_name.id, category_id=category.id,
+                          description=f"{name}'s skill")
+            db.session.add(skill)
+            db.session.flush()
+            ids[name] = {'user': user.id, 'skill': skill.id, 'skill_name': skill_name.id}
+        db.session.commit()
+        dashboard_cache.clear()
+        dashboard_cache.reset_stats()
+        return ids
+
+
+def _login(client, user_id):
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+
+
+class TestBackends:
+    """Test the cache backends in isolation."""
+
+    def test_lru_evicts_least_recently_used(self):
+        backend = LRUBackend(maxsize=2, ttl=60)
+        backend.set('a', 1)
+        backend.set('b', 2)
+        backend.get('a')
+        backend.set('c', 3)
+        assert backend.get('b') is None
+        assert backend.get('a') == 1 and backend.get('c') == 3
+
+    def test_lru_expires_entries(self):
+        backend = LRUBackend(maxsize=2, ttl=0.01)
+        backend.set('a', 1)
+        time.sleep(0.02)
+        assert backend.get('a') is None
+
+    def test_shared_backend_round_trip(self):
+        backend = SharedBackend(LocalStore(), ttl=60)
+        backend.set('u1', {'swaps': [{'id': 's1'}]})
+        assert backend.get('u1') == {'swaps': [{'id': 's1'}]}
+        backend.delete('u1')
+        assert backend.get('u1') is None
+
+    def test_shared_clear_leaves_other_keys(self):
+        store = LocalStore()
+        store.set('flask-socketio:sid', b'queue state')
+        backend = SharedBackend(store, ttl=60)
+        backend.set('u1', 1)
+        backend.set('u2', 2)
+        backend.clear()
+        assert backend.get('u1') is None and backend.get('u2') is None
+        assert store.get('flask-socketio:sid') == b'queue state'
+
+
+class TestDashboardCache:
+    """Test caching and invalidation of the dashboard view model."""
+
+    def test_repeat_loads_hit_the_cache(self, client, people):
+        _login(client, people['Ada']['user'])
+        client.get('/dashboard')
+        client.get('/dashboard')
+        assert dashboard_cache.hits == 1
+        assert dashboard_cache.misses == 1
+
+    def test_commit_invalidates_involved_users(self, client, app, people):
+        ada, bob = people['Ada'], people['Bob']
+        _login(client, ada['user'])
+        client.get('/dashboard')
+
+        with app.app_context():
+            # Bob posts a swap wanting Ada's skill: it belongs in Ada's stream
+            swap = Swap(user_id=bob['user'], offered_skill_id=bob['skill'],
+                        desired_skill_name_id=ada['skill_name'], description="Cache swap")
+            db.session.add(swap)
+            db.session.commit()
+
+        response = client.get('/dashboard')
+        assert b'Cache swap' in response.data
+        assert dashboard_cache.misses == 2
+
+    def test_chat_message_invalidates_both_participants(self, client, app, people):
+        ada, bob = people['Ada'], people['Bob']
+        with app.app_context():
+            swap = Swap(user_id=bob['user'], offered_skill_id=bob['skill'],
+                        desired_skill_name_id=ada['skill_name'], description="Chat swap")
+            db.session.add(swap)
+            db.session.flush()
+            conversation = SwapConversation(swap_id=swap.id, sender_id=ada['user'], recipient_id=bob['user'])
+            db.session.add(conversation)
+            db.session.commit()
+            conversation_id = conversation.id
+        _login(client, ada['user'])
+        client.get('/dashboard')
+        dashboard_cache.reset_stats()
+
+        with app.app_context():
+            db.session.add(SwapMessage(conversation_id=conversation_id, sender_id=bob['user'],
+                                       recipient_id=ada['user'], content="Cache hello"))
+            db.session.commit()
+
+        assert dashboard_cache.invalidations == 2
+        client.get('/dashboard')
+        assert dashboard_cache.misses == 1
+
+    def test_rollback_keeps_entries(self, client, app, people):
+        ada, bob = people['Ada'], people['Bob']
+        _login(client, ada['user'])
+        client.get('/dashboard')
+
+        with app.app_context():
+            swap = Swap(user_id=bob['user'], offered_skill_id=bob['skill'],
+                        desired_skill_name_id=ada['skill_name'], description="Never committed")
+            db.session.add(swap)
+            db.session.flush()
+            db.session.rollback()
+
+        client.get('/dashboard')
+        assert dashboard_cache.hits == 1
+        assert dashboard_cache.invalidations == 0
+
+    def test_unrelated_users_stay_cached(self, client, app, people):
+        ada, bob = people['Ada'], people['Bob']
+        _login(client, ada['user'])
+        client.get('/dashboard')
+
+        with app.app_context():
+            db.session.get(Skill, bob['skill']).description = "Bob's updated skill"
+            db.session.commit()
+
+        client.get('/dashboard')
+        assert dashboard_cache.hits == 1
+
+    def test_stats_endpoint(self, client, people):
+        _login(client, people['Ada']['user'])
+        client.get('/dashboard')
+        body = client.get('/api/stats/dashboard-cache').get_json()
+        assert body['backend'] == 'LRUBackend'
+        assert body['misses'] == 1
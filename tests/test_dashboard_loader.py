@@ -0,0 +1,85 @@
+import pytest
+from app.models import db, Category, SkillName, Skill, SwapConversation, SwapMessage
+from app.services.dashboard_loader import load_dashboard
+
+
+@pytest.fixture
+def marketplace(app, make_user):
+    with app.app_context():
+        me = make_user("Me")
+        category = db.session.execute(db.select(Category)).scalars().first()
+        wanted = SkillName(name="Loader Wanted")
+        db.session.add(wanted)
+        db.session.flush()
+        my_skill = Skill(user_id=me.id, skill_name_id=wanted.id, category_id=category.id,
+                         description="My skill description")
+        db.session.add(my_skill)
+        db.session.commit()
+        return me.id, my_skill.id, category.id
+
+
+class TestDashboardLoader:
+    """Test the single-pass dashboard view-model loader."""
+
+    def test_view_model_contents(self, app, marketplace, populate):
+        """Test that the loader returns the cards the template renders."""
+        with app.app_context():
+            populate(marketplace, 2, start=0)
+            data = load_dashboard(marketplace[0])
+
+            assert {s['description'] for s in data['swaps']} == {"Swap 0", "Swap 1"}
+            assert data['swaps'][0]['desired_skill_name'] == "Loader Wanted"
+            assert len(data['received_swap_requests']) == 2
+            assert all(data['discuss_request_exists'].values())
+            assert not any(data['swap_request_exists'].values())
+            assert len(data['active_conversations']) == 2
+            assert data['active_conversations'][0]['my_skill_name'] == "Loader Wanted"
+            assert data['skills'][0]['name'] == "Loader Wanted"
+
+    def test_query_count_is_constant(self, app, marketplace, query_counter, populate):
+        """Test that the number of queries does not grow with the data."""
+        with app.app_context():
+            populate(marketplace, 2, start=0)
+            load_dashboard(marketplace[0])  # warm the reference data cache
+            db.session.expunge_all()
+            with query_counter() as small:
+                load_dashboard(marketplace[0])
+
+            populate(marketplace, 20, start=2)
+            load_dashboard(marketplace[0])
+            db.session.expunge_all()
+            with query_counter() as large:
+                data = load_dashboard(marketplace[0])
+
+            assert len(data['swaps']) == 22
+            assert len(small) == len(large) == 6
+
+    def test_conversations_sorted_by_last_message(self, app, marketplace, populate):
+        """Test that active conversations come newest-activity first with their preview."""
+        with app.app_context():
+            populate(marketplace, 3, start=0)
+            conversations = db.session.execute(db.select(SwapConversation)).scalars().all()
+            quiet, busy = conversations[0], conversations[1]
+            for conversation, content in ((busy, "first"), (quiet, "older"), (busy, "latest")):
+                db.session.add(SwapMessage(conversation_id=conversation.id, sender_id=conversation.sender_id,
+                                           recipient_id=conversation.recipient_id, content=content))
+                db.session.commit()
+
+            data = load_dashboard(marketplace[0])
+            ordered = [c['id'] for c in data['active_conversations']]
+            assert ordered[:2] == [busy.id, quiet.id]
+            assert data['active_conversations'][0]['last_message_preview'] == "latest"
+            assert data['active_conversations'][0]['message_count'] == 2
+            assert data['active_conversations'][2]['last_message_at'] is None
+
+    def test_dashboard_route_renders(self, client, app, marketplace, populate):
+        """Test that the dashboard renders from the view model."""
+        with app.app_context():
+            populate(marketplace, 1, start=0)
+        with client.session_transaction() as sess:
+            sess['user_id'] = marketplace[0]
+
+        response = client.get('/dashboard')
+        assert response.status_code == 200
+        assert b'Loader Offered 0' in response.data
+        assert b'Conversation with Other0' in response.data
@@ -0,0 +1,105 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+
+import config
+from app import create_app
+from app.models import db, User
+from app.services.db_pool import engine_options, InstrumentedQueuePool, InstrumentedNullPool
+from werkzeug.security import generate_password_hash
+
+SETTINGS = {'DB_POOL_SIZE': 3, 'DB_MAX_OVERFLOW': 2, 'DB_POOL_TIMEOUT': 7,
+            'DB_POOL_RECYCLE': 600, 'DB_POOL_PRE_PING': True}
+
+
+@pytest.fixture
+def pooled_app(tmp_path, monkeypatch):
+    """An app on a SQLite file with a one-connection pool that gives up quickly."""
+    monkeypatch.setattr(config.Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'pool.db'}")
+    monkeypatch.setattr(config.Config, 'DB_POOL_SIZE', 1)
+    monkeypatch.setattr(config.Config, 'DB_MAX_OVERFLOW', 0)
+    monkeypatch.setattr(config.Config, 'DB_POOL_TIMEOUT', 1)
+    monkeypatch.setattr(config.Config, 'DB_POOL_SLOW_WAIT_MS', 10)
+    app = create_app()
+    app.config.update({'TESTING': True, 'SECRET_KEY': 'test-secret-key'})
+    return app
+
+
+class TestEngineOptions:
+    """Test the DB_POOL_* settings to create_engine() arguments mapping."""
+
+    def test_server_database_gets_a_tuned_queue_pool(self):
+        options = engine_options('postgresql+psycopg://skillswap@db/skillswap', SETTINGS)
+        assert options == {'poolclass': InstrumentedQueuePool, 'pool_size': 3, 'max_overflow': 2,
+                           'pool_timeout': 7, 'pool_recycle': 600, 'pool_pre_ping': True}
+
+    def test_pgbouncer_mode_disables_pooling_and_prepared_statements(self):
+        settings = SETTINGS | {'DB_PGBOUNCER': True}
+        options = engine_options('postgresql+psycopg://skillswap@pgbouncer:6432/skillswap', settings)
+        assert options == {'poolclass': InstrumentedNullPool, 'connect_args': {'prepare_threshold': None}}
+        # psycopg2 never prepares statements on its own
+        assert engine_options('postgresql://skillswap@pgbouncer/skillswap', settings) == {
+            'poolclass': InstrumentedNullPool}
+
+    def test_sqlite(self):
+        assert engine_options('sqlite:///:memory:', SETTINGS) == {}
+        assert engine_options('sqlite:///app.db', SETTINGS) == {
+            'poolclass': InstrumentedQueuePool, 'pool_size': 3, 'max_overflow': 2, 'pool_timeout': 7}
+
+
+class TestPoolMetrics:
+    """Test the pool instrumentation and its stats endpoint."""
+
+    def test_checkouts_are_counted(self, pooled_app):
+        with pooled_app.app_context():
+            assert isinstance(db.engine.pool, InstrumentedQueuePool)
+            metrics = pooled_app.extensions['pool_metrics']['primary']
+            before = metrics.stats()['checkouts']
+            with db.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+                assert metrics.stats()['checked_out'] == 1
+            stats = metrics.stats()
+            assert stats['checkouts'] == before + 1
+            assert stats['checked_out'] == 0
+            assert stats['size'] == 1
+
+    def test_exhausted_pool_times_out_and_is_logged(self, pooled_app, caplog):
+        with pooled_app.app_context():
+            metrics = pooled_app.extensions['pool_metrics']['primary']
+            with db.engine.connect():
+                with pytest.raises(PoolTimeout):
+                    db.engine.connect()
+            stats = metrics.stats()
+            assert stats['timeouts'] == 1
+            assert stats['wait_ms_max'] >= 1000
+            assert stats['peak_checked_out'] == 1
+            assert 'Gave up on a primary database connection' in caplog.text
+
+    def test_metrics_survive_dispose(self, pooled_app):
+        with pooled_app.app_context():
+            metrics = pooled_app.extensions['pool_metrics']['primary']
+            db.engine.dispose()
+            waits = metrics.waits
+            with db.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+            assert db.engine.pool.metrics is metrics
+            assert metrics.waits == waits + 1
+
+    def test_stats_endpoint(self, pooled_app):
+        with pooled_app.app_context():
+            user = User(name="Pool", email="pool@example.com", password=generate_password_hash("password123"))
+            db.session.add(user)
+            db.session.commit()
+            user_id = user.id
+        client = pooled_app.test_client()
+        assert client.get('/api/stats/db-pool').status_code == 401
+
+        with client.session_transaction() as sess:
+            sess['user_id'] = user_id
+        data = client.get('/api/stats/db-pool').get_json()
+        assert data['success']
+        primary = data['pools']['primary']
+        assert primary['pool'] == 'InstrumentedQueuePool'
+        assert primary['checkouts'] > 0
+        # The request's own session holds the one connection
+        assert primary['checked_out'] == 1
@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from import_audit import measure, total_us
+
+# Cold `import run` (which also builds the app) must stay under this many ms
+BUDGET_MS = float(os.getenv('IMPORT_TIME_BUDGET_MS', 1500))
+
+# Only needed by `flask db`, pending migrations or the dashboard's first request
+DEFERRED = ('alembic', 'flask_migrate', 'mako', 'pygments', 'numpy', 'bson')
+
+
+@pytest.fixture(scope='module')
+def boot_records(tmp_path_factory):
+    """-X importtime records for a worker booting against an already migrated and seeded database."""
+    env = {'DATABASE_URI': f"sqlite:///{tmp_path_factory.mktemp('boot') / 'boot.db'}"}
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, '-c', 'import run'], cwd=root, env=dict(os.environ, **env),
+                   check=True, capture_output=True)
+    return measure('run', runs=3, env=env)
+
+
+class TestImportTime:
+    """Test worker boot stays within its import-time budget."""
+
+    def test_cold_import_within_budget(self, boot_records):
+        elapsed_ms = total_us(boot_records, 'run') / 1000
+        assert elapsed_ms < BUDGET_MS, f"import run took {elapsed_ms:.0f}ms (budget {BUDGET_MS:.0f}ms)"
+
+    def test_heavy_imports_are_deferred(self, boot_records):
+        loaded = {record.name.split('.')[0] for record in boot_records}
+        assert not loaded.intersection(DEFERRED)
@@ -0,0 +1,66 @@
+import numpy as np
+from app.services.match_scoring import CandidateArrays, category_affinity, score, top_k
+
+DAY = 24 * 3600
+
+
+def _candidates(rows):
+    """rows: (swap_id, reciprocal, category_code, pending_requests, age_seconds)"""
+    ids, reciprocal, category, pending, age = zip(*rows)
+    return CandidateArrays(list(ids), reciprocal, category, pending, age)
+
+
+class TestMatchScoring:
+    """Test the vectorized swap-stream scoring stage."""
+
+    def test_reciprocal_always_ranks_first(self):
+        codes = {'music': 0, 'code': 1}
+        affinity = category_affinity(['code', 'code'], codes)
+        candidates = _candidates([
+            ('perfect-one-way', 0, 1, 0, 0),
+            ('stale-two-way', 1, 0, 50, 365 * DAY),
+        ])
+        best = top_k(candidates, affinity, k=2)
+        assert [candidates.swap_ids[i] for i in best] == ['stale-two-way', 'perfect-one-way']
+
+    def test_affinity_recency_and_crowding(self):
+        codes = {'music': 0, 'code': 1}
+        affinity = category_affinity(['code'], codes)
+        candidates = _candidates([
+            ('music-new', 0, 0, 0, 0),
+            ('code-new', 0, 1, 0, 0),
+            ('code-old', 0, 1, 0, 60 * DAY),
+            ('code-crowded', 0, 1, 9, 0),
+        ])
+        ranked = [candidates.swap_ids[i] for i in top_k(candidates, affinity, k=4)]
+        assert ranked == ['code-new', 'code-crowded', 'code-old', 'music-new']
+
+    def test_unknown_category_scores_no_affinity(self):
+        affinity = category_affinity(['a'], {'a': 0})
+        candidates = _candidates([('known', 0, 0, 0, 0), ('unknown', 0, -1, 0, 0)])
+        scores = score(candidates, affinity)
+        assert scores[0] - scores[1] == np.float32(1.5)
+
+    def test_top_k_truncates(self):
+        rng = np.random.default_rng(0)
+        n = 1000
+        candidates = CandidateArrays([str(i) for i in range(n)], rng.integers(0, 2, n),
+                                     rng.integers(0, 10, n), rng.integers(0, 5, n), rng.uniform(0, 90 * DAY, n))
+        affinity = category_affinity([str(i) for i in range(10)], {str(i): i for i in range(10)})
+        best = top_k(candidates, affinity, k=25)
+        scores = score(candidates, affinity)
+        assert len(best) == 25
+        assert np.all(np.diff(scores[best]) <= 0)
+        assert scores[best[-1]] >= np.sort(scores)[-25]
+
+    def test_top_k_matches_a_full_sort(self):
+        rng = np.random.default_rng(7)
+        n = 50_000
+        candidates = CandidateArrays([f"s{i}" for i in range(n)], rng.integers(0, 2, n), rng.integers(0, 14, n),
+                                     rng.integers(0, 20, n), rng.uniform(0, 90 * DAY, n))
+        affinity = category_affinity([f"c{i % 5}" for i in range(30)], {f"c{i}": i for i in range(14)})
+        scores = score(candidates, affinity)
+        # argpartition picks the same 60, in the same order, as sorting all 50k
+        full_sort = np.lexsort((candidates.age, -scores))
+        for k in (1, 60, n):
+            assert np.array_equal(top_k(candidates, affinity, k=k), full_sort[:k])
@@ -0,0 +1,145 @@
+import threading
+
+import pytest
+from app.models import db, User, Category, SkillName, Skill, Swap, SwapStatus
+from app.services.matching import MatchingIndex, SwapEntry, matching_index
+from werkzeug.security import generate_password_hash
+
+
+@pytest.fixture
+def market(app):
+    """Ada offers Python and wants Guitar; Bob and Cy both want Python."""
+    with app.app_context():
+        category = db.session.execute(db.select(Category)).scalars().first()
+        names = {}
+        for label in ("Python", "Guitar", "Cooking"):
+            sn = SkillName(name=f"Match {label}")
+            db.session.add(sn)
+            names[label] = sn
+        users, skills = {}, {}
+        for name, offers in (("Ada", ["Python"]), ("Bob", ["Guitar"]), ("Cy", ["Cooking"])):
+            user = User(name=name, email=f"{name.lower()}@example.com", password=generate_password_hash("password123"))
+            db.session.add(user)
+            db.session.flush()
+            users[name] = user.id
+            for label in offers:
+                skill = Skill(user_id=user.id, skill_name_id=names[label].id, category_id=category.id,
+                              description=f"{name} teaches {label}")
+                db.session.add(skill)
+                db.session.flush()
+                skills[name] = skill.id
+
+        def swap(owner, wants, description):
+            row = Swap(user_id=users[owner], offered_skill_id=skills[owner],
+                       desired_skill_name_id=names[wants].id, description=description)
+            db.session.add(row)
+            return row
+
+        swap("Ada", "Guitar", "Ada wants guitar")
+        bob_swap = swap("Bob", "Python", "Bob wants python")
+        cy_swap = swap("Cy", "Python", "Cy wants python")
+        db.session.commit()
+        return {'users': users, 'skills': skills, 'names': {k: v.id for k, v in names.items()},
+                'bob_swap': bob_swap.id, 'cy_swap': cy_swap.id}
+
+
+class TestMatchingIndex:
+    """Test the inverted swap matching index."""
+
+    def test_reciprocal_matches_rank_first(self, app, market):
+        with app.app_context():
+            matches = matching_index().matches_for(market['users']['Ada'])
+            assert [m.swap_id for m in matches] == [market['bob_swap'], market['cy_swap']]
+            assert matches[0].reciprocal and not matches[1].reciprocal
+
+    def test_no_self_matches(self, app, market):
+        with app.app_context():
+            bob_matches = matching_index().matches_for(market['users']['Bob'])
+            assert len(bob_matches) == 1
+            assert bob_matches[0].user_id == market['users']['Ada'] and bob_matches[0].reciprocal
+            assert matching_index().matches_for(market['users']['Cy']) == []
+
+    def test_incremental_updates(self, app, market, query_counter):
+        with app.app_context():
+            index = matching_index()
+            index.matches_for(market['users']['Ada'])
+
+            # Closing Bob's swap and adding a new one are applied without a rebuild
+            db.session.get(Swap, market['bob_swap']).status = SwapStatus.completed
+            new = Swap(user_id=market['users']['Cy'], offered_skill_id=market['skills']['Cy'],
+                       desired_skill_name_id=market['names']['Python'], description="Cy again")
+            db.session.add(new)
+            db.session.commit()
+
+            with query_counter() as statements:
+                matches = index.matches_for(market['users']['Ada'])
+            assert statements == []
+            assert {m.swap_id for m in matches} == {market['cy_swap'], new.id}
+
+    def test_skill_removal_drops_matches(self, app, market):
+        with app.app_context():
+            index = matching_index()
+            index.matches_for(market['users']['Ada'])
+            db.session.delete(db.session.get(Skill, market['skills']['Ada']))
+            db.session.commit()
+            assert index.matches_for(market['users']['Ada']) == []
+            assert market['users']['Ada'] not in index.offerers_of(market['names']['Python'])
+
+    def test_one_rebuild_while_the_old_index_is_served(self, app, market, monkeypatch):
+        with app.app_context():
+            index = matching_index()
+            index.ensure_fresh()
+            rows = index._load()
+        loading, release, loads = threading.Event(), threading.Event(), []
+
+        def slow_load():
+            loads.append(1)
+            loading.set()
+            release.wait(5)
+            return rows
+
+        monkeypatch.setattr(index, '_load', slow_load)
+        index.invalidate()
+        rebuilder = threading.Thread(target=index.ensure_fresh)
+        rebuilder.start()
+        assert loading.wait(5)
+        # Other requests get the current index instead of queueing behind the rebuild
+        assert len(index.matches_for(market['users']['Ada'])) == 2
+        release.set()
+        rebuilder.join(5)
+        assert loads == [1]
+
+    def test_changes_during_a_rebuild_are_kept(self, app, market, monkeypatch):
+        with app.app_context():
+            index = matching_index()
+            index.ensure_fresh()
+            rows = index._load()
+        entry = SwapEntry(market['users']['Cy'], market['skills']['Cy'], market['names']['Python'], None)
+
+        def load_then_commit():
+            # A commit applied after the rows were read, and a bulk write invalidating them
+            index.apply([('swap', 'late-swap', entry), ('swap', market['bob_swap'], None)])
+            index.invalidate()
+            return rows
+
+        monkeypatch.setattr(index, '_load', load_then_commit)
+        index.rebuild()
+        assert index.swap('late-swap') == entry
+        assert index.swap(market['bob_swap']) is None
+        # Still due for a rebuild, since the load may predate the invalidation
+        assert index._built_at is None
+
+    def test_first_build_is_waited_for(self):
+        index = MatchingIndex()
+        index._load = lambda: ([], [])
+        assert index.matches_for('nobody') == []
+        assert index._loaded and index._built_at is not None
+
+    def test_dashboard_shows_two_way_badge(self, client, market):
+        with client.session_transaction() as sess:
+            sess['user_id'] = market['users']['Ada']
+        response = client.get('/dashboard')
+        assert response.status_code == 200
+        body = response.data
+        assert body.count(b'Two-way match') == 1
+        assert body.index(b'Bob wants python') < body.index(b'Cy wants python')
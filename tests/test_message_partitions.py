@@ -0,0 +1,106 @@
+from datetime import date, datetime, timedelta, timezone
+
+from flask_migrate import downgrade, upgrade
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from app.models import db, SwapConversation, SwapMessage
+from app.services.chat_history import history_select
+from app.services.message_partitions import (
+    add_months, ensure_partitions, partition_ddl, partition_index_ddl, partition_name, DEFAULT_PARTITION,
+)
+
+
+class _Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self.rows
+
+
+class _PostgresConnection:
+    """Records statements; reports `existing` as the partitions already in the catalog."""
+
+    class dialect:
+        name = 'postgresql'
+
+    def __init__(self, existing=()):
+        self.existing = list(existing)
+        self.statements = []
+
+    def execute(self, statement, parameters=None):
+        self.statements.append(str(statement))
+        return _Result(self.existing)
+
+
+class TestMessagePartitions:
+    """Test the monthly partition DDL and the partition-pruning history reads."""
+
+    def test_month_arithmetic_and_names(self):
+        assert add_months(date(2026, 11, 1), 1) == date(2026, 12, 1)
+        assert add_months(date(2026, 12, 1), 1) == date(2027, 1, 1)
+        assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+        assert partition_name(date(2026, 3, 1)) == 'swap_messages_y2026m03'
+        assert partition_ddl(date(2026, 12, 1)) == (
+            "CREATE TABLE IF NOT EXISTS swap_messages_y2026m12 PARTITION OF swap_messages "
+            "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')"
+        )
+
+    def test_model_is_partitioned_on_postgresql(self):
+        ddl = str(CreateTable(SwapMessage.__table__).compile(dialect=postgresql.dialect()))
+        assert 'PRIMARY KEY (id, timestamp)' in ddl
+        assert 'PARTITION BY RANGE (timestamp)' in ddl
+        # The ORM still identifies a message by its id alone
+        assert [c.name for c in db.inspect(SwapMessage).primary_key] == ['id']
+
+    def test_ensure_partitions_creates_only_missing_months(self):
+        connection = _PostgresConnection(existing=[DEFAULT_PARTITION, 'swap_messages_y2026m10'])
+        created = ensure_partitions(connection, months_ahead=2, today=date(2026, 10, 18))
+        assert created == ['swap_messages_y2026m11', 'swap_messages_y2026m12']
+        assert connection.statements[1:] == [
+            partition_ddl(date(2026, 11, 1)), partition_ddl(date(2026, 12, 1)),
+            partition_index_ddl('swap_messages_y2026m11'), partition_index_ddl('swap_messages_y2026m12'),
+        ]
+
+        connection = _PostgresConnection()
+        created = ensure_partitions(connection, months_ahead=0, today=date(2026, 10, 18))
+        assert created == [DEFAULT_PARTITION, 'swap_messages_y2026m10']
+
+    def test_sqlite_keeps_one_table(self, app):
+        with app.app_context():
+            with db.engine.begin() as connection:
+                assert ensure_partitions(connection) == []
+            assert not [name for name in db.inspect(db.engine).get_table_names()
+                        if name.startswith('swap_messages_')]
+
+    def test_history_is_bounded_by_the_message_window(self, app, conversation, make_message):
+        start = datetime(2026, 1, 31, 23, 0, tzinfo=timezone.utc)
+        with app.app_context():
+            # Out of order, across a month boundary, in two flushes
+            db.session.add_all([make_message(conversation, "second", start + timedelta(hours=2)),
+                                make_message(conversation, "first", start)])
+            db.session.commit()
+            db.session.add(make_message(conversation, "third", start + timedelta(days=40)))
+            db.session.commit()
+
+            chat = db.session.get(SwapConversation, conversation['conversation'])
+            db.session.refresh(chat)
+            assert chat.first_message_at == start.replace(tzinfo=None)
+            assert chat.last_message_at == (start + timedelta(days=40)).replace(tzinfo=None)
+
+            stmt = history_select(chat)
+            assert 'BETWEEN' in str(stmt)
+            assert [m.content for m in db.session.execute(stmt).scalars()] == ["first", "second", "third"]
+
+    def test_migration_rebuilds_the_table_and_backfills(self, app, conversation, schema_diff, make_message):
+        with app.app_context():
+            db.session.add_all([make_message(conversation, f"message {i}", datetime(2026, 5, i + 1)) for i in range(3)])
+            db.session.commit()
+            downgrade(revision='0007_archive_tables')
+            upgrade()
+            assert schema_diff() == []
+            chat = db.session.get(SwapConversation, conversation['conversation'])
+            db.session.refresh(chat)
+            assert chat.first_message_at == datetime(2026, 5, 1)
+            assert len(db.session.execute(history_select(chat)).scalars().all()) == 3
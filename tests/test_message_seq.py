@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+
+import pytest
+from flask_migrate import downgrade, upgrade
+from sqlalchemy.exc import IntegrityError
+
+from app.models import db, SwapConversation, SwapMessage
+from app.services.chat_history import history_select
+
+START = datetime(2026, 6, 1, 12, 0)
+
+
+def _seqs(ids):
+    return db.session.execute(
+        db.select(SwapMessage.content, SwapMessage.seq)
+        .where(SwapMessage.conversation_id == ids['conversation'])
+        .order_by(SwapMessage.seq)
+    ).all()
+
+
+def _last_seq(ids):
+    return db.session.execute(
+        db.select(SwapConversation.last_message_seq).where(SwapConversation.id == ids['conversation'])
+    ).scalar_one()
+
+
+class TestMessageSeq:
+    """Test the per-conversation message sequence numbers."""
+
+    def test_seqs_follow_storage_order_without_gaps(self, app, conversation, make_message):
+        with app.app_context():
+            db.session.add(make_message(conversation, "first", START))
+            db.session.commit()
+            # One flush numbers its messages oldest first
+            db.session.add_all([make_message(conversation, "third", START + timedelta(minutes=2)),
+                                make_message(conversation, "second", START + timedelta(minutes=1))])
+            db.session.commit()
+
+            # A send that rolls back gives its number back
+            db.session.add(make_message(conversation, "lost", START + timedelta(minutes=3)))
+            db.session.flush()
+            db.session.rollback()
+
+            # A worker whose clock is behind still gets the next number
+            db.session.add(make_message(conversation, "fourth", START - timedelta(hours=1)))
+            db.session.commit()
+
+            assert _seqs(conversation) == [("first", 1), ("second", 2), ("third", 3), ("fourth", 4)]
+            assert _last_seq(conversation) == 4
+            chat = db.session.get(SwapConversation, conversation['conversation'])
+            assert chat.message_count == 4
+            assert [m.content for m in db.session.execute(history_select(chat)).scalars()] == [
+                "first", "second", "third", "fourth"]
+
+    def test_new_conversation_numbers_from_one(self, app, conversation, make_message):
+        with app.app_context():
+            old = db.session.get(SwapConversation, conversation['conversation'])
+            chat = SwapConversation(swap_id=old.swap_id, sender_id=old.sender_id, recipient_id=old.recipient_id)
+            db.session.add(chat)
+            db.session.flush()
+            ids = dict(conversation, conversation=chat.id)
+            db.session.add_all([make_message(ids, "a", START), make_message(ids, "b", START + timedelta(seconds=1))])
+            db.session.commit()
+            assert _seqs(ids) == [("a", 1), ("b", 2)]
+            assert _last_seq(ids) == 2
+
+    def test_seq_is_unique_per_conversation(self, app, conversation, make_message):
+        with app.app_context():
+            db.session.add(make_message(conversation, "first", START))
+            db.session.commit()
+            duplicate = make_message(conversation, "again", START + timedelta(minutes=1))
+            duplicate.seq = 1
+            db.session.add(duplicate)
+            with pytest.raises(IntegrityError):
+                db.session.commit()
+            db.session.rollback()
+
+    def test_after_seq_api(self, app, client, conversation, make_message):
+        with app.app_context():
+            for i in range(5):
+                db.session.add(make_message(conversation, f"message {i + 1}", START + timedelta(minutes=i)))
+                db.session.commit()
+        with client.session_transaction() as sess:
+            sess['user_id'] = conversation['owner']
+        url = f"/api/conversations/{conversation['conversation']}/messages"
+
+        data = client.get(url, query_string={'after_seq': 2, 'limit': 2}).get_json()
+        assert [(m['seq'], m['content']) for m in data['items']] == [(3, "message 3"), (4, "message 4")]
+        assert data['has_more'] is True
+        data = client.get(url, query_string={'after_seq': 4, 'limit': 2}).get_json()
+        assert [m['seq'] for m in data['items']] == [5] and data['has_more'] is False
+        assert client.get(url, query_string={'after_seq': 5}).get_json()['items'] == []
+        assert client.get(url, query_string={'after_seq': 'x'}).status_code == 400
+
+    def test_migration_numbers_existing_messages(self, app, conversation, schema_diff, make_message):
+        with app.app_context():
+            db.session.add_all([make_message(conversation, f"message {i}", START + timedelta(days=i))
+                                for i in (2, 0, 1)])
+            db.session.commit()
+            downgrade(revision='0008_partition_swap_messages')
+            upgrade()
+            assert schema_diff() == []
+            db.session.expire_all()
+            assert _seqs(conversation) == [("message 0", 1), ("message 1", 2), ("message 2", 3)]
+            assert _last_seq(conversation) == 3
@@ -0,0 +1,173 @@
+import re
+import uuid
+
+import pytest
+from alembic.script import ScriptDirectory
+from flask import current_app
+from flask_migrate import upgrade
+from sqlalchemy import event, inspect, text
+import config
+from app import create_app
+from app.app import head_revision, sync_schema
+from app.models import db, Category, SkillName, Skill, SwapMessage, SwapConversation, MessageType
+from app.services.dashboard_loader import load_dashboard
+
+
+# A plain "SCAN <table>" is a full table scan; "SCAN t USING (COVERING) INDEX" is not
+FULL_SCAN_RE = re.compile(r'\bSCAN (\w+)(?! USING)(?:\s|$)')
+WHERE_RE = re.compile(r'\bWHERE\b')
+
+
+def _head():
+    config = current_app.extensions['migrate'].migrate.get_config()
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+def _version():
+    return db.session.execute(text("SELECT version_num FROM alembic_version")).scalar_one()
+
+
+def _full_scans(statement, parameters):
+    plan = db.session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [m.group(1) for row in plan for m in [FULL_SCAN_RE.search(row[-1])] if m]
+
+
+@pytest.fixture
+def busy_user(app, make_user, populate):
+    """A user with swaps, requests, discussions and a chat with a few messages."""
+    with app.app_context():
+        me = make_user("Me")
+        category = db.session.execute(db.select(Category)).scalars().first()
+        wanted = SkillName(name="Migration Wanted")
+        db.session.add(wanted)
+        db.session.flush()
+        my_skill = Skill(user_id=me.id, skill_name_id=wanted.id, category_id=category.id,
+                         description="My skill description")
+        db.session.add(my_skill)
+        db.session.commit()
+        populate((me.id, my_skill.id, category.id), 3, 0)
+
+        conversation = db.session.execute(db.select(SwapConversation)).scalars().first()
+        for i in range(3):
+            db.session.add(SwapMessage(conversation_id=conversation.id, sender_id=me.id,
+                                       recipient_id=conversation.recipient_id, content=f"Message {i}",
+                                       type=MessageType.TEXT))
+        db.session.commit()
+        return {'user': me.id, 'discuss_request': conversation.discuss_request_id}
+
+
+class TestMigrations:
+    """Test the Alembic migrations against the models."""
+
+    def test_blank_database_is_stamped_at_head(self, app, schema_diff):
+        with app.app_context():
+            assert _version() == _head()
+            assert schema_diff() == []
+
+    def test_migrations_build_the_model_schema(self, app, schema_diff):
+        with app.app_context():
+            db.drop_all()
+            db.session.execute(text("DROP TABLE alembic_version"))
+            db.session.commit()
+            upgrade()
+            assert _version() == _head()
+            assert schema_diff() == []
+
+    def test_pre_migration_database_gets_the_indexes(self, app, schema_diff):
+        with app.app_context():
+            # Rebuild the database as db.create_all() used to leave it: baseline tables, no version
+            db.drop_all()
+            db.session.execute(text("DROP TABLE alembic_version"))
+            db.session.commit()
+            upgrade(revision='0001_baseline')
+            db.session.execute(text("DROP TABLE alembic_version"))
+            db.session.commit()
+            assert 'ix_swaps_user' not in {index['name'] for index in inspect(db.engine).get_indexes('swaps')}
+
+            sync_schema()
+            assert _version() == _head()
+            assert schema_diff() == []
+
+
+    def test_text_keys_are_converted(self, app):
+        with app.app_context():
+            db.drop_all()
+            db.session.execute(text("DROP TABLE alembic_version"))
+            db.session.commit()
+            upgrade(revision='0002_hot_path_indexes')
+            ids = {name: str(uuid.uuid4()) for name in ('user', 'category', 'skill_name', 'skill')}
+            db.session.execute(text(
+                "INSERT INTO users (id, name, email, password, created_at)"
+                " VALUES (:user, 'Legacy', 'legacy@example.com', 'x', CURRENT_TIMESTAMP)"), ids)
+            db.session.execute(text("INSERT INTO categories (id, name) VALUES (:category, 'Legacy')"), ids)
+            db.session.execute(text("INSERT INTO skill_names (id, name) VALUES (:skill_name, 'Legacy')"), ids)
+            db.session.execute(text(
+                "INSERT INTO skills (id, user_id, skill_name_id, category_id, description)"
+                " VALUES (:skill, :user, :skill_name, :category, 'Legacy skill')"), ids)
+            db.session.commit()
+
+            upgrade()
+            assert db.session.execute(text("SELECT typeof(user_id) FROM skills")).scalar() == 'blob'
+            skill = db.session.get(Skill, ids['skill'])
+            assert (skill.user.id, skill.skill_name.id, skill.category.id) == (
+                ids['user'], ids['skill_name'], ids['category'])
+
+    def test_head_revision_matches_alembic(self, app):
+        with app.app_context():
+            assert head_revision() == _head()
+
+    def test_database_at_head_skips_alembic(self, app, query_counter):
+        with app.app_context():
+            with query_counter() as statements:
+                sync_schema()
+            assert [s for s in statements if 'alembic_version' in s] == ["SELECT version_num FROM alembic_version"]
+
+    def test_startup_migration_can_be_left_to_a_deploy_step(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config.Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'deploy.db'}")
+        monkeypatch.setattr(config.Config, 'MIGRATE_ON_STARTUP', False)
+        monkeypatch.setattr(config.Config, 'SEED_ON_STARTUP', False)
+        app = create_app()
+        with app.app_context():
+            assert inspect(db.engine).get_table_names() == []
+            sync_schema()  # what `flask db upgrade` would do
+            assert _version() == _head()
+
+
+class TestQueryPlans:
+    """EXPLAIN the dashboard and chat queries; none may fall back to a full table scan."""
+
+    def _capture(self, app, action):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            action()
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+        # Reference data deliberately loads whole (tiny) tables; only filtered reads matter
+        return [(s, p) for s, p in statements if s.lstrip().upper().startswith('SELECT') and WHERE_RE.search(s)]
+
+    def _assert_no_full_scans(self, app, statements):
+        assert statements
+        with app.app_context():
+            offenders = {s: scans for s, p in statements if (scans := _full_scans(s, p))}
+        assert offenders == {}
+
+    def test_dashboard_queries_use_indexes(self, app, busy_user):
+        def action():
+            with app.app_context():
+                load_dashboard(busy_user['user'])
+        self._assert_no_full_scans(app, self._capture(app, action))
+
+    def test_chat_queries_use_indexes(self, app, client, busy_user):
+        with client.session_transaction() as sess:
+            sess['user_id'] = busy_user['user']
+
+        def action():
+            assert client.get(f"/chat/{busy_user['discuss_request']}").status_code == 200
+        self._assert_no_full_scans(app, self._capture(app, action))
@@ -1,4 +1,7 @@
+import uuid
+
 import pytest
+from sqlalchemy import text
 from app.models import User, Category, SkillName, Skill, Swap, SwapRequest, db
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timezone
@@ -154,3 +157,28 @@ class TestSwap:
             user = db.session.get(User, test_user.id)
             assert len(user.swaps) == 1
             assert user.swaps[0].id == swap.id
+
+
+class TestUUIDKey:
+    """Test the shared UUIDv7 key type."""
+
+    def test_uuid7_is_time_ordered(self):
+        from app.models.base import uuid7
+        keys = [uuid7() for _ in range(5000)]
+        assert keys == sorted(keys)
+        assert len(set(keys)) == len(keys)
+        assert all(key.version == 7 and key.variant == uuid.RFC_4122 for key in keys)
+
+    def test_keys_are_stored_as_16_bytes(self, app):
+        with app.app_context():
+            user = User(name="Key", email="key@example.com", password=generate_password_hash("password123"))
+            db.session.add(user)
+            db.session.commit()
+            stored = db.session.execute(text("SELECT id, typeof(id), length(id) FROM users")).one()
+            assert stored[1:] == ('blob', 16)
+            assert str(uuid.UUID(bytes=stored[0])) == user.id
+            assert db.session.get(User, user.id) is user
+
+    def test_malformed_ids_match_nothing(self, app):
+        with app.app_context():
+            assert db.session.get(User, "not-a-uuid") is None
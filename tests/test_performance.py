@@ -34,3 +34,222 @@ class TestPerformance:
             
             assert query_time < 0.1  # Should complete within 100ms
             assert len(skills) >= 0
+
+    @pytest.mark.slow
+    def test_trade_ring_benchmark(self):
+        """Benchmark ring detection on a synthetic graph of 100k open swaps."""
+        import random
+        from datetime import datetime, timedelta
+        from app.services.trade_cycles import SwapEdge, find_trade_rings
+
+        rng = random.Random(42)
+        base = datetime(2025, 1, 1)
+        # 200 communities of 20 skill names each, so the graph splits into components
+        swaps = []
+        for i in range(100_000):
+            community = rng.randrange(200) * 20
+            wants, offers = rng.sample(range(community, community + 20), 2)
+            swaps.append(SwapEdge(f"s{i}", f"u{rng.randrange(30_000)}", wants, offers, base + timedelta(seconds=i)))
+
+        start_time = time.time()
+        rings = find_trade_rings(swaps)
+        elapsed = time.time() - start_time
+
+        start_time = time.time()
+        pooled = find_trade_rings(swaps, pool_threshold=0)
+        pooled_elapsed = time.time() - start_time
+        print(f"\n100k swaps: {len(rings)} rings in {elapsed:.2f}s serial, {pooled_elapsed:.2f}s pooled")
+        assert sorted(map(tuple, pooled)) == sorted(map(tuple, rings))
+
+        by_id = {swap.swap_id: swap for swap in swaps}
+        for ring in rings:
+            legs = [by_id[swap_id] for swap_id in ring]
+            assert all(leg.offers == legs[(i + 1) % len(legs)].wants for i, leg in enumerate(legs))
+            assert len({leg.user_id for leg in legs}) == len(legs)
+        used = [swap_id for ring in rings for swap_id in ring]
+        assert len(used) == len(set(used))
+        assert rings and all(3 <= len(ring) <= 4 for ring in rings)
+        assert elapsed < 30
+
+    @pytest.mark.slow
+    def test_match_scoring_50k_candidates(self):
+        """Benchmark scoring 50k candidates; it should stay within a few milliseconds."""
+        import numpy as np
+        from app.services.match_scoring import CandidateArrays, category_affinity, top_k
+
+        rng = np.random.default_rng(7)
+        n = 50_000
+        candidates = CandidateArrays([f"s{i}" for i in range(n)], rng.integers(0, 2, n), rng.integers(0, 14, n),
+                                     rng.integers(0, 20, n), rng.uniform(0, 90 * 24 * 3600, n))
+        affinity = category_affinity([f"c{i % 5}" for i in range(30)], {f"c{i}": i for i in range(14)})
+
+        top_k(candidates, affinity, k=60)  # warm up
+        start_time = time.perf_counter()
+        for _ in range(20):
+            best = top_k(candidates, affinity, k=60)
+        elapsed = (time.perf_counter() - start_time) / 20
+        print(f"\nscored 50k candidates in {elapsed * 1000:.2f}ms")
+
+        assert len(best) == 60
+        assert elapsed < 0.01
+
+    @pytest.mark.slow
+    def test_primary_key_benchmark(self, tmp_path):
+        """Benchmark insert throughput and index size: uuid4 text keys vs UUIDv7 16-byte keys."""
+        import uuid
+        from sqlalchemy import create_engine, MetaData, Table, Column, String, Text, Index, insert, text
+        from app.models.base import UUIDKey, generate_uuid
+
+        n, batch = 100_000, 500
+        parents = [str(uuid.uuid4()) for _ in range(1000)]
+        results = {}
+        for label, key_type, new_key in (('uuid4 text', String, lambda: str(uuid.uuid4())),
+                                         ('uuid7 blob', UUIDKey, generate_uuid)):
+            engine = create_engine(f"sqlite:///{tmp_path / label.replace(' ', '_')}.db")
+            metadata = MetaData()
+            table = Table('rows', metadata,
+                          Column('id', key_type, primary_key=True),
+                          Column('parent_id', key_type, nullable=False),
+                          Column('body', Text, nullable=False),
+                          Index('ix_rows_parent', 'parent_id'))
+            metadata.create_all(engine)
+
+            start_time = time.perf_counter()
+            for offset in range(0, n, batch):
+                rows = [{'id': new_key(), 'parent_id': parents[i % len(parents)], 'body': "x" * 40}
+                        for i in range(offset, offset + batch)]
+                with engine.begin() as conn:
+                    conn.execute(insert(table), rows)
+            elapsed = time.perf_counter() - start_time
+
+            with engine.connect() as conn:
+                sizes = dict(conn.execute(text("SELECT name, sum(pgsize) FROM dbstat GROUP BY name")).all())
+            engine.dispose()
+            pk_index = next(name for name in sizes if name.startswith('sqlite_autoindex_rows'))
+            results[label] = (n / elapsed, sizes[pk_index], sizes['ix_rows_parent'], sizes['rows'])
+
+        print()
+        for label, (rate, pk_size, fk_size, table_size) in results.items():
+            print(f"{label}: {rate:,.0f} rows/s, pk index {pk_size / 1e6:.1f}MB,"
+                  f" fk index {fk_size / 1e6:.1f}MB, table {table_size / 1e6:.1f}MB")
+
+        before, after = results['uuid4 text'], results['uuid7 blob']
+        assert after[1] < before[1] * 0.6
+        assert after[2] < before[2] * 0.7
+
+    @pytest.mark.slow
+    def test_worker_startup_benchmark(self, tmp_path, monkeypatch):
+        """Benchmark create_app() on a warm database: seed hash check vs the old per-name SELECTs."""
+        import statistics
+        import config
+        from app import create_app
+        from app.models import Category, SkillName
+        from app.services.seeding import category_data, skill_name_data
+
+        monkeypatch.setattr(config.Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'boot.db'}")
+        create_app()  # cold boot seeds the file database
+
+        boots = []
+        for _ in range(10):
+            start_time = time.perf_counter()
+            app = create_app()
+            boots.append(time.perf_counter() - start_time)
+
+        # What every worker used to do before serving: one SELECT per seed entry
+        with app.app_context():
+            start_time = time.perf_counter()
+            for model, names in ((Category, category_data), (SkillName, skill_name_data)):
+                for name in names:
+                    db.session.execute(db.select(model).where(model.name == name)).scalar_one_or_none()
+            legacy_seed_check = time.perf_counter() - start_time
+
+        boot = statistics.median(boots)
+        print(f"\nwarm create_app(): median {boot * 1000:.1f}ms, max {max(boots) * 1000:.1f}ms;"
+              f" old per-name seed check alone: {legacy_seed_check * 1000:.1f}ms"
+              f" for {len(category_data) + len(skill_name_data)} SELECTs")
+        assert boot < 1.0
+
+    @pytest.mark.slow
+    def test_chat_history_benchmark(self, tmp_path):
+        """
+        Benchmark one conversation's history read as swap_messages grows.
+
+        MESSAGE_BENCHMARK_ROWS sets the final volume (default 1M; tens of
+        millions on a real server) and BENCHMARK_DATABASE_URI a PostgreSQL
+        database to run against, where the table is partitioned by month.
+        """
+        import os
+        import statistics
+        from datetime import datetime, timedelta
+        from types import SimpleNamespace
+        from sqlalchemy import create_engine, insert, text, Column, Index, MetaData, Table
+        from app.models import SwapMessage, MessageType
+        from app.models.base import generate_uuid
+        from app.models.swap_message import _unpartitioned
+        from app.services.chat_history import history_select
+        from app.services.message_partitions import ensure_partitions
+
+        total = int(os.getenv('MESSAGE_BENCHMARK_ROWS', 1_000_000))
+        engine = create_engine(os.getenv('BENCHMARK_DATABASE_URI') or f"sqlite:///{tmp_path / 'messages.db'}")
+        # swap_messages as the model declares it, minus the foreign keys to tables not created here
+        model = SwapMessage.__table__
+        table = Table(model.name, MetaData(),
+                      *[Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable) for c in model.columns],
+                      Index('ix_swap_messages_conversation_timestamp', 'conversation_id', 'timestamp'),
+                      Index('ux_swap_messages_conversation_seq', 'conversation_id', 'seq', unique=True).ddl_if(
+                          callable_=_unpartitioned),
+                      postgresql_partition_by='RANGE (timestamp)')
+        first_month, months = datetime(2025, 1, 1), 24
+        span = timedelta(days=30 * months)
+        with engine.begin() as conn:
+            table.drop(conn, checkfirst=True)
+            table.create(conn)
+            ensure_partitions(conn, months_ahead=0, since=first_month, today=first_month + span)
+
+        # The conversation read back: 50 messages over a week in the middle of the range
+        chat_start = first_month + span / 2
+        chat = SimpleNamespace(id=generate_uuid(), first_message_at=chat_start,
+                               last_message_at=chat_start + timedelta(minutes=49 * 200))
+        others = [generate_uuid() for _ in range(max(1, total // 100))]
+        with engine.begin() as conn:
+            conn.execute(insert(table), [
+                {'id': generate_uuid(), 'conversation_id': chat.id, 'sender_id': others[0], 'recipient_id': others[0],
+                 'seq': i + 1, 'content': f"message {i}", 'type': MessageType.TEXT,
+                 'timestamp': chat_start + timedelta(minutes=200 * i)}
+                for i in range(50)
+            ])
+
+        stmt = history_select(chat)
+        results, inserted, batch = {}, 0, 10_000
+        for step in (total // 100, total // 10, total):
+            while inserted < step:
+                rows = [{'id': generate_uuid(), 'conversation_id': others[i % len(others)],
+                         'sender_id': others[0], 'recipient_id': others[0], 'seq': i // len(others) + 1,
+                         'content': "x" * 40,
+                         'type': MessageType.TEXT, 'timestamp': first_month + span * ((i * 7919) % step / step)}
+                        for i in range(inserted, min(inserted + batch, step))]
+                with engine.begin() as conn:
+                    conn.execute(insert(table), rows)
+                inserted += len(rows)
+
+            with engine.connect() as conn:
+                if engine.dialect.name == 'postgresql':
+                    conn.execute(text(f"ANALYZE {table.name}"))
+                    sql = stmt.compile(engine, compile_kwargs={'literal_binds': True})
+                    plan = "\n".join(conn.execute(text(f"EXPLAIN {sql}")).scalars())
+                    assert plan.count(f"{table.name}_y") == 1, plan
+                timings = []
+                for _ in range(200):
+                    start_time = time.perf_counter()
+                    assert len(conn.execute(stmt).all()) == 50
+                    timings.append(time.perf_counter() - start_time)
+            results[step] = statistics.median(timings)
+
+        with engine.begin() as conn:
+            table.drop(conn)
+        engine.dispose()
+
+        print()
+        for step, median in results.items():
+            print(f"{step:>12,} messages: history read median {median * 1e6:.0f}us")
+        assert max(results.values()) < 3 * min(results.values())
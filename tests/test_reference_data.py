@@ -0,0 +1,82 @@
+from app.models import db, SkillName, Category, AppMeta
+from app.models.base import generate_uuid
+from app.services.reference_data import reference_data, VERSION_KEY
+
+
+class TestReferenceData:
+    """Test the per-worker SkillName/Category cache."""
+
+    def test_snapshot_matches_tables(self, app):
+        """Test that choices and maps mirror the seeded tables."""
+        with app.app_context():
+            ref = reference_data()
+            names = db.session.execute(db.select(SkillName.name).order_by(SkillName.name)).scalars().all()
+            assert [name for _, name in ref.skill_name_choices] == names
+            assert len(ref.categories) == db.session.execute(
+                db.select(db.func.count()).select_from(Category)
+            ).scalar_one()
+            sn_id, name = ref.skill_name_choices[0]
+            assert ref.skill_names[sn_id] == name
+
+    def test_cached_between_calls(self, app, query_counter):
+        """Test that a warm cache issues no queries."""
+        with app.app_context():
+            reference_data()
+            with query_counter() as statements:
+                reference_data()
+                reference_data()
+            assert statements == []
+
+    def test_write_bumps_version_and_refreshes(self, app):
+        """Test that adding a skill name is visible on the next read."""
+        with app.app_context():
+            before = reference_data()
+            db.session.add(SkillName(name="Brand New Skill"))
+            db.session.commit()
+
+            stamp = db.session.execute(
+                db.select(AppMeta.value).filter_by(key=VERSION_KEY)
+            ).scalar_one()
+            after = reference_data()
+            assert stamp != before.version
+            assert after.version == stamp
+            assert "Brand New Skill" in after.skill_names.values()
+
+    def test_other_worker_change_seen_after_interval(self, app):
+        """Test that a stamp changed elsewhere is picked up on the next check."""
+        with app.app_context():
+            cache = app.extensions['reference_cache']
+            reference_data()
+            # Simulate another worker inserting a row with a raw statement
+            external_id = generate_uuid()
+            db.session.execute(db.insert(SkillName).values(id=external_id, name="External Skill"))
+            db.session.execute(db.update(AppMeta).where(AppMeta.key == VERSION_KEY).values(value='other'))
+            db.session.commit()
+
+            assert external_id not in cache.get().skill_names
+            cache.check_interval = 0
+            assert cache.get().skill_names[external_id] == "External Skill"
+
+    def test_missing_stamp_is_a_stable_version(self, app, query_counter):
+        """Test that without a stamp row the tables are not reloaded on every check."""
+        with app.app_context():
+            cache = app.extensions['reference_cache']
+            db.session.execute(db.delete(AppMeta).where(AppMeta.key == VERSION_KEY))
+            db.session.commit()
+            cache.check_interval = 0
+            first = cache.get()
+            assert first.version is None
+            with query_counter() as statements:
+                assert cache.get() is first
+            assert len(statements) == 1  # only the stamp is read
+
+            db.session.add(SkillName(name="After The Stamp"))
+            db.session.commit()
+            assert "After The Stamp" in cache.get().skill_names.values()
+
+    def test_template_filter(self, app):
+        """Test the skill_name_label filter."""
+        with app.app_context():
+            sn_id, name = reference_data().skill_name_choices[0]
+            rendered = app.jinja_env.from_string("{{ sid|skill_name_label }}").render(sid=sn_id)
+            assert rendered == name
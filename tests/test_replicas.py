@@ -0,0 +1,135 @@
+import shutil
+import sqlite3
+
+import pytest
+from flask import session
+
+import config
+from app import create_app
+from app.models import db, User
+from app.services.replicas import read_only, PRIMARY_UNTIL_KEY
+from werkzeug.security import generate_password_hash
+
+
+@pytest.fixture
+def replicated(tmp_path, monkeypatch):
+    """
+    A primary and two replica SQLite files, each naming the test user differently.
+
+    Returns (app, user id). The app has extra routes that report which database
+    served their reads.
+    """
+    primary = tmp_path / 'primary.db'
+    replicas = [tmp_path / 'replica_0.db', tmp_path / 'replica_1.db']
+    monkeypatch.setattr(config.Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{primary}")
+    monkeypatch.setattr(config.Config, 'SQLALCHEMY_BINDS',
+                        {f'replica_{n}': f"sqlite:///{path}" for n, path in enumerate(replicas)})
+    app = create_app()
+    app.config.update({'TESTING': True, 'SECRET_KEY': 'test-secret-key', 'REPLICA_HEALTH_CHECK_INTERVAL': 60})
+
+    with app.app_context():
+        user = User(name="primary", email="reader@example.com", password=generate_password_hash("password123"))
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    # "Replicate" by copying the primary, then tell the copies apart
+    for n, path in enumerate(replicas):
+        shutil.copy(primary, path)
+        with sqlite3.connect(path) as connection:
+            connection.execute("UPDATE users SET name = ?", (f"replica_{n}",))
+
+    def whoami():
+        return db.session.get(User, session['user_id']).name
+
+    def write_then_read():
+        db.session.get(User, session['user_id']).password = generate_password_hash("changed")
+        db.session.commit()
+        db.session.expire_all()
+        return db.session.get(User, session['user_id']).name
+
+    def whoami_twice():
+        first = whoami()
+        db.session.expire_all()
+        return f"{first} {whoami()}"
+
+    app.add_url_rule('/test/whoami', 'whoami', read_only(whoami), methods=['GET', 'POST'])
+    app.add_url_rule('/test/whoami-twice', 'whoami_twice', read_only(whoami_twice))
+    app.add_url_rule('/test/primary-whoami', 'primary_whoami', whoami)
+    app.add_url_rule('/test/write-then-read', 'write_then_read', read_only(write_then_read))
+    return app, user_id
+
+
+def _client(app, user_id):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+    return client
+
+
+class TestReadReplicas:
+    """Test read-only request routing across replica binds."""
+
+    def test_read_only_gets_round_robin_over_replicas(self, replicated):
+        app, user_id = replicated
+        client = _client(app, user_id)
+        served = [client.get('/test/whoami').get_data(as_text=True) for _ in range(4)]
+        assert served == ['replica_0', 'replica_1', 'replica_0', 'replica_1']
+
+    def test_replica_is_chosen_once_per_request(self, replicated, monkeypatch):
+        app, user_id = replicated
+        pool = app.extensions['replicas']
+        choices = []
+        choose = pool.choose
+        monkeypatch.setattr(pool, 'choose', lambda: choices.append(1) or choose())
+        client = _client(app, user_id)
+        served = [client.get('/test/whoami-twice').get_data(as_text=True) for _ in range(2)]
+        assert served == ['replica_0 replica_0', 'replica_1 replica_1']
+        assert len(choices) == 2
+
+    def test_unmarked_routes_and_writes_use_the_primary(self, replicated):
+        app, user_id = replicated
+        client = _client(app, user_id)
+        assert client.get('/test/primary-whoami').get_data(as_text=True) == 'primary'
+        assert client.post('/test/whoami').get_data(as_text=True) == 'primary'
+
+    def test_reads_after_a_write_see_the_primary(self, replicated):
+        app, user_id = replicated
+        client = _client(app, user_id)
+        assert client.get('/test/write-then-read').get_data(as_text=True) == 'primary'
+        # The writer's next requests stay on the primary too, until the sticky window ends
+        assert client.get('/test/whoami').get_data(as_text=True) == 'primary'
+        with client.session_transaction() as sess:
+            sess[PRIMARY_UNTIL_KEY] = 0
+        assert client.get('/test/whoami').get_data(as_text=True).startswith('replica_')
+
+    def test_unhealthy_replica_is_skipped(self, replicated, tmp_path):
+        app, user_id = replicated
+        with app.app_context():
+            db.engines['replica_1'].dispose()
+        (tmp_path / 'replica_1.db').unlink()
+        (tmp_path / 'replica_1.db').mkdir()  # can no longer be opened as a database
+        client = _client(app, user_id)
+        served = {client.get('/test/whoami').get_data(as_text=True) for _ in range(4)}
+        assert served == {'replica_0'}
+        assert app.extensions['replicas'].status() == {'replica_0': True, 'replica_1': False}
+
+    def test_no_healthy_replica_falls_back_to_primary(self, replicated):
+        app, user_id = replicated
+        pool = app.extensions['replicas']
+        for key in pool.bind_keys:
+            pool.mark_down(key)
+        assert _client(app, user_id).get('/test/whoami').get_data(as_text=True) == 'primary'
+
+    def test_read_heavy_views_are_marked(self, replicated):
+        app, _ = replicated
+        for endpoint in ('dashboard.dashboard', 'api.swaps', 'api.skill_names', 'search.search_view'):
+            assert getattr(app.view_functions[endpoint], 'read_only', False), endpoint
+        # The chat view creates the conversation on first visit, so it reads from the primary
+        for endpoint in ('dashboard.send_swap_request', 'chat.chat'):
+            assert not getattr(app.view_functions[endpoint], 'read_only', False), endpoint
+
+    def test_dashboard_renders_from_a_replica(self, replicated):
+        app, user_id = replicated
+        response = _client(app, user_id).get('/dashboard')
+        assert response.status_code == 200
+        assert b'replica_0' in response.data
@@ -0,0 +1,115 @@
+import pytest
+from flask_migrate import downgrade, upgrade
+from app.models import db, User, Category, SkillName, Skill, Swap, SwapStatus
+from app.services.search import search
+from werkzeug.security import generate_password_hash
+
+
+@pytest.fixture
+def catalogue(app):
+    """A user with two skills and a swap, plus a second user to search as."""
+    with app.app_context():
+        category = db.session.execute(db.select(Category)).scalars().first()
+        owner = User(name="Owner", email="owner@example.com", password=generate_password_hash("password123"))
+        searcher = User(name="Searcher", email="searcher@example.com", password=generate_password_hash("password123"))
+        guitar = db.session.execute(db.select(SkillName).filter_by(name="Guitar Chords")).scalar_one()
+        cooking = db.session.execute(db.select(SkillName).filter_by(name="Healthy Cooking")).scalar_one()
+        db.session.add_all([owner, searcher])
+        db.session.flush()
+        guitar_skill = Skill(user_id=owner.id, skill_name_id=guitar.id, category_id=category.id,
+                             description="Fingerpicking patterns and <b>barre</b> chords for beginners")
+        cooking_skill = Skill(user_id=owner.id, skill_name_id=cooking.id, category_id=category.id,
+                              description="Cheap weeknight meals cooked in a dorm kitchen")
+        db.session.add_all([guitar_skill, cooking_skill])
+        db.session.flush()
+        swap = Swap(user_id=owner.id, offered_skill_id=guitar_skill.id, desired_skill_name_id=cooking.id,
+                    description="Trade strumming lessons for help with meal prep")
+        db.session.add(swap)
+        db.session.commit()
+        return {'searcher': searcher.id, 'guitar_skill': guitar_skill.id,
+                'cooking_skill': cooking_skill.id, 'swap': swap.id}
+
+
+class TestSearch:
+    """Test full-text search over skills and swaps."""
+
+    def test_stemmed_and_prefix_matches(self, app, catalogue):
+        with app.app_context():
+            assert {h['ref_id'] for h in search("cooks")} >= {catalogue['cooking_skill']}
+            assert {h['ref_id'] for h in search("fingerpick")} == {catalogue['guitar_skill']}
+            # Swap documents include the offered and desired skill names
+            assert catalogue['swap'] in {h['ref_id'] for h in search("guitar chords", kinds=('swap',))}
+
+    def test_snippets_are_escaped_and_highlighted(self, app, catalogue):
+        with app.app_context():
+            hit = search("barre")[0]
+            assert '<mark>barre</mark>' in hit['snippet']
+            assert '&lt;b&gt;' in hit['snippet'] and '<b>' not in hit['snippet']
+
+    def test_index_follows_updates_and_deletes(self, app, catalogue):
+        with app.app_context():
+            skill = db.session.get(Skill, catalogue['cooking_skill'])
+            skill.description = "Baking sourdough bread from scratch"
+            db.session.commit()
+            assert search("weeknight") == []
+            assert search("sourdough")[0]['ref_id'] == catalogue['cooking_skill']
+
+            db.session.delete(db.session.get(Swap, catalogue['swap']))
+            db.session.commit()
+            assert search("strumming") == []
+
+    def test_query_syntax_is_neutralised(self, app, catalogue, query_counter):
+        with app.app_context():
+            with query_counter() as statements:
+                assert search('barre" (chords') != []
+                assert search('***') == []
+            assert not any('LIKE' in statement.upper() for statement in statements)
+
+    def test_search_endpoint(self, client, app, catalogue):
+        with client.session_transaction() as sess:
+            sess['user_id'] = catalogue['searcher']
+        body = client.get('/search?q=meal').get_json()
+        assert [s['id'] for s in body['swaps']] == [catalogue['swap']]
+        assert [s['id'] for s in body['skills']] == [catalogue['cooking_skill']]
+        assert '<mark>' in body['swaps'][0]['snippet']
+
+        with app.app_context():
+            db.session.get(Swap, catalogue['swap']).status = SwapStatus.completed
+            db.session.commit()
+        body = client.get('/search?q=meal&type=swaps').get_json()
+        assert body['swaps'] == [] and body['skills'] == []
+        assert client.get('/search?q=meal&type=bogus').status_code == 400
+
+    def test_hidden_swaps_do_not_use_up_the_limit(self, client, app, catalogue):
+        with app.app_context():
+            swap = db.session.get(Swap, catalogue['swap'])
+            # Closed swaps that rank above the open one
+            for _ in range(3):
+                db.session.add(Swap(user_id=swap.user_id, offered_skill_id=swap.offered_skill_id,
+                                    desired_skill_name_id=swap.desired_skill_name_id,
+                                    description="Meal meal meal prep", status=SwapStatus.completed))
+            db.session.commit()
+        with client.session_transaction() as sess:
+            sess['user_id'] = catalogue['searcher']
+        body = client.get('/search?q=meal&type=swaps&limit=1').get_json()
+        assert [s['id'] for s in body['swaps']] == [catalogue['swap']]
+
+    def test_status_changes_leave_the_index_alone(self, app, catalogue):
+        def rows_written(**values):
+            # total_changes() counts the rows triggers write as well
+            before = db.session.execute(db.text("SELECT total_changes()")).scalar()
+            db.session.execute(db.update(Swap).where(Swap.id == catalogue['swap']).values(**values))
+            return db.session.execute(db.text("SELECT total_changes()")).scalar() - before
+
+        with app.app_context():
+            assert rows_written(status=SwapStatus.in_discussion, pending_requests=1) == 1
+            assert rows_written(description="Strumming for soup") > 1
+            db.session.commit()
+            assert search("soup")[0]['ref_id'] == catalogue['swap']
+
+    def test_migration_installs_and_backfills_the_index(self, app, catalogue):
+        with app.app_context():
+            downgrade(revision='0009_message_seq')
+            assert not db.inspect(db.engine).has_table('search_docs')
+            upgrade()
+            assert {h['ref_id'] for h in search("meal")} == {catalogue['cooking_skill'], catalogue['swap']}
@@ -0,0 +1,87 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+import config
+from app import create_app
+from app.models import db, Category, SkillName, AppMeta
+from app.services import seeding
+from app.services.reference_data import VERSION_KEY
+
+
+@contextmanager
+def all_statements():
+    """Statements from every engine, including ones create_app() has not built yet."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@pytest.fixture
+def database_file(tmp_path, monkeypatch):
+    """Point create_app() at a file database that outlives a single app."""
+    monkeypatch.setattr(config.Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'seed.db'}")
+
+
+def _stamped(key):
+    return db.session.execute(db.select(AppMeta.value).filter_by(key=key)).scalar_one_or_none()
+
+
+class TestSeeding:
+    """Test hash-stamped bulk seeding of the reference tables."""
+
+    def test_startup_seeds_and_stamps(self, app):
+        with app.app_context():
+            assert db.session.query(Category).count() == len(set(seeding.category_data))
+            assert db.session.query(SkillName).count() == len(set(seeding.skill_name_data))
+            assert _stamped(seeding.SEED_HASH_KEY) == seeding.seed_hash()
+
+    def test_warm_boot_checks_the_hash_only(self, database_file):
+        create_app()
+        with all_statements() as statements:
+            create_app()
+        seed_statements = [s for s in statements if s.lstrip().upper().startswith(('SELECT', 'INSERT'))
+                           and ('app_meta' in s or 'categories' in s or 'skill_names' in s)]
+        assert len(seed_statements) == 1 and 'FROM app_meta' in seed_statements[0]
+        assert not any(s.lstrip().upper().startswith('INSERT') for s in statements)
+
+    def test_one_insert_per_table(self, app, query_counter):
+        with app.app_context():
+            db.session.execute(db.delete(AppMeta).where(AppMeta.key == seeding.SEED_HASH_KEY))
+            db.session.commit()
+            with query_counter() as statements:
+                assert seeding.seed_reference_data() == {'categories': 0, 'skill_names': 0}
+            inserts = [s for s in statements if s.lstrip().upper().startswith('INSERT')]
+            assert len([s for s in inserts if 'ON CONFLICT' in s.upper()]) == 2
+
+    def test_changed_seed_list_inserts_only_new_rows(self, app, monkeypatch):
+        with app.app_context():
+            version = _stamped(VERSION_KEY)
+            monkeypatch.setattr(seeding, 'skill_name_data', seeding.skill_name_data + ["Seeded Later"])
+            seeding.ensure_seeded(app)
+            assert db.session.execute(
+                db.select(SkillName).filter_by(name="Seeded Later")
+            ).scalar_one_or_none() is not None
+            assert _stamped(seeding.SEED_HASH_KEY) == seeding.seed_hash()
+            assert _stamped(VERSION_KEY) != version
+
+    def test_startup_seeding_can_be_disabled(self, app, query_counter):
+        app.config['SEED_ON_STARTUP'] = False
+        with app.app_context():
+            with query_counter() as statements:
+                seeding.ensure_seeded(app)
+            assert statements == []
+
+    def test_seed_command(self, app, runner):
+        result = runner.invoke(args=['seed-reference-data'])
+        assert result.exit_code == 0
+        assert 'Inserted 0 categories and 0 skill names' in result.output
@@ -0,0 +1,233 @@
+import json
+import os
+import pickle
+import socket
+import struct
+import subprocess
+import sys
+import time
+import urllib.request
+
+import pytest
+import socketio as python_socketio
+
+import config
+from app import create_app
+from app.sockets import socketio
+from app.sockets.message_queue import LocalBroker, LocalSocketManager, MemoryManager, message_queue_manager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A worker: the app served as run.py does, on the port given
+WORKER = """
+import sys
+from app import create_app, socketio
+
+socketio.run(create_app(), port=int(sys.argv[1]), allow_unsafe_werkzeug=True)
+"""
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class PollingClient:
+    """Just enough of a Socket.IO client, over Engine.IO long-polling, to talk to a worker."""
+
+    def __init__(self, port, cookie):
+        self.url = f"http://127.0.0.1:{port}/socket.io/?EIO=4&transport=polling"
+        self.cookie = cookie
+        self.events = []
+        self.acks = {}
+        self.url += '&sid=' + json.loads(self._request()[1:])['sid']
+
+    def _request(self, body=None):
+        request = urllib.request.Request(self.url, data=body and body.encode(), method='POST' if body else 'GET',
+                                         headers={'Cookie': self.cookie, 'Content-Type': 'text/plain'})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.read().decode()
+
+    def poll(self):
+        for packet in self._request().split('\x1e'):
+            if packet == '2':
+                self._request('3')  # pong
+            elif packet.startswith('4'):
+                kind, namespace, rest = packet[1], '/', packet[2:]
+                if rest.startswith('/'):
+                    namespace, _, rest = rest.partition(',')
+                if kind == '2':
+                    self.events.append((namespace, *json.loads(rest)))
+                elif kind == '3':
+                    ack_id, _, args = rest.partition('[')
+                    self.acks[int(ack_id)] = json.loads('[' + args)[0]
+                elif kind == '4':
+                    raise ConnectionRefusedError(rest)
+
+    def connect(self, namespace):
+        self._request('40' + ('' if namespace == '/' else namespace + ','))
+        self.poll()
+
+    def emit(self, namespace, event, data, ack_id):
+        prefix = '' if namespace == '/' else namespace + ','
+        self._request(f'42{prefix}{ack_id}' + json.dumps([event, data]))
+        while ack_id not in self.acks:
+            self.poll()
+        return self.acks[ack_id]
+
+    def wait_for(self, count):
+        deadline = time.monotonic() + 10
+        while len(self.events) < count and time.monotonic() < deadline:
+            self.poll()
+        return self.events
+
+
+@pytest.fixture
+def broker(tmp_path):
+    broker = LocalBroker(f"unix://{tmp_path / 'socketio.sock'}").start()
+    yield broker
+    broker.shutdown()
+
+
+def _heard(url, channel):
+    """A listening Socket.IO server on `url`, and the list the emits it hears from other servers go to."""
+    server = python_socketio.Server(async_mode='threading', client_manager=message_queue_manager(url, channel))
+    heard = []
+    server.manager._handle_emit = heard.append
+    server.manager.initialize()
+    return server, heard
+
+
+def _wait_for(items, count=1):
+    deadline = time.monotonic() + 5
+    while len(items) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return items
+
+
+class TestSocketIOScaling:
+    """Test Socket.IO emits reach clients held by other workers."""
+
+    @pytest.mark.parametrize('backend', ['memory', 'unix'])
+    def test_emit_is_published_to_the_other_servers(self, backend, broker, request):
+        url = 'memory://' if backend == 'memory' else broker.url
+        channel = request.node.name
+        first, first_heard = _heard(url, channel)
+        second, second_heard = _heard(url, channel)
+        _, elsewhere = _heard(url, channel + '-other')
+
+        first.emit('message', {'content': "hi"}, to='room-1', namespace='/chat')
+        assert [(m['event'], m['data'], m['room']) for m in _wait_for(second_heard)] == [
+            ('message', {'content': "hi"}, 'room-1')]
+        # The sender delivers to its own clients once, not again when its emit comes back
+        time.sleep(0.1)
+        assert len(first_heard) == 1 and elsewhere == []
+
+    def test_broker_carries_only_json(self, broker, request):
+        _, heard = _heard(broker.url, request.node.name)
+        publisher = socket.socket(socket.AF_UNIX)
+        publisher.connect(broker.address)
+        for frame in (f'pub:{request.node.name}'.encode(),
+                      pickle.dumps({'method': 'emit', 'event': 'boom'}),
+                      json.dumps({'method': 'emit', 'event': 'message', 'data': 1}).encode()):
+            publisher.sendall(struct.pack('!I', len(frame)) + frame)
+        publisher.close()
+        assert [m['event'] for m in _wait_for(heard)] == ['message']
+
+        with pytest.raises(ValueError):
+            LocalBroker('tcp://0.0.0.0:6380')
+        assert LocalBroker('tcp://127.0.0.1:6380').address == ('127.0.0.1', 6380)
+
+    def test_manager_is_picked_by_url(self, broker):
+        assert type(message_queue_manager(None)) is python_socketio.Manager
+        assert isinstance(message_queue_manager('memory://'), MemoryManager)
+        assert isinstance(message_queue_manager(broker.url), LocalSocketManager)
+        with pytest.raises(ValueError):
+            message_queue_manager('carrier-pigeon://loft')
+
+    def test_emit_in_one_worker_reaches_a_client_on_another(self, tmp_path, monkeypatch, broker, make_chat):
+        database = f"sqlite:///{tmp_path / 'chat.db'}"
+        monkeypatch.setattr(config.Config, 'SQLALCHEMY_DATABASE_URI', database)
+        app = create_app()
+        app.config['SECRET_KEY'] = 'test-secret-key'
+        with app.app_context():
+            ids = make_chat()
+        serializer = app.session_interface.get_signing_serializer(app)
+        env = dict(os.environ, DATABASE_URI=database, SECRET_KEY='test-secret-key',
+                   SOCKETIO_MESSAGE_QUEUE=broker.url, SOCKETIO_CHANNEL='scaling-test')
+
+        ports = [_free_port(), _free_port()]
+        workers = [subprocess.Popen([sys.executable, '-c', WORKER, str(port)], cwd=ROOT, env=env,
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE) for port in ports]
+        try:
+            clients = {}
+            deadline = time.monotonic() + 60
+            for user, port in zip(('owner', 'asker'), ports):
+                cookie = 'session=' + serializer.dumps({'user_id': ids[user]})
+                while user not in clients:
+                    try:
+                        clients[user] = PollingClient(port, cookie)
+                    except OSError:
+                        assert time.monotonic() < deadline, "worker did not start"
+                        time.sleep(0.2)
+            owner, asker = clients['owner'], clients['asker']
+            owner.connect('/')
+            owner.connect('/chat')
+            asker.connect('/')
+            asker.connect('/chat')
+            for n, client in enumerate((owner, asker)):
+                assert client.emit('/chat', 'join', {'conversation_id': ids['conversation']}, n)['success']
+
+            # The asker is on worker A, the owner on worker B
+            ack = asker.emit('/chat', 'send_message', {'conversation_id': ids['conversation'],
+                                                       'content': "Across workers"}, 5)
+            assert ack['success'] is True
+            assert asker.emit('/', 'send_notification', {'target_user_id': ids['owner'], 'type': 'swap',
+                                                         'message': "From worker A"}, 6) == {'success': True}
+            received = {(namespace, event): data for namespace, event, data in owner.wait_for(2)}
+        finally:
+            for worker in workers:
+                worker.kill()
+                worker.wait()
+        assert received[('/chat', 'message')] == ack['message']
+        assert received[('/', 'receive_notification')] == {
+            'type': 'swap', 'message': "From worker A", 'sender_id': ids['asker']}
+
+    def test_without_sticky_sessions_clients_use_websocket_only(self, tmp_path, monkeypatch, make_chat):
+        monkeypatch.setattr(config.Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'chat.db'}")
+        monkeypatch.setattr(config.Config, 'SOCKETIO_STICKY_SESSIONS', False)
+        app = create_app()
+        app.config['SECRET_KEY'] = 'test-secret-key'
+        with app.app_context():
+            ids = make_chat()
+        assert socketio.server.eio.transports == ['websocket']
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = ids['owner']
+        response = client.get(f"/chat/{ids['discuss_request']}")
+        assert b"io('/chat', {transports: ['websocket']})" in response.data
+
+
+class TestNotifications:
+    """Test the per-user notification rooms."""
+
+    def _connect(self, app, user_id=None):
+        client = app.test_client()
+        if user_id:
+            with client.session_transaction() as sess:
+                sess['user_id'] = user_id
+        return socketio.test_client(app, flask_test_client=client)
+
+    def test_anonymous_connection_is_refused(self, app):
+        assert not self._connect(app).is_connected()
+
+    def test_notification_reaches_only_its_user(self, app, chat):
+        owner = self._connect(app, chat['owner'])
+        outsider = self._connect(app, chat['outsider'])
+        asker = self._connect(app, chat['asker'])
+        asker.emit('send_notification', {'target_user_id': chat['owner'], 'type': 'swap',
+                                         'message': "Interested?"})
+        assert [event['args'] for event in owner.get_received()] == [
+            [{'type': 'swap', 'message': "Interested?", 'sender_id': chat['asker']}]]
+        assert outsider.get_received() == []
@@ -0,0 +1,143 @@
+import pytest
+from app.models import (
+    db, User, Category, SkillName, Skill, Swap, SwapRequest, DiscussRequest,
+    SwapStatus, RequestStatus,
+)
+from app.services import swap_status
+from app.services.swap_status import recompute_swap_statuses, chunk_bounds
+from werkzeug.security import generate_password_hash
+
+# (swap request statuses, discuss request statuses, stored status, expected status)
+CASES = {
+    'no_requests': ([], [RequestStatus.accepted], SwapStatus.cancelled, SwapStatus.open),
+    'all_closed': ([RequestStatus.rejected, RequestStatus.cancelled], [], SwapStatus.open, SwapStatus.cancelled),
+    'accepted': ([RequestStatus.accepted, RequestStatus.rejected], [], SwapStatus.open, SwapStatus.in_discussion),
+    'discussed': ([RequestStatus.pending], [RequestStatus.accepted], SwapStatus.open, SwapStatus.in_discussion),
+    'pending': ([RequestStatus.pending, RequestStatus.rejected], [RequestStatus.pending],
+                SwapStatus.in_discussion, SwapStatus.open),
+    'already_right': ([RequestStatus.pending], [], SwapStatus.open, SwapStatus.open),
+    'completed': ([RequestStatus.accepted], [], SwapStatus.completed, SwapStatus.completed),
+}
+
+
+@pytest.fixture
+def swaps(app):
+    """One swap per CASES entry, each stored with a status and counters its requests contradict."""
+    with app.app_context():
+        category = db.session.execute(db.select(Category)).scalars().first()
+        names = db.session.execute(db.select(SkillName).limit(2)).scalars().all()
+        owner = User(name="Owner", email="owner@example.com", password=generate_password_hash("password123"))
+        asker = User(name="Asker", email="asker@example.com", password=generate_password_hash("password123"))
+        db.session.add_all([owner, asker])
+        db.session.flush()
+        owner_skill = Skill(user_id=owner.id, skill_name_id=names[0].id, category_id=category.id,
+                            description="Owner skill description")
+        asker_skill = Skill(user_id=asker.id, skill_name_id=names[1].id, category_id=category.id,
+                            description="Asker skill description")
+        db.session.add_all([owner_skill, asker_skill])
+        db.session.flush()
+
+        ids = {}
+        for case, (request_statuses, discuss_statuses, stored, _) in CASES.items():
+            swap = Swap(user_id=owner.id, offered_skill_id=owner_skill.id, desired_skill_name_id=names[1].id,
+                        description=case, status=stored)
+            db.session.add(swap)
+            db.session.flush()
+            for status in request_statuses:
+                db.session.add(SwapRequest(sender_id=asker.id, recipient_id=owner.id, swap_id=swap.id,
+                                           sender_skill_id=asker_skill.id, recipient_skill_id=owner_skill.id,
+                                           status=status))
+            for status in discuss_statuses:
+                db.session.add(DiscussRequest(sender_id=asker.id, recipient_id=owner.id, swap_id=swap.id,
+                                              sender_skill_id=asker_skill.id, recipient_skill_id=owner_skill.id,
+                                              status=status))
+            ids[case] = swap.id
+        db.session.commit()
+
+        # The flush hooks keep statuses and counters current, so plant the
+        # stale values with a bulk UPDATE that bypasses them
+        for case, (_, _, stored, _) in CASES.items():
+            db.session.execute(
+                db.update(Swap).where(Swap.id == ids[case])
+                .values(status=stored, pending_requests=0, accepted_requests=0,
+                        closed_requests=0, accepted_discussions=0)
+            )
+        db.session.commit()
+        return ids
+
+
+def _statuses(ids):
+    return {case: db.session.get(Swap, swap_id).status for case, swap_id in ids.items()}
+
+
+class TestSwapStatusRecompute:
+    """Test the set-based swap status engine."""
+
+    @pytest.mark.parametrize('chunk_size', [1, 3, 1000])
+    def test_rules_match_expected_statuses(self, app, swaps, chunk_size):
+        with app.app_context():
+            changed = recompute_swap_statuses(chunk_size=chunk_size)
+            assert _statuses(swaps) == {case: expected[3] for case, expected in CASES.items()}
+            assert changed == {SwapStatus.open: 2, SwapStatus.cancelled: 1,
+                               SwapStatus.in_discussion: 2, SwapStatus.completed: 0}
+            # A second run has nothing left to change
+            assert not any(recompute_swap_statuses(chunk_size=chunk_size).values())
+
+    def test_agrees_with_per_object_rules(self, app, swaps):
+        with app.app_context():
+            recompute_swap_statuses()
+            for case, swap_id in swaps.items():
+                swap = db.session.get(Swap, swap_id)
+                if swap.status == SwapStatus.completed:
+                    continue
+                bulk_status = swap.status
+                swap.update_status()
+                assert swap.status == bulk_status, case
+            db.session.rollback()
+
+    def test_statement_count_is_per_chunk_not_per_swap(self, app, swaps, query_counter):
+        with app.app_context():
+            with query_counter() as statements:
+                recompute_swap_statuses(chunk_size=3)
+            chunks = len(list(chunk_bounds(db.session, 3)))
+            updates = [s for s in statements if s.lstrip().upper().startswith('UPDATE')]
+            # One counter refresh plus four status rules per chunk
+            assert len(updates) == 5 * chunks
+            assert all(' FROM ' in s.replace('\n', ' ') for s in updates if 'GROUP BY' in s)
+
+    def test_only_drifted_counters_are_written(self, app, swaps, monkeypatch):
+        cleared = []
+        monkeypatch.setattr(swap_status.dashboard_cache, 'clear', lambda: cleared.append('dashboard'))
+        with app.app_context():
+            recompute_swap_statuses()
+            total_changes = db.text("SELECT total_changes()")
+            before = db.session.execute(total_changes).scalar()
+            recompute_swap_statuses()
+            assert db.session.execute(total_changes).scalar() == before
+
+            # Counters drifting without a status change still refresh the caches
+            db.session.execute(db.update(Swap).where(Swap.id == swaps['already_right']).values(closed_requests=3))
+            db.session.commit()
+            cleared.clear()
+            before = db.session.execute(total_changes).scalar()
+            assert not any(recompute_swap_statuses().values())
+            assert db.session.execute(total_changes).scalar() == before + 1
+            assert db.session.get(Swap, swaps['already_right']).closed_requests == 0
+            assert cleared == ['dashboard']
+
+    def test_chunks_cover_every_swap_once(self, app, swaps):
+        with app.app_context():
+            bounds = list(chunk_bounds(db.session, 2))
+            assert bounds[0][0] is None and bounds[-1][1] is None
+            assert len(bounds) == len(swaps) // 2 + 1
+            assert all(previous[1] == current[0] for previous, current in zip(bounds, bounds[1:]))
+
+    def test_maintenance_route(self, client, app, swaps):
+        with app.app_context():
+            owner_id = db.session.get(Swap, swaps['pending']).user_id
+        with client.session_transaction() as sess:
+            sess['user_id'] = owner_id
+        response = client.post('/update_swap_statuses')
+        assert response.status_code == 302
+        with app.app_context():
+            assert db.session.get(Swap, swaps['all_closed']).status == SwapStatus.cancelled
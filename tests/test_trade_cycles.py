@@ -0,0 +1,135 @@
+import threading
+import pytest
+from datetime import datetime, timedelta
+from app.models import db, User, Category, SkillName, Skill, Swap
+from app.services import trade_cycles
+from app.services.trade_cycles import (
+    SwapEdge, find_trade_rings, connected_components, load_open_swaps, suggested_rings,
+)
+from werkzeug.security import generate_password_hash
+
+
+def _edge(swap_id, user_id, wants, offers, minute=0):
+    return SwapEdge(swap_id, user_id, wants, offers, datetime(2025, 1, 1) + timedelta(minutes=minute))
+
+
+class TestTradeRings:
+    """Test multi-party trade ring detection."""
+
+    def test_three_way_ring(self):
+        swaps = [_edge('a', 'A', 'guitar', 'python', 0),
+                 _edge('b', 'B', 'python', 'cooking', 1),
+                 _edge('c', 'C', 'cooking', 'guitar', 2)]
+        assert find_trade_rings(swaps) == [['a', 'b', 'c']]
+
+    def test_four_way_ring(self):
+        swaps = [_edge('a', 'A', 's1', 's2', 0), _edge('b', 'B', 's2', 's3', 1),
+                 _edge('c', 'C', 's3', 's4', 2), _edge('d', 'D', 's4', 's1', 3)]
+        assert find_trade_rings(swaps) == [['a', 'b', 'c', 'd']]
+
+    def test_same_user_cannot_fill_two_legs(self):
+        swaps = [_edge('a', 'A', 'guitar', 'python'),
+                 _edge('b', 'A', 'python', 'cooking'),
+                 _edge('c', 'C', 'cooking', 'guitar')]
+        assert find_trade_rings(swaps) == []
+
+    def test_direct_pairs_and_long_chains_are_ignored(self):
+        pair = [_edge('a', 'A', 'x', 'y'), _edge('b', 'B', 'y', 'x')]
+        chain = [_edge(f'c{i}', f'U{i}', f'n{i}', f'n{(i + 1) % 5}') for i in range(5)]
+        assert find_trade_rings(pair + chain) == []
+
+    @pytest.mark.parametrize('swaps, rings', [
+        # A chain: its last skill is wanted by nobody, its first offered by nobody
+        ([_edge('a', 'u1', 's1', 's2', 1), _edge('b', 'u2', 's2', 's3', 2), _edge('c', 'u3', 's3', 's4', 3)], []),
+        # A ring with dangling skills hanging off it on both sides
+        ([_edge('a', 'A', 'p', 'q', 0), _edge('b', 'B', 'q', 'r', 1), _edge('c', 'C', 'r', 'p', 2),
+          _edge('d', 'D', 'q', 'dead-end', 3), _edge('e', 'E', 'source', 'p', 4)], [['a', 'b', 'c']]),
+        # Dangling edges only
+        ([_edge('a', 'A', 'x', 'y', 0), _edge('b', 'B', 'z', 'y', 1), _edge('c', 'C', 'y', 'w', 2)], []),
+    ], ids=['chain', 'ring-with-dangling-skills', 'dangling-only'])
+    def test_graphs_with_dangling_skills(self, swaps, rings):
+        assert find_trade_rings(swaps) == rings
+
+    def test_components_are_independent(self):
+        ring_one = [_edge('a', 'A', 'p', 'q'), _edge('b', 'B', 'q', 'r'), _edge('c', 'C', 'r', 'p')]
+        ring_two = [_edge('d', 'D', 'x', 'y'), _edge('e', 'E', 'y', 'z'), _edge('f', 'F', 'z', 'x')]
+        assert len(connected_components(ring_one + ring_two)) == 2
+        pooled = find_trade_rings(ring_one + ring_two, processes=2, pool_threshold=0)
+        assert sorted(pooled) == [['a', 'b', 'c'], ['d', 'e', 'f']]
+
+    def test_suggested_rings_use_the_configured_pool_threshold(self, app, monkeypatch):
+        ring_one = [_edge('a', 'A', 'p', 'q'), _edge('b', 'B', 'q', 'r'), _edge('c', 'C', 'r', 'p')]
+        ring_two = [_edge('d', 'D', 'x', 'y'), _edge('e', 'E', 'y', 'z'), _edge('f', 'F', 'z', 'x')]
+        pools = []
+
+        class RecordingPool(trade_cycles.ProcessPoolExecutor):
+            def __init__(self, *args, **kwargs):
+                pools.append(kwargs)
+                super().__init__(*args, **kwargs)
+
+        monkeypatch.setattr(trade_cycles, 'ProcessPoolExecutor', RecordingPool)
+        monkeypatch.setattr(trade_cycles, 'load_open_swaps', lambda: ring_one + ring_two)
+        app.config['TRADE_RING_POOL_THRESHOLD'] = 6
+        with app.app_context():
+            rings = suggested_rings('E')
+        assert [[leg.swap_id for leg in ring] for ring in rings] == [['d', 'e', 'f']]
+        assert len(pools) == 1
+        assert trade_cycles.POOL_THRESHOLD <= 100_000
+
+    def test_stale_rings_are_served_while_one_thread_refreshes(self, app, monkeypatch):
+        first = [_edge('a', 'A', 'p', 'q'), _edge('b', 'B', 'q', 'r'), _edge('c', 'C', 'r', 'p')]
+        second = [_edge('d', 'A', 'x', 'y'), _edge('e', 'E', 'y', 'z'), _edge('f', 'F', 'z', 'x')]
+        loading, release, loads = threading.Event(), threading.Event(), []
+
+        def load():
+            loads.append(1)
+            if len(loads) == 1:
+                return first
+            loading.set()
+            release.wait(5)
+            return second
+
+        monkeypatch.setattr(trade_cycles, 'load_open_swaps', load)
+        app.config['TRADE_RING_REFRESH'] = 0
+        with app.app_context():
+            assert [leg.swap_id for leg in suggested_rings('A')[0]] == ['a', 'b', 'c']
+            # Stale now: requests keep the old rings while a single background refresh runs
+            assert [leg.swap_id for leg in suggested_rings('A')[0]] == ['a', 'b', 'c']
+            assert loading.wait(5)
+            assert [leg.swap_id for leg in suggested_rings('A')[0]] == ['a', 'b', 'c']
+            assert len(loads) == 2
+            release.set()
+            state = app.extensions['trade_rings']
+            with state['lock']:
+                pass  # the refresh thread holds it until done
+            assert [leg.swap_id for leg in state['rings'][0]] == ['d', 'e', 'f']
+
+    def test_api_suggests_rings_from_open_swaps(self, client, app):
+        with app.app_context():
+            category = db.session.execute(db.select(Category)).scalars().first()
+            names = [SkillName(name=f"Ring {n}") for n in ("Guitar", "Python", "Cooking")]
+            db.session.add_all(names)
+            users = [User(name=n, email=f"{n.lower()}@example.com", password=generate_password_hash("password123"))
+                     for n in ("Ann", "Ben", "Cat")]
+            db.session.add_all(users)
+            db.session.flush()
+            # Ann offers Python wants Guitar; Ben offers Cooking wants Python; Cat offers Guitar wants Cooking
+            for user, offers, wants in ((users[0], 1, 0), (users[1], 2, 1), (users[2], 0, 2)):
+                skill = Skill(user_id=user.id, skill_name_id=names[offers].id, category_id=category.id,
+                              description="Ring skill")
+                db.session.add(skill)
+                db.session.flush()
+                db.session.add(Swap(user_id=user.id, offered_skill_id=skill.id,
+                                    desired_skill_name_id=names[wants].id, description="Ring swap"))
+            db.session.commit()
+            assert len(load_open_swaps()) == 3
+            ann_id = users[0].id
+
+        with client.session_transaction() as sess:
+            sess['user_id'] = ann_id
+        body = client.get('/api/trade-rings').get_json()
+        assert len(body['items']) == 1
+        legs = body['items'][0]['legs']
+        assert {leg['user_name'] for leg in legs} == {"Ann", "Ben", "Cat"}
+        ann_leg = next(leg for leg in legs if leg['user_name'] == "Ann")
+        assert ann_leg['gives'] == "Ring Python"
@@ -0,0 +1,171 @@
+import pytest
+from sqlalchemy.orm import Session
+from app.models import (
+    db, User, Category, SkillName, Skill, Swap, SwapRequest, DiscussRequest, SwapConversation,
+    SwapStatus, RequestStatus, InvalidTransition,
+)
+from werkzeug.security import generate_password_hash
+
+
+@pytest.fixture
+def swap_setup(app):
+    """An open swap plus the users and skills needed to request it; returns ids."""
+    with app.app_context():
+        category = db.session.execute(db.select(Category)).scalars().first()
+        names = db.session.execute(db.select(SkillName).limit(2)).scalars().all()
+        owner = User(name="Owner", email="owner@example.com", password=generate_password_hash("password123"))
+        asker = User(name="Asker", email="asker@example.com", password=generate_password_hash("password123"))
+        db.session.add_all([owner, asker])
+        db.session.flush()
+        owner_skill = Skill(user_id=owner.id, skill_name_id=names[0].id, category_id=category.id,
+                            description="Owner skill description")
+        asker_skill = Skill(user_id=asker.id, skill_name_id=names[1].id, category_id=category.id,
+                            description="Asker skill description")
+        db.session.add_all([owner_skill, asker_skill])
+        db.session.flush()
+        swap = Swap(user_id=owner.id, offered_skill_id=owner_skill.id, desired_skill_name_id=names[1].id,
+                    description="Swap under test")
+        db.session.add(swap)
+        db.session.commit()
+        return {'swap': swap.id, 'owner': owner.id, 'asker': asker.id,
+                'owner_skill': owner_skill.id, 'asker_skill': asker_skill.id}
+
+
+def _add_request(ids, model=SwapRequest, **kwargs):
+    request = model(sender_id=ids['asker'], recipient_id=ids['owner'], swap_id=ids['swap'],
+                    sender_skill_id=ids['asker_skill'], recipient_skill_id=ids['owner_skill'], **kwargs)
+    db.session.add(request)
+    db.session.commit()
+    return request.id
+
+
+def _counters(swap_id):
+    swap = db.session.get(Swap, swap_id)
+    db.session.refresh(swap)
+    return (swap.pending_requests, swap.accepted_requests, swap.closed_requests,
+            swap.accepted_discussions, swap.status)
+
+
+class TestRequestTransitions:
+    """Test the table-driven request/swap state machine and its counters."""
+
+    def test_counters_follow_each_transition(self, app, swap_setup):
+        with app.app_context():
+            first = _add_request(swap_setup)
+            second = _add_request(swap_setup)
+            assert _counters(swap_setup['swap']) == (2, 0, 0, 0, SwapStatus.open)
+
+            db.session.get(SwapRequest, first).reject()
+            db.session.commit()
+            assert _counters(swap_setup['swap']) == (1, 0, 1, 0, SwapStatus.open)
+
+            db.session.get(SwapRequest, second).accept()
+            db.session.commit()
+            assert _counters(swap_setup['swap']) == (0, 1, 1, 0, SwapStatus.in_discussion)
+
+            db.session.get(SwapRequest, second).cancel()
+            db.session.commit()
+            assert _counters(swap_setup['swap']) == (0, 0, 2, 0, SwapStatus.cancelled)
+
+            db.session.delete(db.session.get(SwapRequest, first))
+            db.session.delete(db.session.get(SwapRequest, second))
+            db.session.commit()
+            assert _counters(swap_setup['swap']) == (0, 0, 0, 0, SwapStatus.open)
+
+    def test_accepted_discussion_counts(self, app, swap_setup):
+        with app.app_context():
+            _add_request(swap_setup)
+            discussion = _add_request(swap_setup, model=DiscussRequest)
+            db.session.get(DiscussRequest, discussion).accept()
+            db.session.commit()
+            assert _counters(swap_setup['swap']) == (1, 0, 0, 1, SwapStatus.in_discussion)
+
+    def test_direct_assignment_is_counted(self, app, swap_setup):
+        with app.app_context():
+            request_id = _add_request(swap_setup)
+            db.session.get(SwapRequest, request_id).status = RequestStatus.accepted
+            db.session.commit()
+            assert _counters(swap_setup['swap']) == (0, 1, 0, 0, SwapStatus.in_discussion)
+
+    def test_transition_does_not_load_sibling_requests(self, app, swap_setup, query_counter):
+        with app.app_context():
+            request_id = _add_request(swap_setup)
+            for _ in range(5):
+                _add_request(swap_setup)
+            db.session.expire_all()
+            request = db.session.get(SwapRequest, request_id)
+            with query_counter() as statements:
+                request.accept()
+                db.session.commit()
+            selects = [s for s in statements if s.lstrip().upper().startswith('SELECT')]
+            # Only the swap itself is loaded; no request rows are read to derive its status
+            assert not any('swap_requests.status' in s for s in selects)
+            assert _counters(swap_setup['swap']) == (5, 1, 0, 0, SwapStatus.in_discussion)
+
+    def test_stale_swap_does_not_lose_counts(self, app, swap_setup):
+        with app.app_context():
+            stale = db.session.get(Swap, swap_setup['swap'])
+            assert stale.pending_requests == 0
+            # Another worker adds a request after this session loaded the swap
+            with Session(db.engine) as other:
+                other.add(SwapRequest(sender_id=swap_setup['asker'], recipient_id=swap_setup['owner'],
+                                      swap_id=swap_setup['swap'], sender_skill_id=swap_setup['asker_skill'],
+                                      recipient_skill_id=swap_setup['owner_skill']))
+                other.commit()
+            _add_request(swap_setup)
+            assert stale.pending_requests == 2
+            assert _counters(swap_setup['swap']) == (2, 0, 0, 0, SwapStatus.open)
+
+    def test_completing_the_swap_accepts_pending_requests(self, app, client, swap_setup):
+        with app.app_context():
+            _add_request(swap_setup)
+            _add_request(swap_setup)
+            conversation = SwapConversation(swap_id=swap_setup['swap'], sender_id=swap_setup['owner'],
+                                            recipient_id=swap_setup['asker'])
+            db.session.add(conversation)
+            db.session.commit()
+            conversation_id = conversation.id
+        for user in ('owner', 'asker'):
+            with client.session_transaction() as sess:
+                sess['user_id'] = swap_setup[user]
+            assert client.post(f"/accept_swap/{conversation_id}").get_json()['success']
+        with app.app_context():
+            assert _counters(swap_setup['swap']) == (0, 2, 0, 0, SwapStatus.completed)
+
+    def test_illegal_method_call_raises_before_writing(self, app, swap_setup):
+        with app.app_context():
+            request_id = _add_request(swap_setup)
+            request = db.session.get(SwapRequest, request_id)
+            request.reject()
+            db.session.commit()
+            with pytest.raises(InvalidTransition):
+                request.accept()
+            assert request.status == RequestStatus.rejected
+            assert not db.session.dirty
+
+    def test_illegal_assignment_fails_the_flush(self, app, swap_setup):
+        with app.app_context():
+            request_id = _add_request(swap_setup, status=RequestStatus.cancelled)
+            db.session.get(SwapRequest, request_id).status = RequestStatus.pending
+            with pytest.raises(InvalidTransition):
+                db.session.commit()
+            db.session.rollback()
+            assert db.session.get(SwapRequest, request_id).status == RequestStatus.cancelled
+            assert _counters(swap_setup['swap']) == (0, 0, 1, 0, SwapStatus.cancelled)
+
+    def test_completed_swap_is_final(self, app, swap_setup):
+        with app.app_context():
+            request_id = _add_request(swap_setup, status=RequestStatus.accepted)
+            swap = db.session.get(Swap, swap_setup['swap'])
+            swap.status = SwapStatus.completed
+            db.session.commit()
+
+            # Request changes still move the counters, but not the status
+            db.session.get(SwapRequest, request_id).cancel()
+            db.session.commit()
+            assert _counters(swap_setup['swap']) == (0, 0, 1, 0, SwapStatus.completed)
+
+            swap.status = SwapStatus.open
+            with pytest.raises(InvalidTransition):
+                db.session.commit()
+            db.session.rollback()